@@ -1,32 +1,25 @@
 import frappe
+from frappe.utils import cint
+
 from query_builder.utils.vector_store import (
+    INDEXED_DOCTYPES,
     rebuild_vector_store,
     retrieve_schema,
+    sync_vector_store,
 )
 
 @frappe.whitelist()
-def rebuild_embeddings():
+def rebuild_embeddings(full=False):
+    """
+    Incremental by default: only changed DocTypes are re-embedded.
+    full=1 re-embeds everything.
+    """
     frappe.only_for("System Manager")
 
-    doctypes = [
-        "Employee",
-        "Department",
-        "Designation",
-        "Shift Type",
-        "Shift Assignment",
-        "Leave Application",
-        "Leave Type",
-        "Leave Policy Assignment",
-        "Attendance",
-        "Employee Checkin",
-        "Salary Slip",
-        "Payroll Entry",
-        "Salary Structure Assignment",
-        "Payroll Period",
-        "Holiday List",
-    ]
+    if cint(full):
+        return rebuild_vector_store(INDEXED_DOCTYPES)
 
-    return rebuild_vector_store(doctypes)
+    return sync_vector_store(INDEXED_DOCTYPES)
 
 
 @frappe.whitelist()
@@ -0,0 +1,37 @@
+import json
+
+import frappe
+
+from query_builder.utils import index_advisor
+
+
+@frappe.whitelist()
+def get_index_report(limit: int = 20):
+    """
+    Missing composite indexes for recorded query patterns, ranked by
+    estimated rows saved.
+    """
+    frappe.only_for("System Manager")
+
+    return index_advisor.build_index_report(int(limit))
+
+
+@frappe.whitelist(methods=["POST"])
+def create_index(doctype: str, columns):
+    """
+    Opt-in: create one recommended index.
+    """
+    frappe.only_for("System Manager")
+
+    if isinstance(columns, str):
+        columns = json.loads(columns)
+
+    return {"index_name": index_advisor.create_index(doctype, list(columns))}
+
+
+@frappe.whitelist(methods=["POST"])
+def reset_index_usage():
+    frappe.only_for("System Manager")
+
+    index_advisor.reset_usage()
+    return {"ok": True}
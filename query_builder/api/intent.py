@@ -1,82 +1,373 @@
+import copy
+
 import frappe
 from pydantic import ValidationError
 
-from query_builder.utils.vector_store import retrieve_schema
-from query_builder.utils.intent_parser import parse_intent
-from query_builder.utils.normalizer import IntentNormalizer
-from query_builder.utils.intent_schema import IntentSchema
-from query_builder.utils.schema_trimmer import trim_schema, build_schema_prompt
-
+from query_builder.utils.child_table_resolver import resolve_child_table
+from query_builder.utils.concurrency import map_bounded, submit
+from query_builder.utils.confidence import require_clarification
+from query_builder.utils.entity_resolver import resolve_entities
+from query_builder.utils.intent_cache import parse_intent_cached
 from query_builder.utils.intent_enhancer import (
-    normalize_action,
     canonicalize_filters,
-    resolve_filters,
+    normalize_action,
     normalize_aggregate,
-    normalize_operators,
     normalize_group_by,
+    normalize_operators,
+    resolve_filters,
+)
+from query_builder.utils.intent_schema import IntentSchema
+from query_builder.utils.join_cost import get_join_stats
+from query_builder.utils.join_graph import get_join_table
+from query_builder.utils.join_planner import build_joins
+from query_builder.utils.metrics import (
+    CONF_TIMINGS_IN_META,
+    collect_timings,
+    incr,
+    stage,
+)
+from query_builder.utils.normalizer import IntentNormalizer
+from query_builder.utils.query_hints import has_hint
+from query_builder.utils.schema_registry import warm_schemas
+from query_builder.utils.schema_trimmer import build_schema_prompt, trim_schema
+from query_builder.utils.vector_store import (
+    INDEXED_DOCTYPES,
+    retrieve_schema,
+    retrieve_schemas,
+    warm_keyword_index,
 )
 
-from query_builder.utils.confidence import require_clarification
+# Realtime event carrying extract_intent_stream progress
+STREAM_EVENT = "query_builder_intent_progress"
+
+# Realtime event + cache key for background batches
+BATCH_DONE_EVENT = "query_builder_intent_batch_done"
+BATCH_RESULT_KEY = "query_builder:intent_batch:"
+BATCH_RESULT_TTL = 24 * 3600
+
+MAX_BATCH_SIZE = 1000
+DEFAULT_BATCH_CONCURRENCY = 4
+
+
+def is_parallel_enabled() -> bool:
+    return bool(frappe.conf.get("query_builder_parallel_pipeline", True))
 
-# ---------- LOGIC LAYERS ----------
-from query_builder.utils.entity_resolver import resolve_entities
-from query_builder.utils.join_graph import build_join_graph
-from query_builder.utils.join_planner import build_joins
-from query_builder.utils.child_table_resolver import resolve_child_table
+
+def has_checkin_semantic(query: str) -> bool:
+    return has_hint(query, "checkin")
 
 
 @frappe.whitelist()
 def extract_intent(query: str):
+    return run_extract_intent(query)
+
+
+@frappe.whitelist()
+def extract_intent_stream(query: str, task_id: str | None = None):
+    """
+    extract_intent() that publishes every stage result on the
+    `query_builder_intent_progress` realtime event as it finishes:
+    entities, retrieval, schema, llm_partial (repeated), llm, intent.
+
+    Returns the same final payload as extract_intent.
+    """
+    task_id = task_id or frappe.generate_hash(length=10)
+    user = frappe.session.user
+
+    def publish(stage, data):
+        frappe.publish_realtime(
+            STREAM_EVENT,
+            {"task_id": task_id, "stage": stage, "data": data},
+            user=user,
+        )
+
+    result = run_extract_intent(query, on_stage=publish)
+    publish("done", result)
+    return result
+
+
+def run_extract_intent(query: str, on_stage=None):
+    """
+    Full NL → intent pipeline.
+    on_stage(stage, data), when given, receives intermediate results
+    and switches the LLM call to streaming.
+
+    Every stage is timed into the worker metrics (see api/metrics);
+    with `query_builder_metrics_in_meta` the timings are also returned
+    in `_meta.timings_ms`.
+    """
+    incr("requests")
+
+    with collect_timings() as timings:
+        try:
+            with stage("total"):
+                result = _run_extract_intent(query, on_stage)
+        except Exception:
+            incr("errors")
+            raise
+
+    if result.get("clarification_required"):
+        incr("clarifications")
+    elif "_meta" in result and frappe.conf.get(CONF_TIMINGS_IN_META):
+        result["_meta"]["timings_ms"] = dict(timings)
+
+    return result
 
-    original_query = query.lower()
+
+def _run_extract_intent(query: str, on_stage=None):
+    emit = on_stage or (lambda stage, data: None)
+
+    # --------------------------------------------------
+    # STEP 0: SPECULATIVE RETRIEVAL (BACKGROUND THREAD)
+    # --------------------------------------------------
+    # Embedding + Chroma search never touch the DB, so they can run on
+    # the raw query while entity resolution queries Employee. The keyword
+    # index may need compiled schemas (DB) → built here first.
+    speculative = None
+    if is_parallel_enabled():
+        with stage("schema_warm"):
+            warm_keyword_index()
+        speculative = submit(retrieve_schema, query)
 
     # --------------------------------------------------
-    # STEP 0: ENTITY RESOLUTION (BLOCKING, PRE-LLM)
+    # STEP 0.1: ENTITY RESOLUTION (BLOCKING, PRE-LLM)
     # --------------------------------------------------
-    entity_result = resolve_entities(query)
+    with stage("entities"):
+        entity_result = resolve_entities(query)
     if entity_result.get("clarification_required"):
         return entity_result
 
     rewritten_query = entity_result.get("query", query)
+    entities = entity_result.get("entities")
+    emit("entities", {"query": query, "rewritten_query": rewritten_query, "entities": entities or []})
+
+    # Schema compilation needs the DB → request thread, overlapping retrieval
+    if speculative:
+        with stage("schema_warm"):
+            warm_schemas(INDEXED_DOCTYPES)
 
     # --------------------------------------------------
     # STEP 0.5: PRE-LLM CHECK-IN SEMANTIC HINT (NEW)
     # --------------------------------------------------
     # Helps schema retrieval + LLM pick correct doctype
-    checkin_semantic = any(
-        k in original_query
-        for k in ["check in", "checked in", "check-in"]
-    )
+    checkin_semantic = has_checkin_semantic(query)
 
     # --------------------------------------------------
     # STEP 1: SCHEMA RETRIEVAL (VECTOR)
     # --------------------------------------------------
-    res = retrieve_schema(rewritten_query)
-    trimmed_schema = trim_schema(res, rewritten_query)
-    schema_text = build_schema_prompt(trimmed_schema)
+    # time on the critical path; embedding / vector_search are timed inside
+    with stage("retrieval"):
+        if speculative and rewritten_query == query:
+            res = speculative.result()
+        else:
+            # entities were rewritten → the speculative result is for another text
+            res = retrieve_schema(rewritten_query)
+
+    emit("retrieval", {
+        "doctypes": [m["doctype"] for m in (res.get("metadatas") or [[]])[0]],
+        "distances": (res.get("distances") or [[]])[0],
+    })
+
+    with stage("trim"):
+        trimmed_schema = trim_schema(res, rewritten_query, entities)
+        schema_text = build_schema_prompt(trimmed_schema, entities)
+    emit("schema", trimmed_schema)
 
     # --------------------------------------------------
     # STEP 2: LLM INTENT EXTRACTION (WHAT)
     # --------------------------------------------------
-    raw = parse_intent(schema_text, rewritten_query)
+    on_partial = (lambda partial: emit("llm_partial", partial)) if on_stage else None
+
+    with stage("llm"):
+        raw = parse_intent_cached(schema_text, rewritten_query, on_partial=on_partial)
+    emit("llm", raw)
+
+    if (raw.get("_meta") or {}).get("cache_hit"):
+        incr("intent_cache_hits")
+    else:
+        incr("intent_cache_misses")
+
+    result = finalize_intent(raw, rewritten_query, checkin_semantic)
+    emit("intent", result)
+    return result
+
+
+# --------------------------------------------------
+# BATCH
+# --------------------------------------------------
+
+def _parse_batch_queries(queries) -> list:
+    if isinstance(queries, str):
+        queries = frappe.parse_json(queries)
+
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        frappe.throw("queries must be a list of strings")
+
+    if len(queries) > MAX_BATCH_SIZE:
+        frappe.throw(f"At most {MAX_BATCH_SIZE} queries per batch")
+
+    return queries
+
+
+def _batch_concurrency(concurrency=None) -> int:
+    """
+    Caller's concurrency, capped by the site's
+    `query_builder_batch_concurrency` (threads + parallel LLM calls).
+    """
+    limit = max(1, int(
+        frappe.conf.get("query_builder_batch_concurrency")
+        or DEFAULT_BATCH_CONCURRENCY
+    ))
+    return max(1, min(int(concurrency or limit), limit))
+
+
+@frappe.whitelist()
+def extract_intents_batch(queries, concurrency=None):
+    """
+    extract_intent() for many queries at once.
+    Returns [{"query", "result"} | {"query", "error"}] in input order.
+    """
+    return run_extract_intents_batch(
+        _parse_batch_queries(queries),
+        _batch_concurrency(concurrency),
+    )
+
+
+@frappe.whitelist()
+def enqueue_extract_intents_batch(queries, concurrency=None):
+    """
+    Background (RQ) variant. Poll get_intents_batch_result(batch_id) or
+    listen for the `query_builder_intent_batch_done` realtime event.
+    """
+    batch_id = frappe.generate_hash(length=12)
+
+    frappe.enqueue(
+        "query_builder.api.intent.extract_intents_batch_job",
+        queue="long",
+        batch_id=batch_id,
+        queries=_parse_batch_queries(queries),
+        concurrency=_batch_concurrency(concurrency),
+        user=frappe.session.user,
+    )
+
+    return {"batch_id": batch_id}
+
+
+def extract_intents_batch_job(batch_id, queries, concurrency, user):
+    frappe.set_user(user)
+
+    results = run_extract_intents_batch(queries, concurrency)
+
+    frappe.cache().set_value(
+        BATCH_RESULT_KEY + batch_id,
+        {"user": user, "results": results},
+        expires_in_sec=BATCH_RESULT_TTL,
+    )
+    frappe.publish_realtime(BATCH_DONE_EVENT, {"batch_id": batch_id}, user=user)
+
+
+@frappe.whitelist()
+def get_intents_batch_result(batch_id: str):
+    stored = frappe.cache().get_value(BATCH_RESULT_KEY + batch_id)
+    if not stored:
+        return {"status": "pending"}
+
+    if stored["user"] != frappe.session.user:
+        frappe.throw("Not permitted", frappe.PermissionError)
+
+    return {"status": "done", "results": stored["results"]}
+
+
+def run_extract_intents_batch(queries: list, concurrency: int) -> list:
+    """
+    Same stages as run_extract_intent, batched per stage:
+    entity resolution (DB, sequential) → one encode + one Chroma query →
+    trimming → deduplicated LLM calls under `concurrency` → finalize.
+    """
+    results = [None] * len(queries)
+    pending = []  # (index, rewritten_query, entities)
+
+    # ---- Entity resolution ----
+    for i, query in enumerate(queries):
+        try:
+            entity_result = resolve_entities(query)
+        except Exception as e:
+            results[i] = {"query": query, "error": str(e)}
+            continue
+
+        if entity_result.get("clarification_required"):
+            results[i] = {"query": query, "result": entity_result}
+            continue
+
+        pending.append((i, entity_result.get("query", query), entity_result.get("entities")))
+
+    # ---- Retrieval: one encode, one Chroma query ----
+    retrieved = retrieve_schemas([rewritten for _, rewritten, _ in pending])
+
+    # ---- Trimming + prompt (dedupe identical prompts) ----
+    prompts = {}   # (schema_text, rewritten_query) -> [indexes]
+    for (i, rewritten, entities), res in zip(pending, retrieved, strict=True):
+        try:
+            schema_text = build_schema_prompt(trim_schema(res, rewritten, entities), entities)
+        except Exception as e:
+            results[i] = {"query": queries[i], "error": str(e)}
+            continue
+
+        prompts.setdefault((schema_text, rewritten), []).append(i)
+
+    # ---- LLM, bounded concurrency ----
+    unique = list(prompts)
+    raws = map_bounded(lambda key: parse_intent_cached(*key), unique, concurrency)
+
+    # ---- Finalize (DB-backed registry → request thread) ----
+    for (schema_text, rewritten), raw in zip(unique, raws, strict=True):
+        for i in prompts[(schema_text, rewritten)]:
+            if isinstance(raw, Exception):
+                results[i] = {"query": queries[i], "error": str(raw)}
+                continue
+
+            try:
+                result = finalize_intent(
+                    copy.deepcopy(raw),
+                    rewritten,
+                    has_checkin_semantic(queries[i]),
+                )
+            except Exception as e:
+                results[i] = {"query": queries[i], "error": str(e)}
+                continue
+
+            results[i] = {"query": queries[i], "result": result}
+
+    return results
+
+
+# --------------------------------------------------
+# POST-LLM
+# --------------------------------------------------
+
+def finalize_intent(raw: dict, rewritten_query: str, checkin_semantic: bool):
+    """
+    Post-LLM stages: normalization, guards, join planning, validation.
+    """
     meta = raw.get("_meta")
 
     # --------------------------------------------------
     # STEP 3: NORMALIZATION (SAFE, DETERMINISTIC)
     # --------------------------------------------------
-    normalizer = IntentNormalizer()
-    intent = normalizer.normalize(raw, rewritten_query)
+    with stage("normalize"):
+        normalizer = IntentNormalizer()
+        intent = normalizer.normalize(raw, rewritten_query)
 
-    clarification = require_clarification(intent)
-    if clarification:
-        return clarification
+        clarification = require_clarification(intent)
+        if clarification:
+            return clarification
 
-    intent = normalize_action(intent)
-    intent = canonicalize_filters(intent)
-    intent = normalize_operators(intent)
-    intent = resolve_filters(intent)
-    intent = normalize_aggregate(intent)
-    intent = normalize_group_by(intent)
+        intent = normalize_action(intent)
+        intent = canonicalize_filters(intent)
+        intent = normalize_operators(intent)
+        intent = resolve_filters(intent)
+        intent = normalize_aggregate(intent)
+        intent = normalize_group_by(intent)
 
     # --------------------------------------------------
     # STEP 3.5: POST-LLM CHECK-IN DOCTYPE ENFORCEMENT (NEW)
@@ -110,54 +401,70 @@ def extract_intent(query: str):
     # --------------------------------------------------
     # STEP 5: JOIN + CHILD TABLE PLANNING (HOW)
     # --------------------------------------------------
-    base_doctype = intent.get("doctype")
-    required_doctypes = set()
+    with stage("join_planning"):
+        base_doctype = intent.get("doctype")
+        required_doctypes = set()
 
-    # ---- From filters ----
-    for f in intent.get("filters", []):
-        field = f.get("field")
-        if not field:
-            continue
+        # doctypes read outside filters can never become a semi-join
+        selected_doctypes = set()
 
-        child = resolve_child_table(base_doctype, field)
-        if child:
-            required_doctypes.add(child)
-
-    # ---- From aggregate ----
-    agg = intent.get("aggregate")
-    if agg:
-        child = resolve_child_table(base_doctype, agg.get("field"))
-        if child:
-            required_doctypes.add(child)
-
-    # ---- From group_by ----
-    for gb in intent.get("group_by", []):
-        child = resolve_child_table(base_doctype, gb)
-        if child:
-            required_doctypes.add(child)
-
-    # ---- Build join graph ----
-    all_doctypes = {base_doctype} | required_doctypes
-    join_graph = build_join_graph(list(all_doctypes))
-
-    join_result = build_joins(
-        base_doctype=base_doctype,
-        required_doctypes=required_doctypes,
-        graph=join_graph,
-    )
+        agg = intent.get("aggregate")
+        planned_fields = [(f.get("field"), True) for f in intent.get("filters", [])]
+        planned_fields += [(f, False) for f in intent.get("fields", [])]
+        planned_fields += [(g, False) for g in intent.get("group_by", [])]
+        if agg:
+            planned_fields.append((agg.get("field"), False))
+
+        # ---- From filters, fields, aggregate and group_by ----
+        for field, is_filter in planned_fields:
+            if not field:
+                continue
+
+            # explicit `Doctype.fieldname` on another doctype
+            doctype = field.rpartition(".")[0]
+            if doctype and doctype != base_doctype:
+                required_doctypes.add(doctype)
+                if not is_filter:
+                    selected_doctypes.add(doctype)
+                continue
+
+            child = resolve_child_table(base_doctype, field, rewritten_query)
+            if isinstance(child, dict):
+                return child
+            if child:
+                required_doctypes.add(child)
+                if not is_filter:
+                    selected_doctypes.add(child)
+
+        # ---- Join paths: site-wide table lookup, optionally by cost ----
+        join_table = get_join_table(INDEXED_DOCTYPES)
+        join_result = build_joins(
+            base_doctype=base_doctype,
+            required_doctypes=required_doctypes,
+            table=join_table,
+            stats=get_join_stats(join_table),
+            filter_only=required_doctypes - selected_doctypes,
+            query=rewritten_query,
+        )
+
+        if isinstance(join_result, dict) and join_result.get("clarification_required"):
+            return join_result
 
-    if isinstance(join_result, dict) and join_result.get("clarification_required"):
-        return join_result
+        # cost model: joins expected to multiply base rows
+        warnings = [j.pop("warning") for j in join_result if "warning" in j]
+        if warnings:
+            meta = {**(meta or {}), "warnings": warnings}
 
-    intent["joins"] = join_result
+        intent["joins"] = join_result
 
     # --------------------------------------------------
     # STEP 6: FINAL VALIDATION
     # --------------------------------------------------
-    try:
-        validated = IntentSchema(**intent).dict()
-    except ValidationError as e:
-        frappe.throw(f"Invalid intent structure: {e}")
+    with stage("validation"):
+        try:
+            validated = IntentSchema(**intent).dict()
+        except ValidationError as e:
+            frappe.throw(f"Invalid intent structure: {e}")
 
     if meta:
         validated["_meta"] = meta
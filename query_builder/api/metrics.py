@@ -0,0 +1,41 @@
+import frappe
+from werkzeug.wrappers import Response
+
+from query_builder.utils import metrics
+from query_builder.utils.embedding_cache import get_cache_stats
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@frappe.whitelist()
+def get_metrics():
+    """
+    This worker's stage latency percentiles and counters.
+    Each gunicorn / RQ worker keeps its own; scrape every worker.
+    """
+    frappe.only_for("System Manager")
+
+    snapshot = metrics.get_registry().snapshot()
+    snapshot["embedding_cache"] = get_cache_stats()
+    return snapshot
+
+
+@frappe.whitelist()
+def prometheus():
+    """
+    Same data in the Prometheus text exposition format.
+    """
+    frappe.only_for("System Manager")
+
+    snapshot = metrics.get_registry().snapshot()
+    body = metrics.to_prometheus(snapshot, extra_labels={"site": frappe.local.site})
+
+    return Response(body, content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@frappe.whitelist(methods=["POST"])
+def reset_metrics():
+    frappe.only_for("System Manager")
+
+    metrics.reset_metrics()
+    return {"ok": True}
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+
+import frappe
+from frappe.utils.response import json_handler
+from werkzeug.wrappers import Response
+
+from query_builder.api.intent import extract_intent
+from query_builder.utils.intent_executor import (
+    check_permissions,
+    execute_intent,
+    iter_intent_rows,
+)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+# rows serialized per response chunk
+EXPORT_BATCH_ROWS = 500
+
+
+@frappe.whitelist()
+def run_query(query: str):
+    """
+    NL query → validated intent → rows, in one SQL round trip.
+    """
+    if not query or not query.strip():
+        return {"error": "Query cannot be empty"}
+
+    intent = extract_intent(query.strip())
+    if intent.get("clarification_required"):
+        return intent
+
+    return {
+        "intent": intent,
+        "data": execute_intent(intent),
+    }
+
+
+@frappe.whitelist()
+def export_query(query: str, format: str = "csv"):
+    """
+    Stream every row of a list query as CSV or JSON.
+    Rows are read page by page, so memory stays flat on large results.
+    """
+    if format not in EXPORT_FORMATS:
+        frappe.throw(f"Unsupported format: {format}")
+
+    if not query or not query.strip():
+        frappe.throw("Query cannot be empty")
+
+    intent = extract_intent(query.strip())
+    if intent.get("clarification_required"):
+        return intent
+
+    if intent.get("action") != "list":
+        frappe.throw("Only list queries can be exported")
+
+    # fail inside the request, not halfway through the body
+    check_permissions(intent)
+
+    body = _csv_chunks(intent) if format == "csv" else _json_chunks(intent)
+
+    return Response(
+        _in_site_context(body, frappe.local.site, frappe.local.sites_path, frappe.session.user),
+        mimetype=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="query.{format}"'},
+        direct_passthrough=True,
+    )
+
+
+# --------------------------------------------------
+# STREAM BODIES
+# --------------------------------------------------
+
+def _in_site_context(chunks, site, sites_path, user):
+    """
+    The body is iterated after the request handler has called
+    frappe.destroy(): re-enter the site as the requesting user for it,
+    and tear that context down again once the stream ends.
+    """
+    frappe.init(site=site, sites_path=sites_path)
+    try:
+        frappe.connect()
+        frappe.set_user(user)
+        yield from chunks
+    finally:
+        frappe.destroy()
+
+
+def _batched(rows, size=EXPORT_BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _csv_chunks(intent):
+    header = None
+
+    for batch in _batched(iter_intent_rows(intent)):
+        buf = io.StringIO()
+        out = csv.writer(buf)
+
+        if header is None:
+            header = list(batch[0].keys())
+            out.writerow(header)
+
+        for row in batch:
+            out.writerow([row.get(k) for k in header])
+
+        yield buf.getvalue().encode()
+
+
+def _json_chunks(intent):
+    yield b"["
+
+    first = True
+    for batch in _batched(iter_intent_rows(intent)):
+        parts = [json.dumps(row, default=json_handler) for row in batch]
+        prefix = "" if first else ","
+        first = False
+        yield (prefix + ",".join(parts)).encode()
+
+    yield b"]"
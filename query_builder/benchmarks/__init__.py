@@ -0,0 +1,9 @@
+# query_builder/benchmarks
+#
+# Offline benchmark harness for the NL → intent pipeline:
+#   fixtures.py  - HR DocType metas + employees served instead of the site's
+#   corpus.py    - generated query corpus with canned intents
+#   stub_llm.py  - local OpenRouter-compatible server with configurable latency
+#   runner.py    - timing / memory measurement, JSON results, comparison
+#
+# bench --site <site> run-query-benchmark --output results.json [--baseline old.json]
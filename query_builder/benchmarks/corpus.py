@@ -0,0 +1,206 @@
+# query_builder/benchmarks/corpus.py
+
+import random
+import re
+
+from query_builder.benchmarks.fixtures import (
+    DEPARTMENTS,
+    DESIGNATIONS,
+    FIRST_NAMES,
+    LAST_NAMES,
+    LEAVE_TYPES,
+    SHIFT_TYPES,
+)
+
+# Same seed → same corpus → results comparable across commits
+CORPUS_SEED = 1337
+DEFAULT_CORPUS_SIZE = 300
+
+PERIODS = ["today", "yesterday", "this week", "last week", "this month", "last month"]
+LEAVE_STATUSES = ["Open", "Approved", "Rejected"]
+ATTENDANCE_STATUSES = ["Present", "Absent", "On Leave", "Half Day"]
+
+# entity resolution rewrites names to IDs before the LLM sees the query
+EMPLOYEE_ID_PATTERN = re.compile(r"HR-EMP-\d+")
+EMPLOYEE_PLACEHOLDER = "<employee>"
+
+
+# ---------------------------------------------------------------------
+# TEMPLATES
+# ---------------------------------------------------------------------
+
+def _period_filter(field, period):
+    return {"field": field, "op": "=", "value": period.replace(" ", "_")}
+
+
+# (query template, intent builder(slots) -> canned LLM intent)
+TEMPLATES = [
+    (
+        "how many employees in {department}",
+        lambda s: {
+            "action": "aggregate", "doctype": "Employee",
+            "filters": [{"field": "department", "op": "=", "value": s["department"]}],
+            "aggregate": {"function": "count", "field": "name"},
+        },
+    ),
+    (
+        "list employees with designation {designation}",
+        lambda s: {
+            "action": "list", "doctype": "Employee",
+            "fields": ["name", "employee_name", "designation"],
+            "filters": [{"field": "designation", "op": "=", "value": s["designation"]}],
+        },
+    ),
+    (
+        "show leave applications for {employee} {period}",
+        lambda s: {
+            "action": "list", "doctype": "Leave Application",
+            "fields": ["name", "employee_name", "leave_type", "from_date", "to_date", "status"],
+            "filters": [
+                {"field": "employee_name", "op": "=", "value": s["employee"]},
+                _period_filter("from_date", s["period"]),
+            ],
+        },
+    ),
+    (
+        "{leave_status} {leave_type} requests {period}",
+        lambda s: {
+            "action": "list", "doctype": "Leave Application",
+            "fields": ["name", "employee_name", "from_date", "to_date"],
+            "filters": [
+                {"field": "status", "op": "=", "value": s["leave_status"]},
+                {"field": "leave_type", "op": "=", "value": s["leave_type"]},
+                _period_filter("posting_date", s["period"]),
+            ],
+        },
+    ),
+    (
+        "who checked in late {period}",
+        lambda s: {
+            "action": "list", "doctype": "Employee Checkin",
+            "fields": ["employee", "employee_name", "time"],
+            "filters": [_period_filter("time", s["period"])],
+        },
+    ),
+    (
+        "check-in logs of {employee} {period}",
+        lambda s: {
+            "action": "list", "doctype": "Employee Checkin",
+            "fields": ["employee_name", "log_type", "time"],
+            "filters": [
+                {"field": "employee_name", "op": "=", "value": s["employee"]},
+                _period_filter("time", s["period"]),
+            ],
+        },
+    ),
+    (
+        "count of {attendance_status} attendance {period} by department",
+        lambda s: {
+            "action": "aggregate", "doctype": "Attendance",
+            "filters": [
+                {"field": "status", "op": "=", "value": s["attendance_status"]},
+                _period_filter("attendance_date", s["period"]),
+            ],
+            "aggregate": {"function": "count", "field": "name"},
+            "group_by": ["department"],
+        },
+    ),
+    (
+        "total net pay for {department} department {period}",
+        lambda s: {
+            "action": "aggregate", "doctype": "Salary Slip",
+            "filters": [
+                {"field": "department", "op": "=", "value": s["department"]},
+                _period_filter("posting_date", s["period"]),
+            ],
+            "aggregate": {"function": "sum", "field": "net_pay"},
+        },
+    ),
+    (
+        "salary slips with basic component above {amount}",
+        lambda s: {
+            "action": "list", "doctype": "Salary Slip",
+            "fields": ["name", "employee_name", "net_pay"],
+            "filters": [{"field": "amount", "op": ">", "value": s["amount"]}],
+        },
+    ),
+    (
+        "employees on {shift_type}",
+        lambda s: {
+            "action": "list", "doctype": "Shift Assignment",
+            "fields": ["employee", "employee_name", "start_date"],
+            "filters": [{"field": "shift_type", "op": "=", "value": s["shift_type"]}],
+        },
+    ),
+    (
+        "average working hours {period}",
+        lambda s: {
+            "action": "aggregate", "doctype": "Attendance",
+            "filters": [_period_filter("attendance_date", s["period"])],
+            "aggregate": {"function": "avg", "field": "working_hours"},
+        },
+    ),
+    (
+        "holidays in {holiday_list}",
+        lambda s: {
+            "action": "list", "doctype": "Holiday List",
+            "fields": ["holiday_date", "description"],
+            "filters": [{"field": "name", "op": "=", "value": s["holiday_list"]}],
+        },
+    ),
+]
+
+
+def _slots(rng: random.Random) -> dict:
+    return {
+        "department": rng.choice(DEPARTMENTS),
+        "designation": rng.choice(DESIGNATIONS),
+        "employee": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "period": rng.choice(PERIODS),
+        "leave_status": rng.choice(LEAVE_STATUSES),
+        "leave_type": rng.choice(LEAVE_TYPES),
+        "attendance_status": rng.choice(ATTENDANCE_STATUSES),
+        "shift_type": rng.choice(SHIFT_TYPES),
+        "holiday_list": rng.choice(["Holidays 2025", "Holidays 2026"]),
+        "amount": rng.choice([10000, 25000, 50000]),
+    }
+
+
+# ---------------------------------------------------------------------
+# CORPUS
+# ---------------------------------------------------------------------
+
+def intent_key(query: str) -> str:
+    """
+    Lookup key of a query as the LLM receives it (employee IDs
+    replaced by a placeholder).
+    """
+    return EMPLOYEE_ID_PATTERN.sub(EMPLOYEE_PLACEHOLDER, query)
+
+
+def build_corpus(size: int = DEFAULT_CORPUS_SIZE, seed: int = CORPUS_SEED) -> list:
+    """
+    [{"query", "key", "intent"}] cycling through TEMPLATES with random
+    slots. Queries are unique; `intent` is what the stub LLM answers
+    for `key` (see intent_key).
+    """
+    rng = random.Random(seed)
+    corpus = []
+    seen = set()
+
+    attempts = 0
+    while len(corpus) < size and attempts < size * 20:
+        template, build = TEMPLATES[attempts % len(TEMPLATES)]
+        attempts += 1
+
+        slots = _slots(rng)
+        query = template.format(**slots)
+        if query in seen:
+            continue
+        seen.add(query)
+
+        intent = {"fields": [], "filters": [], "confidence": 0.9, **build(slots)}
+        key = template.format(**{**slots, "employee": EMPLOYEE_PLACEHOLDER})
+        corpus.append({"query": query, "key": key, "intent": intent})
+
+    return corpus
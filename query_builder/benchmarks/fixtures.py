@@ -0,0 +1,310 @@
+# query_builder/benchmarks/fixtures.py
+
+import contextlib
+from unittest import mock
+
+import frappe
+
+# ---------------------------------------------------------------------
+# DOCTYPE METAS
+# ---------------------------------------------------------------------
+
+# doctype -> (description, is_submittable, [(fieldname, fieldtype, label, options)])
+FIXTURE_DOCTYPES = {
+    "Employee": ("Employee master record", False, [
+        ("employee_name", "Data", "Full Name", None),
+        ("first_name", "Data", "First Name", None),
+        ("last_name", "Data", "Last Name", None),
+        ("gender", "Link", "Gender", "Gender"),
+        ("date_of_birth", "Date", "Date of Birth", None),
+        ("date_of_joining", "Date", "Date of Joining", None),
+        ("relieving_date", "Date", "Relieving Date", None),
+        ("status", "Select", "Status", "Active\nInactive\nSuspended\nLeft"),
+        ("company", "Link", "Company", "Company"),
+        ("department", "Link", "Department", "Department"),
+        ("designation", "Link", "Designation", "Designation"),
+        ("reports_to", "Link", "Reports To", "Employee"),
+        ("branch", "Link", "Branch", "Branch"),
+        ("default_shift", "Link", "Default Shift", "Shift Type"),
+        ("holiday_list", "Link", "Holiday List", "Holiday List"),
+        ("cell_number", "Data", "Mobile", None),
+        ("personal_email", "Data", "Personal Email", None),
+        ("company_email", "Data", "Company Email", None),
+        ("ctc", "Currency", "Cost to Company", None),
+        ("employment_type", "Link", "Employment Type", "Employment Type"),
+    ]),
+    "Department": ("Organizational department", False, [
+        ("department_name", "Data", "Department", None),
+        ("parent_department", "Link", "Parent Department", "Department"),
+        ("company", "Link", "Company", "Company"),
+        ("is_group", "Check", "Is Group", None),
+    ]),
+    "Designation": ("Job title of an employee", False, [
+        ("designation_name", "Data", "Designation", None),
+        ("description", "Small Text", "Description", None),
+    ]),
+    "Shift Type": ("Working shift definition", False, [
+        ("start_time", "Time", "Start Time", None),
+        ("end_time", "Time", "End Time", None),
+        ("holiday_list", "Link", "Holiday List", "Holiday List"),
+        ("enable_auto_attendance", "Check", "Enable Auto Attendance", None),
+        ("working_hours_threshold_for_half_day", "Float", "Half Day Threshold", None),
+    ]),
+    "Shift Assignment": ("Assigns a shift to an employee", True, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("shift_type", "Link", "Shift Type", "Shift Type"),
+        ("start_date", "Date", "Start Date", None),
+        ("end_date", "Date", "End Date", None),
+        ("status", "Select", "Status", "Active\nInactive"),
+        ("company", "Link", "Company", "Company"),
+        ("department", "Link", "Department", "Department"),
+    ]),
+    "Leave Application": ("Employee leave request", True, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("leave_type", "Link", "Leave Type", "Leave Type"),
+        ("from_date", "Date", "From Date", None),
+        ("to_date", "Date", "To Date", None),
+        ("half_day", "Check", "Half Day", None),
+        ("total_leave_days", "Float", "Total Leave Days", None),
+        ("status", "Select", "Status", "Open\nApproved\nRejected\nCancelled"),
+        ("posting_date", "Date", "Posting Date", None),
+        ("leave_approver", "Link", "Leave Approver", "User"),
+        ("department", "Link", "Department", "Department"),
+        ("company", "Link", "Company", "Company"),
+        ("description", "Small Text", "Reason", None),
+    ]),
+    "Leave Type": ("Category of leave", False, [
+        ("leave_type_name", "Data", "Leave Type Name", None),
+        ("max_leaves_allowed", "Float", "Max Leaves Allowed", None),
+        ("is_lwp", "Check", "Is Leave Without Pay", None),
+        ("is_carry_forward", "Check", "Is Carry Forward", None),
+    ]),
+    "Leave Policy Assignment": ("Leave policy assigned to an employee", True, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("leave_policy", "Link", "Leave Policy", "Leave Policy"),
+        ("effective_from", "Date", "Effective From", None),
+        ("effective_to", "Date", "Effective To", None),
+        ("company", "Link", "Company", "Company"),
+    ]),
+    "Attendance": ("Daily attendance of an employee", True, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("attendance_date", "Date", "Attendance Date", None),
+        ("status", "Select", "Status", "Present\nAbsent\nOn Leave\nHalf Day\nWork From Home"),
+        ("shift", "Link", "Shift", "Shift Type"),
+        ("leave_type", "Link", "Leave Type", "Leave Type"),
+        ("late_entry", "Check", "Late Entry", None),
+        ("early_exit", "Check", "Early Exit", None),
+        ("working_hours", "Float", "Working Hours", None),
+        ("department", "Link", "Department", "Department"),
+        ("company", "Link", "Company", "Company"),
+    ]),
+    "Employee Checkin": ("Biometric / mobile check-in and check-out log", False, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("log_type", "Select", "Log Type", "\nIN\nOUT"),
+        ("time", "Datetime", "Time", None),
+        ("shift", "Link", "Shift", "Shift Type"),
+        ("device_id", "Data", "Location / Device ID", None),
+        ("skip_auto_attendance", "Check", "Skip Auto Attendance", None),
+    ]),
+    "Salary Slip": ("Monthly salary slip of an employee", True, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("posting_date", "Date", "Posting Date", None),
+        ("start_date", "Date", "Start Date", None),
+        ("end_date", "Date", "End Date", None),
+        ("status", "Select", "Status", "Draft\nSubmitted\nCancelled\nWithheld"),
+        ("gross_pay", "Currency", "Gross Pay", None),
+        ("total_deduction", "Currency", "Total Deduction", None),
+        ("net_pay", "Currency", "Net Pay", None),
+        ("payment_days", "Float", "Payment Days", None),
+        ("payroll_entry", "Link", "Payroll Entry", "Payroll Entry"),
+        ("department", "Link", "Department", "Department"),
+        ("designation", "Link", "Designation", "Designation"),
+        ("company", "Link", "Company", "Company"),
+        ("earnings", "Table", "Earnings", "Salary Detail"),
+        ("deductions", "Table", "Deductions", "Salary Detail"),
+    ]),
+    "Salary Detail": ("Salary component row", False, [
+        ("salary_component", "Link", "Component", "Salary Component"),
+        ("abbr", "Data", "Abbr", None),
+        ("amount", "Currency", "Amount", None),
+        ("default_amount", "Currency", "Default Amount", None),
+    ]),
+    "Payroll Entry": ("Bulk salary slip processing run", True, [
+        ("posting_date", "Date", "Posting Date", None),
+        ("payroll_frequency", "Select", "Payroll Frequency", "\nMonthly\nFortnightly\nBimonthly\nWeekly\nDaily"),
+        ("start_date", "Date", "Start Date", None),
+        ("end_date", "Date", "End Date", None),
+        ("status", "Select", "Status", "Draft\nSubmitted\nCancelled\nQueued\nFailed"),
+        ("department", "Link", "Department", "Department"),
+        ("company", "Link", "Company", "Company"),
+    ]),
+    "Salary Structure Assignment": ("Salary structure assigned to an employee", True, [
+        ("employee", "Link", "Employee", "Employee"),
+        ("employee_name", "Data", "Employee Name", None),
+        ("salary_structure", "Link", "Salary Structure", "Salary Structure"),
+        ("from_date", "Date", "From Date", None),
+        ("base", "Currency", "Base", None),
+        ("variable", "Currency", "Variable", None),
+        ("company", "Link", "Company", "Company"),
+    ]),
+    "Payroll Period": ("Financial period for payroll", False, [
+        ("start_date", "Date", "Start Date", None),
+        ("end_date", "Date", "End Date", None),
+        ("company", "Link", "Company", "Company"),
+    ]),
+    "Holiday List": ("List of holidays for a period", False, [
+        ("holiday_list_name", "Data", "Holiday List Name", None),
+        ("from_date", "Date", "From Date", None),
+        ("to_date", "Date", "To Date", None),
+        ("total_holidays", "Int", "Total Holidays", None),
+        ("weekly_off", "Select", "Weekly Off", "\nSunday\nMonday\nSaturday"),
+        ("holidays", "Table", "Holidays", "Holiday"),
+    ]),
+    "Holiday": ("Single holiday row", False, [
+        ("holiday_date", "Date", "Date", None),
+        ("description", "Text Editor", "Description", None),
+        ("weekly_off", "Check", "Weekly Off", None),
+    ]),
+}
+
+
+# ---------------------------------------------------------------------
+# RECORDS
+# ---------------------------------------------------------------------
+
+FIRST_NAMES = [
+    "John", "Priya", "Ahmed", "Maria", "Wei", "Fatima", "Carlos", "Anita",
+    "David", "Aisha", "Ravi", "Elena", "Omar", "Sofia", "Kenji", "Grace",
+]
+LAST_NAMES = [
+    "Smith", "Sharma", "Khan", "Garcia", "Chen", "Ali", "Lopez", "Nair",
+    "Brown", "Yusuf", "Menon", "Petrova", "Haddad", "Rossi", "Tanaka", "Okafor",
+]
+
+DEPARTMENTS = ["Sales", "Human Resources", "Engineering", "Finance", "Operations", "Support"]
+DESIGNATIONS = ["Manager", "Engineer", "Analyst", "Executive", "Intern", "Director"]
+LEAVE_TYPES = ["Casual Leave", "Sick Leave", "Privilege Leave", "Leave Without Pay", "Compensatory Off"]
+SHIFT_TYPES = ["Day Shift", "Night Shift", "General Shift", "Evening Shift"]
+HOLIDAY_LISTS = ["Holidays 2025", "Holidays 2026"]
+
+
+def build_employees() -> list:
+    """
+    FIRST_NAMES x LAST_NAMES employees (256), deterministic.
+    """
+    employees = []
+    for i, (first, last) in enumerate(
+        (f, l) for f in FIRST_NAMES for l in LAST_NAMES
+    ):
+        employees.append(frappe._dict({
+            "name": f"HR-EMP-{i + 1:05d}",
+            "employee_name": f"{first} {last}",
+            "status": "Active" if i % 10 else "Left",
+            "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+            "designation": DESIGNATIONS[i % len(DESIGNATIONS)],
+        }))
+    return employees
+
+
+def build_records() -> dict:
+    return {
+        "Employee": build_employees(),
+        "Department": [frappe._dict(name=d, department_name=d, is_group=0) for d in DEPARTMENTS],
+        "Designation": [frappe._dict(name=d, designation_name=d) for d in DESIGNATIONS],
+        "Leave Type": [frappe._dict(name=d, leave_type_name=d) for d in LEAVE_TYPES],
+        "Shift Type": [frappe._dict(name=d) for d in SHIFT_TYPES],
+        "Holiday List": [frappe._dict(name=d, holiday_list_name=d) for d in HOLIDAY_LISTS],
+    }
+
+
+# ---------------------------------------------------------------------
+# FRAPPE SHIMS
+# ---------------------------------------------------------------------
+
+def fixture_meta(doctype: str):
+    if doctype not in FIXTURE_DOCTYPES:
+        raise frappe.DoesNotExistError(f"DocType {doctype} not found")
+
+    description, is_submittable, fields = FIXTURE_DOCTYPES[doctype]
+
+    return frappe._dict({
+        "name": doctype,
+        "module": "HR",
+        "description": description,
+        "is_submittable": int(is_submittable),
+        "istable": int(doctype in {"Salary Detail", "Holiday"}),
+        "fields": [
+            frappe._dict({
+                "fieldname": fieldname,
+                "fieldtype": fieldtype,
+                "label": label,
+                "options": options,
+                "description": None,
+            })
+            for fieldname, fieldtype, label, options in fields
+        ],
+    })
+
+
+def _matches(record: dict, filters) -> bool:
+    if isinstance(filters, dict):
+        filters = [[k, *(v if isinstance(v, (list, tuple)) else ["=", v])] for k, v in filters.items()]
+
+    for field, op, value in filters or []:
+        actual = record.get(field)
+        actual = "" if actual is None else str(actual)
+        op = op.lower()
+
+        if op == "=" and actual != str(value):
+            return False
+        if op == "like" and value.strip("%").lower() not in actual.lower():
+            return False
+        if op == "in" and actual not in value:
+            return False
+
+    return True
+
+
+def make_get_all(records: dict, fallback):
+    """
+    frappe.get_all over fixture records for fixture doctypes,
+    the real implementation for anything else.
+    """
+    def get_all(doctype, filters=None, fields=None, **kwargs):
+        if doctype not in records:
+            return fallback(doctype, filters=filters, fields=fields, **kwargs)
+
+        fields = fields or ["name"]
+        if isinstance(fields, str):
+            fields = [fields]
+
+        or_filters = kwargs.get("or_filters")
+        rows = [
+            r for r in records[doctype]
+            if _matches(r, filters) and (not or_filters or any(_matches(r, [f]) for f in or_filters))
+        ]
+        if kwargs.get("limit") or kwargs.get("limit_page_length"):
+            rows = rows[: kwargs.get("limit") or kwargs.get("limit_page_length")]
+
+        return [frappe._dict({f: r.get(f) for f in fields}) for r in rows]
+
+    return get_all
+
+
+@contextlib.contextmanager
+def use_fixtures():
+    """
+    Serve fixture metas and records in place of the site's, so the
+    benchmark needs neither HRMS nor data.
+    """
+    records = build_records()
+
+    with mock.patch.object(frappe, "get_meta", fixture_meta), \
+            mock.patch.object(frappe, "get_all", make_get_all(records, frappe.get_all)):
+        yield records
@@ -0,0 +1,312 @@
+# query_builder/benchmarks/runner.py
+
+import contextlib
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from unittest import mock
+
+import frappe
+
+from query_builder.benchmarks.corpus import DEFAULT_CORPUS_SIZE, build_corpus
+from query_builder.benchmarks.fixtures import FIXTURE_DOCTYPES, use_fixtures
+from query_builder.benchmarks.stub_llm import StubLLMServer
+from query_builder.utils import entity_index, metrics, schema_registry, vector_store
+from query_builder.utils.embedding_cache import get_cache_stats
+from query_builder.utils.join_graph import get_join_table
+from query_builder.utils.join_planner import build_joins
+from query_builder.utils.schema_registry import clear_schema_registry
+from query_builder.utils.schema_trimmer import build_schema_prompt, trim_schema
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+RESULTS_FORMAT = 1
+
+DEFAULT_LLM_LATENCY_MS = 50.0
+
+# calls per target re-run under tracemalloc (it slows everything down,
+# so memory is measured in a separate, smaller pass)
+MEMORY_SAMPLE = 50
+
+# relative change beyond which compare_results reports a regression
+DEFAULT_THRESHOLD = 0.15
+
+# (metric, higher is better)
+COMPARED_METRICS = (
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("throughput_per_s", True),
+    ("peak_memory_kb", False),
+)
+
+CHILD_DOCTYPES = {"Salary Detail", "Holiday"}
+
+# redis version keys used while benchmarking, instead of the site's
+BENCH_SCHEMA_VERSION_KEY = "query_builder:benchmark:schema_version"
+BENCH_GENERATION_KEY = "query_builder:benchmark:vector_store_generation"
+
+# request-local memos of those versions
+LOCAL_VERSION_MEMOS = ("query_builder_schema_version", "query_builder_store_generation")
+
+
+# ---------------------------------------------------------------------
+# MEASUREMENT
+# ---------------------------------------------------------------------
+
+def percentile(ordered: list, q: float):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+def measure(fn, items: list) -> dict:
+    """
+    Call fn(item) for every item: latency percentiles, throughput,
+    errors, then tracemalloc peak over the first MEMORY_SAMPLE items.
+    """
+    latencies = []
+    errors = 0
+
+    wall_start = time.perf_counter()
+    for item in items:
+        start = time.perf_counter()
+        try:
+            fn(item)
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    wall = time.perf_counter() - wall_start
+
+    tracemalloc.start()
+    try:
+        for item in items[:MEMORY_SAMPLE]:
+            with contextlib.suppress(Exception):
+                fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "calls": len(items),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(len(items) / wall, 2) if wall else None,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "p50_ms": percentile(ordered, 0.5),
+        "p95_ms": percentile(ordered, 0.95),
+        "p99_ms": percentile(ordered, 0.99),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+# ---------------------------------------------------------------------
+# ENVIRONMENT
+# ---------------------------------------------------------------------
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(frappe.get_app_path("query_builder")),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return ""
+
+
+@contextlib.contextmanager
+def isolated_versions():
+    """
+    Schema version / store generation bumps go to benchmark keys, so the
+    site's workers keep their compiled schemas and collection handles.
+    """
+    def clear_memos():
+        for attr in LOCAL_VERSION_MEMOS:
+            if hasattr(frappe.local, attr):
+                delattr(frappe.local, attr)
+
+    saved = {attr: getattr(frappe.local, attr, None) for attr in LOCAL_VERSION_MEMOS}
+
+    with mock.patch.object(schema_registry, "SCHEMA_VERSION_KEY", BENCH_SCHEMA_VERSION_KEY), \
+            mock.patch.object(vector_store, "GENERATION_KEY", BENCH_GENERATION_KEY):
+        clear_memos()
+        try:
+            yield
+        finally:
+            frappe.cache().delete_value([BENCH_SCHEMA_VERSION_KEY, BENCH_GENERATION_KEY])
+
+            # back to the site's versions (re-read from redis when unset)
+            clear_memos()
+            for attr, value in saved.items():
+                if value is not None:
+                    setattr(frappe.local, attr, value)
+
+
+@contextlib.contextmanager
+def benchmark_environment(base_url: str, fixtures: bool):
+    """
+    Stub LLM, no intent / result caching, a throw-away Chroma dir,
+    benchmark-only version keys and (optionally) fixture metas. The
+    site's own index and caches are not touched.
+    """
+    overrides = {
+        "openrouter_base_url": base_url,
+        "openrouter_api_key": "benchmark",
+        "query_builder_llm_max_retries": 0,
+        "query_builder_intent_cache": False,
+        "query_builder_result_cache": False,
+    }
+
+    with contextlib.ExitStack() as stack:
+        chroma_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="qb_bench_chroma_"))
+
+        stack.enter_context(mock.patch.dict(frappe.local.conf, overrides))
+        stack.enter_context(mock.patch.dict(vector_store._chroma_dirs, {frappe.local.site: chroma_dir}))
+        stack.enter_context(isolated_versions())
+        if fixtures:
+            stack.enter_context(use_fixtures())
+            # entity indexes loaded from the site's own records
+            stack.enter_context(mock.patch.dict(entity_index._indexes, clear=True))
+
+        clear_schema_registry()
+        vector_store.invalidate_collection()
+        try:
+            yield
+        finally:
+            vector_store.invalidate_collection()
+            clear_schema_registry()
+
+
+# ---------------------------------------------------------------------
+# RUN
+# ---------------------------------------------------------------------
+
+def get_join_cases(doctypes: list) -> list:
+    return [(base, target) for base in doctypes for target in doctypes if base != target]
+
+
+def run_benchmark(
+    corpus_size: int = DEFAULT_CORPUS_SIZE,
+    llm_latency_ms: float = DEFAULT_LLM_LATENCY_MS,
+    stream: bool = False,
+    fixtures: bool = True,
+) -> dict:
+    """
+    Benchmark extract_intent, retrieve_schema, trim_schema and
+    build_joins over the generated corpus, offline.
+    """
+    # late import: api.intent pulls in the whole pipeline
+    from query_builder.api.intent import run_extract_intent
+
+    corpus = build_corpus(corpus_size)
+    queries = [entry["query"] for entry in corpus]
+    intents = {entry["key"]: entry["intent"] for entry in corpus}
+
+    doctypes = [dt for dt in FIXTURE_DOCTYPES if dt not in CHILD_DOCTYPES]
+    if not fixtures:
+        doctypes = list(vector_store.INDEXED_DOCTYPES)
+
+    on_stage = (lambda stage, data: None) if stream else None
+    results = {}
+
+    with StubLLMServer(intents, latency_ms=llm_latency_ms) as stub, \
+            benchmark_environment(stub.base_url, fixtures):
+
+        start = time.perf_counter()
+        vector_store.rebuild_vector_store(doctypes)
+        index_build_s = round(time.perf_counter() - start, 3)
+
+        # model load, first Chroma open and schema compilation stay out of the numbers
+        run_extract_intent(queries[0], on_stage=on_stage)
+        metrics.reset_metrics()
+
+        results["extract_intent"] = measure(
+            lambda q: run_extract_intent(q, on_stage=on_stage), queries
+        )
+        stages = metrics.get_registry().snapshot()
+
+        results["retrieve_schema"] = measure(vector_store.retrieve_schema, queries)
+
+        retrieved = [(vector_store.retrieve_schema(q), q) for q in queries]
+        results["trim_schema"] = measure(
+            lambda pair: build_schema_prompt(trim_schema(*pair)), retrieved
+        )
+
+        table = get_join_table(doctypes)
+        results["build_joins"] = measure(
+            lambda case: build_joins(base_doctype=case[0], required_doctypes={case[1]}, table=table),
+            get_join_cases(doctypes),
+        )
+
+        llm_requests = stub.requests
+
+    return {
+        "format": RESULTS_FORMAT,
+        "meta": {
+            "commit": get_git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "corpus_size": len(queries),
+            "llm_latency_ms": llm_latency_ms,
+            "stream": stream,
+            "fixtures": fixtures,
+        },
+        "index_build_s": index_build_s,
+        "targets": results,
+        "stages": stages["stages"],
+        "counters": stages["counters"],
+        "embedding_cache": get_cache_stats(),
+        "llm_requests": llm_requests,
+    }
+
+
+# ---------------------------------------------------------------------
+# COMPARISON
+# ---------------------------------------------------------------------
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Metrics of `current` that are worse than `baseline` by more than
+    `threshold` (relative), per target.
+    """
+    regressions = []
+
+    for target, base in baseline.get("targets", {}).items():
+        cur = current.get("targets", {}).get(target)
+        if not cur:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append({
+                    "target": target,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": round(change, 4),
+                })
+
+        if cur.get("errors", 0) > base.get("errors", 0):
+            regressions.append({
+                "target": target,
+                "metric": "errors",
+                "baseline": base.get("errors", 0),
+                "current": cur["errors"],
+                "change": None,
+            })
+
+    return regressions
@@ -0,0 +1,132 @@
+# query_builder/benchmarks/stub_llm.py
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from query_builder.benchmarks.corpus import intent_key
+
+QUERY_PATTERN = re.compile(r'User Query:\s*"(.*)"', re.S)
+DOCTYPE_PATTERN = re.compile(r"^DocType: (.+)$", re.M)
+
+# characters per streamed delta
+STREAM_CHUNK = 16
+
+
+def fallback_intent(prompt: str) -> dict:
+    """
+    Answer for unknown queries: list the first retrieved DocType.
+    """
+    match = DOCTYPE_PATTERN.search(prompt)
+    return {
+        "action": "list",
+        "doctype": match.group(1).strip() if match else "Employee",
+        "fields": ["name"],
+        "filters": [],
+        "confidence": 0.7,
+    }
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self.send_error(404)
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        payload = json.loads(body or b"{}")
+        prompt = payload["messages"][-1]["content"]
+
+        stub = self.server.stub
+        time.sleep(stub.latency_ms / 1000)
+
+        match = QUERY_PATTERN.search(prompt)
+        key = intent_key(match.group(1)) if match else ""
+        intent = stub.intents.get(key) or fallback_intent(prompt)
+        content = json.dumps(intent)
+
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        }
+
+        with stub.lock:
+            stub.requests += 1
+
+        if payload.get("stream"):
+            self._stream(content, usage)
+        else:
+            self._json({
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": usage,
+            })
+
+    def _json(self, data):
+        raw = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _stream(self, content, usage):
+        events = [
+            {"choices": [{"delta": {"content": content[i:i + STREAM_CHUNK]}}]}
+            for i in range(0, len(content), STREAM_CHUNK)
+        ]
+        events.append({"choices": [], "usage": usage})
+
+        raw = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+        raw = raw.encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class StubLLMServer:
+    """
+    OpenRouter-compatible /chat/completions on 127.0.0.1 answering with
+    canned intents after `latency_ms`. Use as a context manager.
+    """
+
+    def __init__(self, intents: dict, latency_ms: float = 0, port: int = 0):
+        self.intents = intents
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), StubLLMHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,78 @@
+import json
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("serve-embeddings")
+@click.option("--socket", "socket_path", help="Unix socket path (defaults to query_builder_embedding_socket)")
+@click.option("--model", "model_name", help="SentenceTransformer model to preload")
+def serve_embeddings(socket_path=None, model_name=None):
+    """Run the shared embedding process used when query_builder_embedding_mode = "socket"."""
+    import frappe
+    from frappe.utils import get_bench_path
+
+    from query_builder.utils import embedding_provider
+
+    # conf lookups below only need common_site_config
+    frappe.init(site="", sites_path=f"{get_bench_path()}/sites")
+
+    socket_path = socket_path or embedding_provider.get_socket_path()
+    model_name = model_name or embedding_provider.get_model_name()
+
+    click.echo(f"Serving {model_name} embeddings on {socket_path}")
+    embedding_provider.serve_embeddings(socket_path, model_name)
+
+
+@click.command("run-query-benchmark")
+@click.option("--size", default=300, show_default=True, help="Number of corpus queries")
+@click.option("--llm-latency", default=50.0, show_default=True, help="Stub LLM latency (ms)")
+@click.option("--stream", is_flag=True, help="Use the streaming LLM path")
+@click.option("--site-metas", is_flag=True, help="Use the site's DocType metas instead of fixtures")
+@click.option("--output", help="Write JSON results to this file")
+@click.option("--baseline", help="Earlier results file to compare against")
+@click.option("--threshold", default=0.15, show_default=True, help="Allowed relative regression")
+@pass_context
+def run_query_benchmark(
+    context, size, llm_latency, stream, site_metas, output=None, baseline=None, threshold=0.15
+):
+    """Benchmark the NL → intent pipeline offline against a stub LLM."""
+    import frappe
+
+    from query_builder.benchmarks.runner import compare_results, run_benchmark
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        results = run_benchmark(
+            corpus_size=size,
+            llm_latency_ms=llm_latency,
+            stream=stream,
+            fixtures=not site_metas,
+        )
+    finally:
+        frappe.destroy()
+
+    text = json.dumps(results, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+    else:
+        click.echo(text)
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare_results(json.load(f), results, threshold)
+
+        for r in regressions:
+            click.secho(
+                f"REGRESSION {r['target']}.{r['metric']}: {r['baseline']} → {r['current']}",
+                fg="red",
+            )
+        if regressions:
+            raise SystemExit(1)
+
+        click.secho("No regressions", fg="green")
+
+
+commands = [serve_embeddings, run_query_benchmark]
@@ -145,6 +145,76 @@ app_license = "mit"
 # 	}
 # }
 
+doc_events = {
+	"*": {
+		"on_update": "query_builder.utils.result_cache.on_doc_change",
+		"on_update_after_submit": "query_builder.utils.result_cache.on_doc_change",
+		"on_submit": "query_builder.utils.result_cache.on_doc_change",
+		"on_cancel": "query_builder.utils.result_cache.on_doc_change",
+		"on_trash": "query_builder.utils.result_cache.on_doc_change",
+	},
+	"DocType": {
+		"on_update": [
+			"query_builder.utils.schema_registry.on_schema_change",
+			"query_builder.utils.vector_store.on_schema_change",
+		],
+		"on_trash": [
+			"query_builder.utils.schema_registry.on_schema_change",
+			"query_builder.utils.vector_store.on_schema_change",
+		],
+	},
+	"Custom Field": {
+		"on_update": [
+			"query_builder.utils.schema_registry.on_schema_change",
+			"query_builder.utils.vector_store.on_schema_change",
+		],
+		"on_trash": [
+			"query_builder.utils.schema_registry.on_schema_change",
+			"query_builder.utils.vector_store.on_schema_change",
+		],
+	},
+	"Employee": {
+		"on_update": "query_builder.utils.entity_index.on_entity_change",
+		"on_trash": "query_builder.utils.entity_index.on_entity_change",
+		"after_rename": "query_builder.utils.entity_index.on_entity_change",
+	},
+	"Department": {
+		"on_update": "query_builder.utils.entity_index.on_entity_change",
+		"on_trash": "query_builder.utils.entity_index.on_entity_change",
+		"after_rename": "query_builder.utils.entity_index.on_entity_change",
+	},
+	"Designation": {
+		"on_update": "query_builder.utils.entity_index.on_entity_change",
+		"on_trash": "query_builder.utils.entity_index.on_entity_change",
+		"after_rename": "query_builder.utils.entity_index.on_entity_change",
+	},
+	"Leave Type": {
+		"on_update": "query_builder.utils.entity_index.on_entity_change",
+		"on_trash": "query_builder.utils.entity_index.on_entity_change",
+		"after_rename": "query_builder.utils.entity_index.on_entity_change",
+	},
+	"Shift Type": {
+		"on_update": "query_builder.utils.entity_index.on_entity_change",
+		"on_trash": "query_builder.utils.entity_index.on_entity_change",
+		"after_rename": "query_builder.utils.entity_index.on_entity_change",
+	},
+	"Holiday List": {
+		"on_update": "query_builder.utils.entity_index.on_entity_change",
+		"on_trash": "query_builder.utils.entity_index.on_entity_change",
+		"after_rename": "query_builder.utils.entity_index.on_entity_change",
+	},
+	"Property Setter": {
+		"on_update": [
+			"query_builder.utils.schema_registry.on_schema_change",
+			"query_builder.utils.vector_store.on_schema_change",
+		],
+		"on_trash": [
+			"query_builder.utils.schema_registry.on_schema_change",
+			"query_builder.utils.vector_store.on_schema_change",
+		],
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -199,6 +269,10 @@ app_license = "mit"
 # before_request = ["query_builder.utils.before_request"]
 # after_request = ["query_builder.utils.after_request"]
 
+# Loads the embedding model in web workers when `query_builder_embedding_warmup` is set
+# (RQ workers load it on first encode; socket mode never loads it in workers)
+before_request = ["query_builder.utils.embedding_provider.warmup"]
+
 # Job Events
 # ----------
 # before_job = ["query_builder.utils.before_job"]
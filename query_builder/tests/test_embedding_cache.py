@@ -0,0 +1,149 @@
+# query_builder/tests/test_embedding_cache.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import embedding_cache
+from query_builder.utils.embedding_cache import (
+    CONF_REDIS,
+    REDIS_PREFIX,
+    QueryEmbeddingCache,
+    embed_queries,
+    embed_query,
+)
+
+
+class FakeProvider:
+    model_name = "test-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get_value(self, key):
+        return self.store.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.store[key] = value
+
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = QueryEmbeddingCache(maxsize=2)
+        cache.set("a", [1.0])
+        cache.set("b", [2.0])
+
+        cache.get("a")          # b is now least recently used
+        cache.set("c", [3.0])
+
+        self.assertEqual(cache.get("a"), [1.0])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), [3.0])
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_ttl_expiry(self):
+        cache = QueryEmbeddingCache(ttl=10)
+
+        with mock.patch.object(embedding_cache.time, "monotonic", return_value=100.0):
+            cache.set("a", [1.0])
+        with mock.patch.object(embedding_cache.time, "monotonic", return_value=109.0):
+            self.assertEqual(cache.get("a"), [1.0])
+        with mock.patch.object(embedding_cache.time, "monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_counters(self):
+        cache = QueryEmbeddingCache()
+        cache.set("a", [1.0])
+        cache.set("b", [2.0], from_redis=True)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["redis_hits"], stats["misses"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], round(2 / 3, 4))
+
+
+class EmbedTestCase(unittest.TestCase):
+    def setUp(self):
+        self.provider = FakeProvider()
+        self.cache = QueryEmbeddingCache()
+        self.redis = FakeRedis()
+
+        for patcher in (
+            mock.patch.object(embedding_cache, "get_embedding_provider", return_value=self.provider),
+            mock.patch.object(embedding_cache, "get_embedding_cache", return_value=self.cache),
+            mock.patch.object(frappe, "cache", return_value=self.redis, create=True),
+            mock.patch.dict(frappe.conf, {CONF_REDIS: 1}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def counters(self):
+        stats = self.cache.stats()
+        return stats["hits"], stats["redis_hits"], stats["misses"]
+
+
+class TestEmbedQuery(EmbedTestCase):
+    def test_normalized_query_hits_worker_cache(self):
+        first = embed_query("Employees  in HR")
+        second = embed_query("employees in hr")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.provider.calls, [["employees in hr"]])
+        self.assertEqual(self.counters(), (1, 0, 1))
+
+    def test_redis_tier_shared_between_workers(self):
+        embed_query("leave balance")
+
+        # another worker: empty local cache, same redis
+        self.cache.clear()
+        vector = embed_query("leave balance")
+
+        self.assertEqual(vector, [13.0])
+        self.assertEqual(len(self.provider.calls), 1)
+        self.assertEqual(self.counters(), (0, 1, 0))
+        self.assertTrue(all(key.startswith(REDIS_PREFIX) for key in self.redis.store))
+
+    def test_redis_tier_off(self):
+        frappe.conf[CONF_REDIS] = 0
+
+        embed_query("leave balance")
+
+        self.assertEqual(self.redis.store, {})
+
+
+class TestEmbedQueries(EmbedTestCase):
+    def test_misses_encoded_once_in_input_order(self):
+        embed_query("b")
+
+        vectors = embed_queries(["aaa", "b", "AAA", "cc"])
+
+        self.assertEqual(vectors, [[3.0], [1.0], [3.0], [2.0]])
+        self.assertEqual(self.provider.calls, [["b"], ["aaa", "cc"]])
+        self.assertEqual(self.counters(), (1, 0, 3))
+
+    def test_redis_hits_fill_worker_cache(self):
+        embed_queries(["aaa", "cc"])
+        self.cache.clear()
+
+        embed_queries(["aaa", "cc"])
+        embed_queries(["aaa"])
+
+        self.assertEqual(len(self.provider.calls), 1)
+        self.assertEqual(self.counters(), (1, 2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+# query_builder/tests/test_embedding_provider.py
+
+import os
+import socket
+import struct
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import embedding_provider
+from query_builder.utils.embedding_provider import (
+    CONF_MODE,
+    CONF_MODEL,
+    CONF_SOCKET,
+    CONF_WARMUP,
+    DEFAULT_MODEL_NAME,
+    EmbeddingProvider,
+    EmbeddingServer,
+    LocalEmbeddingProvider,
+    SocketEmbeddingProvider,
+    get_embedding_provider,
+    warmup,
+)
+
+
+class FakeLocalProvider(LocalEmbeddingProvider):
+    """
+    LocalEmbeddingProvider without sentence_transformers.
+    """
+
+    def load(self):
+        self._model = self.model_name
+        return self._model
+
+    def encode(self, texts):
+        if "boom" in texts:
+            raise ValueError("model failed")
+        return [[float(len(t)), float(len(self.model_name))] for t in texts]
+
+
+class ProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        embedding_provider._providers.clear()
+        self.addCleanup(embedding_provider._providers.clear)
+
+        patcher = mock.patch.dict(frappe.conf, {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestProviderSelection(ProviderTestCase):
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            EmbeddingProvider("m")
+
+    def test_local_by_default(self):
+        provider = get_embedding_provider()
+
+        self.assertIsInstance(provider, LocalEmbeddingProvider)
+        self.assertEqual(provider.model_name, DEFAULT_MODEL_NAME)
+        self.assertFalse(provider.loaded)
+        self.assertIs(get_embedding_provider(), provider)
+
+    def test_socket_mode(self):
+        frappe.conf.update({CONF_MODE: "socket", CONF_SOCKET: "/tmp/embed.sock", CONF_MODEL: "m"})
+
+        provider = get_embedding_provider()
+
+        self.assertIsInstance(provider, SocketEmbeddingProvider)
+        self.assertEqual((provider.model_name, provider.socket_path), ("m", "/tmp/embed.sock"))
+
+    def test_config_change_gives_new_provider(self):
+        first = get_embedding_provider()
+        frappe.conf[CONF_MODEL] = "other-model"
+
+        second = get_embedding_provider()
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.model_name, "other-model")
+
+
+class TestWarmup(ProviderTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(embedding_provider, "LocalEmbeddingProvider", FakeLocalProvider)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_off_by_default(self):
+        warmup()
+        self.assertFalse(get_embedding_provider().loaded)
+
+    def test_loads_local_model(self):
+        frappe.conf[CONF_WARMUP] = 1
+        warmup()
+        self.assertTrue(get_embedding_provider().loaded)
+
+    def test_socket_mode_never_loads(self):
+        frappe.conf.update({CONF_WARMUP: 1, CONF_MODE: "socket", CONF_SOCKET: "/tmp/embed.sock"})
+
+        with mock.patch.object(FakeLocalProvider, "load") as load:
+            warmup()
+
+        load.assert_not_called()
+
+
+class TestSocketProtocol(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(embedding_provider, "LocalEmbeddingProvider", FakeLocalProvider)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "embed.sock")
+
+        self.server = EmbeddingServer(self.path, "default-model")
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_round_trip(self):
+        client = SocketEmbeddingProvider("abc", self.path)
+
+        self.assertEqual(client.encode(["hi", "there"]), [[2.0, 3.0], [5.0, 3.0]])
+
+    def test_one_provider_per_model(self):
+        SocketEmbeddingProvider("abc", self.path).encode(["x"])
+        SocketEmbeddingProvider("abc", self.path).encode(["y"])
+        SocketEmbeddingProvider("", self.path).encode(["z"])
+
+        self.assertEqual(sorted(self.server._providers), ["abc", "default-model"])
+
+    def test_server_error_raised_by_client(self):
+        with self.assertRaisesRegex(RuntimeError, "model failed"):
+            SocketEmbeddingProvider("abc", self.path).encode(["boom"])
+
+    def test_oversized_message_rejected(self):
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+
+        left.sendall(struct.pack("!I", embedding_provider.MAX_MESSAGE_BYTES + 1))
+
+        with self.assertRaises(ValueError):
+            embedding_provider._recv_message(right)
+
+    def test_closed_mid_message(self):
+        left, right = socket.socketpair()
+        self.addCleanup(right.close)
+
+        left.sendall(struct.pack("!I", 10) + b"{}")
+        left.close()
+
+        with self.assertRaises(ConnectionError):
+            embedding_provider._recv_message(right)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# query_builder/tests/test_entity_index.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import entity_index
+from query_builder.utils.entity_index import EntityIndex, get_entity_index, trigrams
+
+
+def make_index(labels: dict) -> EntityIndex:
+    index = EntityIndex()
+    for key, label in labels.items():
+        index.add(key, label)
+    return index
+
+
+class TestEntityIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = make_index({
+            "Sales - X": "Sales",
+            "Research and Development - X": "Research and Development",
+            "Human Resources - X": "Human Resources",
+        })
+
+    def test_match_tokens_needs_every_word(self):
+        self.assertEqual(self.index.match_tokens(["human", "resources"]), {"Human Resources - X"})
+        self.assertEqual(self.index.match_tokens(["human", "sales"]), set())
+        self.assertEqual(self.index.match_tokens(["marketing"]), set())
+
+    def test_match_phrase_is_the_whole_label(self):
+        self.assertEqual(self.index.match_phrase(["sales"]), {"Sales - X"})
+        self.assertEqual(self.index.match_phrase(["research"]), set())
+        self.assertEqual(self.index.max_phrase, 3)
+
+    def test_relabel_and_remove(self):
+        self.index.add("Sales - X", "Sales and Marketing")
+        self.assertEqual(self.index.match_phrase(["sales"]), set())
+        self.assertEqual(self.index.match_tokens(["marketing"]), {"Sales - X"})
+
+        self.index.remove("Sales - X")
+        self.index.remove("Sales - X")   # already gone: no-op
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.match_tokens(["sales"]), set())
+        self.assertFalse(any("Sales - X" in keys for keys in self.index.grams.values()))
+
+    def test_missing_label_falls_back_to_key(self):
+        self.index.add("Night Shift", None)
+        self.assertEqual(self.index.match_phrase(["night", "shift"]), {"Night Shift"})
+
+    def test_fuzzy_ranks_by_trigram_dice(self):
+        hits = self.index.fuzzy("human resorces")
+        self.assertEqual([key for key, _ in hits], ["Human Resources - X"])
+        self.assertGreaterEqual(hits[0][1], 0.7)
+
+        self.assertEqual(self.index.fuzzy("logistics"), [])
+        self.assertEqual(self.index.fuzzy(""), [])
+
+    def test_trigrams_pad_and_normalize(self):
+        self.assertEqual(trigrams("Ab"), {"  a", " ab", "ab "})
+        self.assertEqual(trigrams("AB!"), trigrams("ab"))
+
+
+class TestIncrementalRefresh(unittest.TestCase):
+    """
+    get_entity_index over a stubbed change log: (seq, names) as read
+    together by read_changes.
+    """
+
+    def setUp(self):
+        self.records = {"Sales - X": "Sales"}
+        self.seq = 0
+        self.log = []
+        self.fetches = []
+
+        def fetch(doctype, names=None):
+            self.fetches.append(names)
+            keys = self.records if names is None else [n for n in names if n in self.records]
+            return [{"name": key, "department_name": self.records[key]} for key in keys]
+
+        for patcher in (
+            mock.patch.object(entity_index, "_fetch_records", fetch),
+            mock.patch.object(entity_index, "read_changes", lambda doctype: (self.seq, list(self.log))),
+            mock.patch.object(entity_index, "get_entity_seq", lambda doctype: self.seq),
+            mock.patch.object(frappe.local, "site", "test_entity_index", create=True),
+            mock.patch.object(frappe.local, "query_builder_entity_seqs", {}, create=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        entity_index._indexes.pop(("test_entity_index", "Department"), None)
+        self.addCleanup(entity_index._indexes.pop, ("test_entity_index", "Department"), None)
+
+    def change(self, name, label=None):
+        if label is None:
+            self.records.pop(name, None)
+        else:
+            self.records[name] = label
+        self.seq += 1
+        self.log.append(name)
+
+    def test_applies_only_the_missed_log_entries(self):
+        self.change("Old - X", "Old")
+        index = get_entity_index("Department")
+        self.assertEqual(set(index.labels), {"Sales - X", "Old - X"})
+
+        self.change("HR - X", "HR")
+        self.change("Old - X")
+
+        self.assertIs(get_entity_index("Department"), index)
+        self.assertEqual(set(index.labels), {"Sales - X", "HR - X"})
+        self.assertEqual(self.fetches[-1], {"HR - X", "Old - X"})
+
+    def test_rebuilds_when_the_log_no_longer_covers_the_gap(self):
+        index = get_entity_index("Department")
+
+        self.change("HR - X", "HR")
+        self.change("Ops - X", "Ops")
+        del self.log[0]   # trimmed past this worker's seq
+
+        rebuilt = get_entity_index("Department")
+        self.assertIsNot(rebuilt, index)
+        self.assertIsNone(self.fetches[-1])
+        self.assertEqual(set(rebuilt.labels), {"Sales - X", "HR - X", "Ops - X"})
+
+    def test_rebuilds_when_the_counter_went_back(self):
+        self.change("HR - X", "HR")
+        index = get_entity_index("Department")
+
+        # redis flushed: seq restarts below this worker's
+        self.seq, self.log = 0, []
+
+        self.assertIsNot(get_entity_index("Department"), index)
@@ -0,0 +1,54 @@
+# query_builder/tests/test_entity_resolver.py
+
+import unittest
+
+from query_builder.utils.entity_index import EntityIndex, tokenize
+from query_builder.utils.entity_resolver import find_link_mentions
+
+
+def make_index(labels: dict) -> EntityIndex:
+    index = EntityIndex()
+    for key, label in labels.items():
+        index.add(key, label)
+    return index
+
+
+class TestFindLinkMentions(unittest.TestCase):
+    def setUp(self):
+        self.indexes = {
+            "Department": make_index({
+                "Sales - X": "Sales",
+                "Research and Development - X": "Research and Development",
+                "Human Resources - X": "Human Resources",
+            }),
+            "Leave Type": make_index({name: name for name in ("Casual Leave", "Sick Leave")}),
+            "Shift Type": make_index({name: name for name in ("Night Shift", "Day Shift")}),
+        }
+
+    def mentions(self, query):
+        return [
+            (" ".join(tokenize(query)[i:j]), doctype, keys)
+            for i, j, doctype, keys in find_link_mentions(tokenize(query), self.indexes)
+        ]
+
+    def test_whole_labels(self):
+        self.assertEqual(
+            self.mentions("research and development staff on casual leave"),
+            [
+                ("research and development", "Department", {"Research and Development - X"}),
+                ("casual leave", "Leave Type", {"Casual Leave"}),
+            ],
+        )
+
+    def test_one_word_labels_need_a_cue(self):
+        self.assertEqual(self.mentions("sales dept"), [("sales", "Department", {"Sales - X"})])
+        self.assertEqual(self.mentions("sales"), [])
+
+    def test_fuzzy_before_a_cue(self):
+        self.assertEqual(self.mentions("employees in sals dept"), [("sals", "Department", {"Sales - X"})])
+        self.assertEqual(self.mentions("who worked the nigth shift"), [("nigth shift", "Shift Type", {"Night Shift"})])
+
+    def test_cues_and_quantifiers_alone_name_no_value(self):
+        self.assertEqual(self.mentions("list all departments"), [])
+        self.assertEqual(self.mentions("count of every shift"), [])
+        self.assertEqual(self.mentions("leave"), [])
@@ -0,0 +1,55 @@
+# query_builder/tests/test_field_index.py
+
+import unittest
+
+from query_builder.utils.field_index import FIELD_KIND, SUMMARY_KIND, aggregate_chunk_hits
+
+
+def chunk(doctype, fieldname=None):
+    meta = {"doctype": doctype, "module": "HR", "is_submittable": 0}
+    if fieldname:
+        return {**meta, "kind": FIELD_KIND, "fieldname": fieldname}
+    return {**meta, "kind": SUMMARY_KIND}
+
+
+class TestAggregateChunkHits(unittest.TestCase):
+    def test_ranked_by_best_chunk_with_matched_fields(self):
+        hits = [
+            ("field::Attendance::status", chunk("Attendance", "status"), 0.1),
+            ("summary::Employee", chunk("Employee"), 0.2),
+            ("field::Attendance::attendance_date", chunk("Attendance", "attendance_date"), 0.3),
+            ("field::Employee::department", chunk("Employee", "department"), 0.4),
+        ]
+        ids, metadatas, distances = zip(*hits, strict=True)
+
+        result = aggregate_chunk_hits(ids, None, metadatas, distances, top_k=5)
+
+        self.assertEqual(result["ids"], [["schema::Attendance", "schema::Employee"]])
+        self.assertEqual(result["distances"], [[0.1, 0.2]])
+        self.assertEqual(result["documents"], [[None, None]])
+
+        attendance, employee = result["metadatas"][0]
+        self.assertEqual(attendance["matched_fields"], ["status", "attendance_date"])
+        self.assertEqual(employee["matched_fields"], ["department"])
+        self.assertEqual(employee["module"], "HR")
+
+    def test_top_k_and_first_document_kept(self):
+        result = aggregate_chunk_hits(
+            ["a", "b", "c"],
+            ["attendance status", "employee", "attendance date"],
+            [chunk("Attendance", "status"), chunk("Employee"), chunk("Attendance", "attendance_date")],
+            [0.1, 0.2, 0.3],
+            top_k=1,
+        )
+
+        self.assertEqual(result["ids"], [["schema::Attendance"]])
+        self.assertEqual(result["documents"], [["attendance status"]])
+
+    def test_summary_only_hit_has_no_matched_fields(self):
+        result = aggregate_chunk_hits(["s"], None, [chunk("Employee")], [0.5], top_k=3)
+
+        self.assertEqual(result["metadatas"][0][0]["matched_fields"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+# query_builder/tests/test_index_advisor.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import index_advisor, schema_registry
+from query_builder.utils.index_advisor import (
+    build_index_report,
+    create_index,
+    extract_usage_patterns,
+    is_covered,
+)
+from query_builder.utils.join_graph import child_condition, link_condition
+
+SCHEMAS = {
+    "Attendance": {
+        "doctype": "Attendance",
+        "fields": [
+            {"fieldname": "employee", "type": "Link"},
+            {"fieldname": "status", "type": "Select"},
+            {"fieldname": "company", "type": "Link"},
+            {"fieldname": "attendance_date", "type": "Date"},
+        ],
+    },
+    "Employee": {
+        "doctype": "Employee",
+        "fields": [{"fieldname": "department", "type": "Link"}],
+    },
+    "Salary Slip": {
+        "doctype": "Salary Slip",
+        "fields": [{"fieldname": "employee", "type": "Link"}],
+        "child_tables": [{"fieldname": "earnings", "child_doctype": "Salary Detail"}],
+    },
+    "Salary Detail": {
+        "doctype": "Salary Detail",
+        "fields": [{"fieldname": "amount", "type": "Currency"}],
+        "is_table": True,
+    },
+}
+
+
+class TestExtractUsagePatterns(unittest.TestCase):
+    def setUp(self):
+        schema_registry._registry.clear()
+        patcher = mock.patch.object(schema_registry, "extract_doctype_schema", SCHEMAS.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(schema_registry._registry.clear)
+
+    def test_filters_split_by_equality_and_range(self):
+        patterns = extract_usage_patterns({
+            "doctype": "Attendance",
+            "filters": [
+                {"field": "status", "op": "=", "value": "Absent"},
+                {"field": "company", "op": "in", "value": ["A", "B"]},
+                {"field": "attendance_date", "op": "between", "value": ["2024-01-01", "2024-01-31"]},
+                {"field": "employee", "op": "like", "value": "%EMP%"},
+                {"field": "unknown", "op": "=", "value": 1},
+            ],
+        })
+
+        self.assertEqual(patterns, [("Attendance", "filter", ["company", "status"], "attendance_date")])
+
+    def test_joins_and_group_by(self):
+        patterns = extract_usage_patterns({
+            "doctype": "Attendance",
+            "joins": [{
+                "doctype": "Employee",
+                "condition": link_condition("Attendance", "employee", "Employee"),
+            }],
+            "filters": [{"field": "Employee.department", "op": "=", "value": "HR"}],
+            "group_by": ["status"],
+        })
+
+        self.assertEqual(patterns, [
+            ("Employee", "filter", ["department"], None),
+            # Employee.name is the primary key: no pattern for it
+            ("Attendance", "join", ["employee"], None),
+            ("Attendance", "group_by", ["status"], None),
+        ])
+
+    def test_child_join_key(self):
+        patterns = extract_usage_patterns({
+            "doctype": "Salary Slip",
+            "joins": [{
+                "doctype": "Salary Detail",
+                "condition": child_condition("Salary Slip", "earnings", "Salary Detail"),
+            }],
+        })
+
+        self.assertEqual(patterns, [("Salary Detail", "join", ["parent"], None)])
+
+
+INDEXES = {
+    "PRIMARY": ["name"],
+    "employee_date": ["employee", "attendance_date"],
+    "status_company": ["status", "company"],
+}
+
+
+class TestIsCovered(unittest.TestCase):
+    def test_equality_columns_in_any_order(self):
+        self.assertTrue(is_covered(["company", "status"], None, INDEXES))
+        self.assertTrue(is_covered(["status"], None, INDEXES))
+
+    def test_range_column_must_follow_equality_columns(self):
+        self.assertTrue(is_covered(["employee"], "attendance_date", INDEXES))
+        self.assertFalse(is_covered(["attendance_date"], "employee", INDEXES))
+        self.assertFalse(is_covered(["status"], "attendance_date", INDEXES))
+
+    def test_leading_column_only(self):
+        # company is second in status_company
+        self.assertFalse(is_covered(["company"], None, INDEXES))
+
+
+USAGE = [
+    {"doctype": "Attendance", "kind": "filter", "equality_columns": ["status"], "range_column": "attendance_date", "count": 5},
+    {"doctype": "Attendance", "kind": "group_by", "equality_columns": ["status", "attendance_date"], "range_column": None, "count": 1},
+    {"doctype": "Attendance", "kind": "join", "equality_columns": ["employee"], "range_column": None, "count": 100},
+    {"doctype": "Employee", "kind": "filter", "equality_columns": ["department"], "range_column": None, "count": 2},
+    {"doctype": "Gone", "kind": "filter", "equality_columns": ["x"], "range_column": None, "count": 50},
+]
+
+ESTIMATES = {
+    ("Attendance", ("status", "attendance_date")): {"access_type": "ALL", "rows_examined": 10_000, "estimated_matches": 100},
+    ("Employee", ("department",)): {"access_type": "ALL", "rows_examined": 50_000, "estimated_matches": 500},
+}
+
+
+class TestBuildIndexReport(unittest.TestCase):
+    def indexes(self, doctype):
+        if doctype == "Gone":
+            raise Exception("Table 'tabGone' doesn't exist")
+        return {"employee": ["employee"]} if doctype == "Attendance" else {}
+
+    def test_ranked_by_rows_saved(self):
+        with (
+            mock.patch.object(index_advisor, "get_usage", return_value=USAGE),
+            mock.patch.object(index_advisor, "get_table_indexes", side_effect=self.indexes),
+            mock.patch.object(index_advisor, "explain_pattern", lambda dt, cols: ESTIMATES[(dt, tuple(cols))]),
+        ):
+            report = build_index_report()
+
+        self.assertEqual(
+            [(r["doctype"], r["columns"]) for r in report],
+            [("Employee", ["department"]), ("Attendance", ["status", "attendance_date"])],
+        )
+
+        attendance = report[1]
+        # filter and group_by usage on the same columns add up
+        self.assertEqual(attendance["kinds"], ["filter", "group_by"])
+        self.assertEqual(attendance["executions"], 6)
+        self.assertEqual(attendance["estimated_rows_saved"], 9_900 * 6)
+        self.assertEqual(attendance["index_name"], "qb_status_attendance_date")
+        self.assertEqual(report[0]["estimated_rows_saved"], 49_500 * 2)
+
+
+class TestCreateIndex(unittest.TestCase):
+    def setUp(self):
+        self.db = mock.Mock(has_column=mock.Mock(return_value=True))
+        patcher = mock.patch.object(frappe, "db", self.db, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create(self, columns, indexes):
+        with mock.patch.object(index_advisor, "get_table_indexes", return_value=indexes):
+            return create_index("Attendance", columns)
+
+    def test_refuses_covered_index(self):
+        with self.assertRaisesRegex(frappe.ValidationError, "already exists"):
+            # equality columns in another order, same trailing column
+            self.create(["company", "status", "employee"], {"status_company": ["status", "company", "employee"]})
+        with self.assertRaisesRegex(frappe.ValidationError, "already exists"):
+            self.create(["employee", "attendance_date"], {"employee_date": ["employee", "attendance_date"]})
+
+        self.db.add_index.assert_not_called()
+
+    def test_creates_missing_index(self):
+        name = self.create(["status", "attendance_date"], {"status": ["status"]})
+
+        self.assertEqual(name, "qb_status_attendance_date")
+        self.db.add_index.assert_called_once_with(
+            "Attendance", ["status", "attendance_date"], index_name="qb_status_attendance_date"
+        )
+
+    def test_rejects_unsafe_or_unknown_columns(self):
+        with self.assertRaisesRegex(frappe.ValidationError, "Unknown column"):
+            self.create(["status`; DROP TABLE x"], {})
+
+        self.db.has_column.return_value = False
+        with self.assertRaisesRegex(frappe.ValidationError, "Unknown column"):
+            self.create(["nope"], {})
+
+        with self.assertRaises(frappe.ValidationError):
+            self.create([], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
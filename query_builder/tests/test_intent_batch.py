@@ -0,0 +1,90 @@
+# query_builder/tests/test_intent_batch.py
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from query_builder.api import intent as intent_api
+from query_builder.api.intent import run_extract_intents_batch
+
+
+class TestExtractIntentsBatch(unittest.TestCase):
+    def setUp(self):
+        self.llm_calls = []
+        self.lock = threading.Lock()
+
+        for patcher in (
+            mock.patch.object(intent_api, "resolve_entities", side_effect=self.resolve),
+            mock.patch.object(intent_api, "retrieve_schemas", side_effect=self.retrieve),
+            mock.patch.object(intent_api, "trim_schema", lambda res, query, entities: res),
+            mock.patch.object(intent_api, "build_schema_prompt", lambda trimmed, entities: trimmed),
+            mock.patch.object(intent_api, "parse_intent_cached", side_effect=self.parse),
+            mock.patch.object(intent_api, "finalize_intent", side_effect=self.finalize),
+            mock.patch.object(intent_api, "has_checkin_semantic", return_value=False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def resolve(self, query):
+        if "ambiguous" in query:
+            return {"clarification_required": True, "message": "Which employee?"}
+        return {"query": query.lower(), "entities": []}
+
+    def retrieve(self, queries):
+        return [f"schema for {q.split()[0]}" for q in queries]
+
+    def parse(self, schema_text, query):
+        with self.lock:
+            self.llm_calls.append(query)
+        if "fail" in query:
+            raise RuntimeError("LLM timed out")
+        # later prompts finish first
+        time.sleep(0.05 / (len(self.llm_calls) + 1))
+        return {"doctype": schema_text, "query": query}
+
+    def finalize(self, raw, rewritten, checkin_semantic):
+        return {"intent": raw["query"]}
+
+    def run_batch(self, queries):
+        return run_extract_intents_batch(queries, concurrency=4)
+
+    def test_results_in_input_order(self):
+        queries = ["Attendance today", "Employee list", "Leave balance", "Salary slips"]
+
+        results = self.run_batch(queries)
+
+        self.assertEqual([r["query"] for r in results], queries)
+        self.assertEqual([r["result"]["intent"] for r in results], [q.lower() for q in queries])
+
+    def test_identical_prompts_call_llm_once(self):
+        results = self.run_batch(["Attendance today", "attendance  today", "ATTENDANCE TODAY", "Employee list"])
+
+        self.assertEqual(sorted(self.llm_calls), ["attendance  today", "attendance today", "employee list"])
+        self.assertEqual(results[0]["result"], results[2]["result"])
+        self.assertEqual(results[2]["query"], "ATTENDANCE TODAY")
+
+    def test_failing_llm_call_is_a_per_item_error(self):
+        results = self.run_batch(["Attendance today", "Employee fail", "Employee fail", "Leave balance"])
+
+        self.assertEqual(results[1], {"query": "Employee fail", "error": "LLM timed out"})
+        self.assertEqual(results[2]["error"], "LLM timed out")
+        self.assertEqual(self.llm_calls.count("employee fail"), 1)
+        self.assertEqual(results[0]["result"]["intent"], "attendance today")
+        self.assertEqual(results[3]["result"]["intent"], "leave balance")
+
+    def test_clarification_and_entity_errors_skip_the_llm(self):
+        with mock.patch.object(intent_api, "resolve_entities", side_effect=[
+            {"clarification_required": True, "message": "Which employee?"},
+            RuntimeError("db down"),
+            {"query": "leave balance", "entities": []},
+        ]):
+            results = self.run_batch(["ambiguous", "broken", "Leave balance"])
+
+        self.assertTrue(results[0]["result"]["clarification_required"])
+        self.assertEqual(results[1], {"query": "broken", "error": "db down"})
+        self.assertEqual(self.llm_calls, ["leave balance"])
+
+
+if __name__ == "__main__":
+    unittest.main()
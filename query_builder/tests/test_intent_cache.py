@@ -0,0 +1,157 @@
+# query_builder/tests/test_intent_cache.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import intent_cache
+from query_builder.utils.intent_cache import (
+    CONF_DISTANCE,
+    CONF_ENABLED,
+    literal_tokens,
+    parse_intent_cached,
+)
+
+SCHEMA = "DocType: Attendance\nFields:\n- employee (Link, reference)"
+
+# unit vectors: "absent" queries close together, "leave" far away
+EMBEDDINGS = {
+    "absent": [1.0, 0.0],
+    "not present": [0.99, 0.14],
+    "leave": [0.0, 1.0],
+}
+
+
+def fake_embed(query):
+    for phrase, vector in EMBEDDINGS.items():
+        if phrase in query.lower():
+            return vector
+    return [0.5, 0.5]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get_value(self, key):
+        return self.store.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.store[key] = value
+
+
+class IntentCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.parse = mock.Mock(side_effect=lambda schema, query: {
+            "action": "list",
+            "doctype": "Attendance",
+            "filters": [{"field": "status", "op": "=", "value": query}],
+            "_meta": {"latency_ms": 812.5},
+        })
+
+        for patcher in (
+            mock.patch.object(frappe, "cache", return_value=self.redis, create=True),
+            mock.patch.object(intent_cache, "parse_intent", self.parse),
+            mock.patch.object(intent_cache, "embed_query", fake_embed),
+            mock.patch.dict(frappe.conf, {CONF_DISTANCE: 0.05}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestExactTier(IntentCacheTestCase):
+    def test_miss_then_exact_hit(self):
+        miss = parse_intent_cached(SCHEMA, "absent employees today")
+        hit = parse_intent_cached(SCHEMA, "absent employees today")
+
+        self.assertIs(miss["_meta"]["cache_hit"], False)
+        self.assertEqual(hit["_meta"]["cache_hit"], "exact")
+        self.assertEqual(hit["filters"], miss["filters"])
+        self.parse.assert_called_once()
+
+    def test_meta_contract(self):
+        parse_intent_cached(SCHEMA, "absent employees today")
+        hit = parse_intent_cached(SCHEMA, "absent employees today")
+
+        meta = hit["_meta"]
+        self.assertEqual(meta["original_latency_ms"], 812.5)
+        self.assertIsInstance(meta["latency_ms"], float)
+        self.assertNotIn("cache_distance", meta)
+
+    def test_hit_is_a_copy(self):
+        parse_intent_cached(SCHEMA, "absent employees today")
+        parse_intent_cached(SCHEMA, "absent employees today")["filters"].clear()
+
+        self.assertTrue(parse_intent_cached(SCHEMA, "absent employees today")["filters"])
+
+    def test_other_schema_misses(self):
+        parse_intent_cached(SCHEMA, "absent employees today")
+        parse_intent_cached(SCHEMA + "\n- status (Select, categorical)", "absent employees today")
+
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_disabled(self):
+        frappe.conf[CONF_ENABLED] = 0
+
+        parse_intent_cached(SCHEMA, "absent employees today")
+        parse_intent_cached(SCHEMA, "absent employees today")
+
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertEqual(self.redis.store, {})
+
+
+class TestSemanticTier(IntentCacheTestCase):
+    def test_hit_within_distance(self):
+        original = parse_intent_cached(SCHEMA, "absent employees today")
+        hit = parse_intent_cached(SCHEMA, "employees not present today")
+
+        self.assertEqual(hit["_meta"]["cache_hit"], "semantic")
+        self.assertLessEqual(hit["_meta"]["cache_distance"], 0.05)
+        self.assertEqual(hit["_meta"]["original_latency_ms"], 812.5)
+        self.assertEqual(hit["filters"], original["filters"])
+        self.parse.assert_called_once()
+
+    def test_miss_beyond_distance(self):
+        parse_intent_cached(SCHEMA, "absent employees today")
+        result = parse_intent_cached(SCHEMA, "employees on leave today")
+
+        self.assertIs(result["_meta"]["cache_hit"], False)
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_tier_off_at_zero_distance(self):
+        frappe.conf[CONF_DISTANCE] = 0
+
+        parse_intent_cached(SCHEMA, "absent employees today")
+        parse_intent_cached(SCHEMA, "employees not present today")
+
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_literal_tokens_never_shared(self):
+        parse_intent_cached(SCHEMA, "absent HR-EMP-0001 on 2024-03-01")
+
+        for query in (
+            "absent HR-EMP-0002 on 2024-03-01",   # other ID
+            "absent HR-EMP-0001 on 2024-03-02",   # other date
+            "absent HR-EMP-0001",                 # date dropped
+        ):
+            with self.subTest(query=query):
+                result = parse_intent_cached(SCHEMA, query)
+                self.assertIs(result["_meta"]["cache_hit"], False)
+
+        self.assertEqual(self.parse.call_count, 4)
+
+    def test_same_literals_shared(self):
+        parse_intent_cached(SCHEMA, "absent HR-EMP-0001 on 2024-03-01")
+        hit = parse_intent_cached(SCHEMA, "hr-emp-0001 not present on 2024-03-01")
+
+        self.assertEqual(hit["_meta"]["cache_hit"], "semantic")
+
+    def test_literal_tokens(self):
+        self.assertEqual(literal_tokens("Absent HR-EMP-0001 on 2024-03-01"), ["2024-03-01", "hr-emp-0001"])
+        self.assertEqual(literal_tokens("absent employees"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+# query_builder/tests/test_intent_executor.py
+
+import re
+import unittest
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import intent_executor, schema_registry
+from query_builder.utils.intent_executor import SEEK_NAME, SEEK_VALUE, compile_plan, iter_intent_rows
+from query_builder.utils.join_graph import child_condition
+
+SCHEMAS = {
+    "Attendance": {
+        "doctype": "Attendance",
+        "fields": [
+            {"fieldname": "employee", "type": "Link"},
+            {"fieldname": "attendance_date", "type": "Date"},
+            {"fieldname": "status", "type": "Select"},
+        ],
+        "links": [{"fieldname": "employee", "linked_doctype": "Employee"}],
+    },
+    "Salary Slip": {
+        "doctype": "Salary Slip",
+        "fields": [
+            {"fieldname": "employee", "type": "Link"},
+            {"fieldname": "gross_pay", "type": "Currency"},
+        ],
+        "child_tables": [{"fieldname": "earnings", "child_doctype": "Salary Detail"}],
+    },
+    "Salary Detail": {
+        "doctype": "Salary Detail",
+        "fields": [{"fieldname": "amount", "type": "Currency"}],
+        "is_table": True,
+    },
+}
+
+ATTENDANCE_INTENT = {
+    "action": "list",
+    "doctype": "Attendance",
+    "fields": ["name"],
+    "filters": [{"field": "attendance_date", "op": "between", "value": ["2024-01-01", "2024-01-31"]}],
+}
+
+
+class FakeDB:
+    """
+    frappe.db.sql over in-memory rows, honouring the keyset predicate
+    and LIMIT of the compiled plans.
+    """
+
+    def __init__(self, rows, seek_field):
+        self.rows = sorted(rows, key=lambda r: (r[seek_field], r["name"]))
+        self.seek_field = seek_field
+        self.queries = []
+
+    def sql(self, sql, params, as_dict=False, as_iterator=False):
+        self.queries.append(sql)
+        rows = self.rows
+
+        if "%(seek_name)s" in sql:
+            after = (params["seek_value"], params["seek_name"])
+            rows = [r for r in rows if (r[self.seek_field], r["name"]) > after]
+
+        limit = re.search(r"LIMIT (\d+)", sql)
+        if limit:
+            rows = rows[: int(limit.group(1))]
+
+        return iter([
+            {**r, SEEK_VALUE: r[self.seek_field], SEEK_NAME: r["name"]}
+            for r in rows
+        ])
+
+
+class SchemaTestCase(unittest.TestCase):
+    """
+    Compiled schemas served from SCHEMAS.
+    """
+
+    def setUp(self):
+        schema_registry._registry.clear()
+        intent_executor._plans.clear()
+
+        patcher = mock.patch.object(schema_registry, "extract_doctype_schema", SCHEMAS.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.addCleanup(schema_registry._registry.clear)
+        self.addCleanup(intent_executor._plans.clear)
+
+
+class TestKeysetPaging(SchemaTestCase):
+    def setUp(self):
+        super().setUp()
+
+        for patcher in (
+            mock.patch.object(intent_executor, "check_permissions", return_value=[]),
+            mock.patch.object(intent_executor, "record_intent_usage"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stream(self, intent, rows, seek_field, chunk_size):
+        db = FakeDB(rows, seek_field)
+        with mock.patch.object(frappe, "db", SimpleNamespace(sql=db.sql)):
+            return list(iter_intent_rows(intent, chunk_size=chunk_size)), db.queries
+
+    def test_seek_plan_orders_and_continues_after_last_row(self):
+        first = compile_plan(ATTENDANCE_INTENT, limit=2, seek=("attendance_date", False)).sql
+        after = compile_plan(ATTENDANCE_INTENT, limit=2, seek=("attendance_date", True)).sql
+
+        self.assertNotIn("%(seek_value)s", first)
+        self.assertIn("%(seek_value)s", after)
+        self.assertIn("%(seek_name)s", after)
+        self.assertIn("LIMIT 2", after)
+
+        order_by = after[after.index("ORDER BY"):]
+        self.assertLess(order_by.index("attendance_date"), order_by.index("name"))
+
+    def test_pages_cover_every_row_once(self):
+        rows = [
+            {"name": f"ATT-{i}", "attendance_date": date(2024, 1, 1 + i // 2)}
+            for i in range(5)
+        ]
+
+        streamed, queries = self.stream(ATTENDANCE_INTENT, rows, "attendance_date", chunk_size=2)
+
+        # ties on the seek value split across pages are resumed by name
+        self.assertEqual([r["name"] for r in streamed], [f"ATT-{i}" for i in range(5)])
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(all(SEEK_VALUE not in r and SEEK_NAME not in r for r in streamed))
+
+    def test_full_last_page_ends_on_empty_page(self):
+        rows = [{"name": f"ATT-{i}", "attendance_date": date(2024, 1, 1)} for i in range(4)]
+
+        streamed, queries = self.stream(ATTENDANCE_INTENT, rows, "attendance_date", chunk_size=2)
+
+        self.assertEqual(len(streamed), 4)
+        self.assertEqual(len(queries), 3)
+
+    def test_fanout_joins_stream_in_one_pass(self):
+        intent = {
+            "action": "list",
+            "doctype": "Salary Slip",
+            "fields": ["name", "Salary Detail.amount"],
+            "joins": [{
+                "doctype": "Salary Detail",
+                "field": "earnings",
+                "condition": child_condition("Salary Slip", "earnings", "Salary Detail"),
+            }],
+        }
+        # one slip, three earnings: a page of 2 would split the slip
+        rows = [{"name": "SLIP-1", "Salary Detail.amount": amount} for amount in (10, 20, 30)]
+
+        streamed, queries = self.stream(intent, rows, "name", chunk_size=2)
+
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("LIMIT", queries[0])
+
+
+EARNINGS_JOIN = {
+    "doctype": "Salary Detail",
+    "field": "earnings",
+    "condition": child_condition("Salary Slip", "earnings", "Salary Detail"),
+}
+
+
+class TestFanoutAggregates(SchemaTestCase):
+    """
+    Salary Slip LEFT JOIN Salary Detail repeats every slip once per
+    earning row.
+    """
+
+    def aggregate(self, function, field, strategy=None):
+        join = dict(EARNINGS_JOIN, strategy=strategy) if strategy else EARNINGS_JOIN
+        return compile_plan({
+            "action": "aggregate",
+            "doctype": "Salary Slip",
+            "joins": [join],
+            "filters": [{"field": "Salary Detail.amount", "op": ">", "value": 0}],
+            "aggregate": {"function": function, "field": field},
+        }).sql
+
+    def test_sum_over_parent_field_is_rejected(self):
+        with self.assertRaises(frappe.ValidationError):
+            self.aggregate("sum", "gross_pay")
+        with self.assertRaises(frappe.ValidationError):
+            self.aggregate("avg", "gross_pay")
+        with self.assertRaises(frappe.ValidationError):
+            self.aggregate("count", "employee")
+
+    def test_count_of_parents_is_distinct(self):
+        self.assertIn("COUNT(DISTINCT", self.aggregate("count", "name"))
+
+    def test_child_fields_and_extremes_are_safe(self):
+        self.assertIn("SUM(", self.aggregate("sum", "Salary Detail.amount"))
+        self.assertIn("MAX(", self.aggregate("max", "gross_pay"))
+
+    def test_semi_join_repeats_nothing(self):
+        sql = self.aggregate("sum", "gross_pay", strategy="exists")
+        self.assertIn("EXISTS", sql)
+        self.assertNotIn("JOIN", sql)
@@ -0,0 +1,145 @@
+# query_builder/tests/test_join_cost.py
+
+import math
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils.join_cost import (
+    DEFAULT_ROWS,
+    cheapest_path,
+    edge_estimate,
+    get_join_stats,
+    path_estimate,
+)
+from query_builder.utils.join_graph import JoinPathTable, child_condition, link_condition
+from query_builder.utils.join_planner import build_joins, plan_join_path
+
+
+def link(frm, field, to):
+    return (frm, field, to, link_condition(frm, field, to))
+
+
+def child(parent, field, doctype):
+    return (parent, field, doctype, child_condition(parent, field, doctype))
+
+
+def stats(**rows):
+    return {dt.replace("_", " "): {"rows": n, "indexed": {"name"}} for dt, n in rows.items()}
+
+
+class TestEdgeEstimate(unittest.TestCase):
+    def test_link_hits_one_row_by_primary_key(self):
+        cost, rows, fanout = edge_estimate(link("Attendance", "employee", "Employee"), 100, stats(Employee=1022))
+
+        self.assertEqual(fanout, 1.0)
+        self.assertEqual(rows, 100)
+        self.assertAlmostEqual(cost, 100 * (math.log2(1024) + 1))
+
+    def test_child_fans_out_by_rows_per_parent(self):
+        edge = child("Salary Slip", "earnings", "Salary Detail")
+        table_stats = stats(Salary_Slip=100, Salary_Detail=500)
+
+        _, rows, fanout = edge_estimate(edge, 10, table_stats)
+        self.assertEqual(fanout, 5.0)
+        self.assertEqual(rows, 50)
+
+    def test_unindexed_parent_column_is_scanned(self):
+        edge = child("Salary Slip", "earnings", "Salary Detail")
+        table_stats = stats(Salary_Slip=100, Salary_Detail=500)
+
+        scanned, _, _ = edge_estimate(edge, 10, table_stats)
+        table_stats["Salary Detail"]["indexed"].add("parent")
+        probed, _, _ = edge_estimate(edge, 10, table_stats)
+
+        self.assertAlmostEqual(scanned, 10 * (500 + 5))
+        self.assertLess(probed, scanned)
+
+    def test_missing_stats_use_default_rows(self):
+        estimate = path_estimate("Attendance", [link("Attendance", "employee", "Employee")], {})
+        self.assertEqual(estimate["rows"], DEFAULT_ROWS)
+
+
+class TestCheapestPath(unittest.TestCase):
+    def test_fewer_probes_win_on_links(self):
+        direct = [link("Employee", "company", "Company")]
+        via = [link("Employee", "department", "Department"), link("Department", "company", "Company")]
+
+        path, estimate = cheapest_path("Employee", [via, direct], stats(Employee=1000, Department=20, Company=3))
+        self.assertEqual(path, direct)
+        self.assertEqual(estimate["fanout"], 1.0)
+
+    def test_longer_path_wins_when_shorter_scans(self):
+        scan = [child("Project", "users", "Project User")]
+        links = [link("Project", "team", "Team"), link("Team", "lead", "Project User")]
+        table_stats = stats(Project=1000, Team=50, Project_User=100_000)
+
+        path, _ = cheapest_path("Project", [scan, links], table_stats)
+        self.assertEqual(path, links)
+
+    def test_no_paths(self):
+        self.assertEqual(cheapest_path("Employee", [], {}), (None, None))
+
+
+class TestPlanJoinPath(unittest.TestCase):
+    def test_shortest_without_stats(self):
+        table = JoinPathTable([
+            link("Employee", "department", "Department"),
+            link("Department", "company", "Company"),
+            link("Employee", "company", "Company"),
+        ])
+
+        path, estimate = plan_join_path("Employee", "Company", table, None)
+        self.assertEqual(path, [link("Employee", "company", "Company")])
+        self.assertIsNone(estimate)
+
+    def test_stats_off_by_default(self):
+        with mock.patch.object(frappe, "conf", frappe._dict()):
+            self.assertIsNone(get_join_stats(JoinPathTable([])))
+
+
+class TestBuildJoinsWithStats(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(frappe, "conf", frappe._dict())
+        self.conf = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stats_choose_a_longer_path_over_a_scan(self):
+        table = JoinPathTable([
+            child("Project", "users", "Project User"),
+            link("Project", "team", "Team"),
+            link("Team", "lead", "Project User"),
+        ])
+
+        shortest = build_joins("Project", {"Project User"}, table=table)
+        costed = build_joins(
+            "Project", {"Project User"}, table=table,
+            stats=stats(Project=1000, Team=50, Project_User=100_000),
+        )
+
+        self.assertEqual([j["field"] for j in shortest], ["users"])
+        self.assertEqual([j["field"] for j in costed], ["team", "lead"])
+
+    def test_large_fanout_join_carries_a_warning(self):
+        table = JoinPathTable([child("Salary Slip", "earnings", "Salary Detail")])
+        table_stats = stats(Salary_Slip=10_000, Salary_Detail=200_000)
+
+        joined = build_joins("Salary Slip", {"Salary Detail"}, table=table, stats=table_stats)
+        self.assertIn("about 20 times", joined[0]["warning"])
+
+        # filter-only: EXISTS never repeats rows
+        semi = build_joins(
+            "Salary Slip", {"Salary Detail"}, table=table, stats=table_stats,
+            filter_only={"Salary Detail"},
+        )
+        self.assertEqual(semi[0]["strategy"], "exists")
+        self.assertNotIn("warning", semi[0])
+
+        self.conf["query_builder_join_fanout_warn_rows"] = 500_000
+        quiet = build_joins("Salary Slip", {"Salary Detail"}, table=table, stats=table_stats)
+        self.assertNotIn("warning", quiet[0])
+
+    def test_no_warning_without_stats(self):
+        table = JoinPathTable([child("Salary Slip", "earnings", "Salary Detail")])
+        self.assertNotIn("warning", build_joins("Salary Slip", {"Salary Detail"}, table=table)[0])
@@ -0,0 +1,135 @@
+# query_builder/tests/test_join_graph.py
+
+import unittest
+
+from query_builder.utils.join_graph import (
+    JoinPathTable,
+    child_condition,
+    is_child_edge,
+    is_fanout_join,
+    link_condition,
+    parse_condition,
+)
+from query_builder.utils.join_planner import build_joins
+
+
+def link(frm, field, to):
+    return (frm, field, to, link_condition(frm, field, to))
+
+
+def child(parent, field, doctype):
+    return (parent, field, doctype, child_condition(parent, field, doctype))
+
+
+EDGES = [
+    link("Salary Slip", "employee", "Employee"),
+    child("Salary Slip", "earnings", "Salary Detail"),
+    child("Salary Slip", "deductions", "Salary Detail"),
+    link("Salary Detail", "salary_component", "Salary Component"),
+    link("Employee", "department", "Department"),
+    link("Employee", "company", "Company"),
+    link("Department", "company", "Company"),
+]
+
+
+class TestJoinConditions(unittest.TestCase):
+    def test_parse_link_condition(self):
+        self.assertEqual(
+            parse_condition("Salary Slip.employee = Employee.name"),
+            ("Salary Slip", "employee", "Employee", "name", []),
+        )
+
+    def test_parse_child_condition_literals(self):
+        condition = child_condition("Terms and Conditions", "items", "Terms Item")
+        self.assertEqual(
+            parse_condition(condition),
+            (
+                "Terms Item", "parent", "Terms and Conditions", "name",
+                [("Terms Item", "parenttype", "Terms and Conditions"), ("Terms Item", "parentfield", "items")],
+            ),
+        )
+
+    def test_parse_rejects_other_shapes(self):
+        self.assertIsNone(parse_condition("Employee.name like 'x%'"))
+        self.assertIsNone(parse_condition("Employee.name = Department.name or 1 = 1"))
+        self.assertIsNone(parse_condition(None))
+
+    def test_child_edges_and_fanout(self):
+        self.assertTrue(is_child_edge(child("Salary Slip", "earnings", "Salary Detail")))
+        self.assertFalse(is_child_edge(link("Salary Slip", "employee", "Employee")))
+
+        self.assertTrue(is_fanout_join({
+            "doctype": "Salary Detail",
+            "condition": child_condition("Salary Slip", "earnings", "Salary Detail"),
+        }))
+        self.assertFalse(is_fanout_join({
+            "doctype": "Employee",
+            "condition": link_condition("Salary Slip", "employee", "Employee"),
+        }))
+
+
+class TestJoinPathTable(unittest.TestCase):
+    def setUp(self):
+        self.table = JoinPathTable(EDGES)
+
+    def test_shortest_path(self):
+        self.assertEqual(
+            self.table.path("Salary Slip", "Department"),
+            [EDGES[0], EDGES[4]],
+        )
+        self.assertEqual(self.table.path("Salary Slip", "Salary Slip"), [])
+
+    def test_unreachable(self):
+        # links are followed one way only
+        self.assertIsNone(self.table.path("Department", "Salary Slip"))
+        self.assertIsNone(self.table.path("Salary Slip", "Holiday List"))
+        self.assertNotIn("Holiday List", self.table)
+
+    def test_all_paths_up_to_depth(self):
+        paths = self.table.paths("Employee", "Company", max_depth=2)
+        self.assertEqual(paths, [[EDGES[5]], [EDGES[4], EDGES[6]]])
+        self.assertEqual(self.table.paths("Employee", "Company", max_depth=1), [[EDGES[5]]])
+
+    def test_sibling_edges(self):
+        self.assertEqual(self.table.sibling_edges(EDGES[1]), [EDGES[1], EDGES[2]])
+        self.assertEqual(self.table.sibling_edges(EDGES[0]), [EDGES[0]])
+
+
+class TestBuildJoins(unittest.TestCase):
+    def setUp(self):
+        self.table = JoinPathTable(EDGES)
+
+    def test_table_named_in_query_is_used(self):
+        joins = build_joins(
+            "Salary Slip", {"Salary Component"}, table=self.table,
+            query="salary slips with a basic component in earnings",
+        )
+        self.assertEqual([(j["doctype"], j["field"]) for j in joins], [
+            ("Salary Detail", "earnings"),
+            ("Salary Component", "salary_component"),
+        ])
+
+    def test_ambiguous_child_table_asks(self):
+        result = build_joins("Salary Slip", {"Salary Detail"}, table=self.table, query="salary slips")
+        self.assertTrue(result["clarification_required"])
+        self.assertEqual(result["matches"], ["earnings", "deductions"])
+
+    def test_filter_only_child_is_a_semi_join(self):
+        joins = build_joins(
+            "Salary Slip", {"Salary Detail"}, table=self.table,
+            filter_only={"Salary Detail"}, query="slips with deductions over 500",
+        )
+        self.assertEqual(len(joins), 1)
+        self.assertEqual(joins[0]["field"], "deductions")
+        self.assertEqual(joins[0]["strategy"], "exists")
+
+    def test_child_other_joins_go_through_stays_a_join(self):
+        joins = build_joins(
+            "Salary Slip", {"Salary Detail", "Salary Component"}, table=self.table,
+            filter_only={"Salary Detail"}, query="earnings by component",
+        )
+        self.assertTrue(all("strategy" not in j for j in joins))
+
+    def test_no_path(self):
+        result = build_joins("Department", {"Salary Slip"}, table=self.table)
+        self.assertTrue(result["clarification_required"])
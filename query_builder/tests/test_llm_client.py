@@ -0,0 +1,148 @@
+# query_builder/tests/test_llm_client.py
+
+import unittest
+from unittest import mock
+
+import requests
+
+from query_builder.utils.llm_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMClient,
+    LLMError,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """
+    Monotonic clock that only moves when the client sleeps or a
+    request times out.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_client(post, **kwargs):
+    clock = FakeClock()
+    client = LLMClient(sleep=clock.sleep, clock=clock, **kwargs)
+    client.session = mock.Mock()
+    client.session.post.side_effect = post
+    return client, clock
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_success_closes(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.allow()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.failures, 0)
+        self.assertTrue(breaker.allow())
+
+
+class TestLLMClient(unittest.TestCase):
+    def test_retries_transient_status(self):
+        ok = FakeResponse(200)
+        client, _ = make_client([FakeResponse(503), ok])
+
+        self.assertIs(client.post("chat/completions", {}, {}), ok)
+        self.assertEqual(client.session.post.call_count, 2)
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_client_error_is_not_retried(self):
+        client, _ = make_client([FakeResponse(400, text="bad request")])
+
+        with self.assertRaises(LLMError) as ctx:
+            client.post("chat/completions", {}, {})
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(client.session.post.call_count, 1)
+        self.assertEqual(client.breaker.failures, 0)
+
+    def test_attempts_and_backoff_stay_within_deadline(self):
+        clock = None
+
+        def time_out(url, timeout, **kwargs):
+            clock.now += timeout
+            raise requests.Timeout("read timed out")
+
+        client, clock = make_client(time_out, timeout=60, deadline=90, max_retries=3)
+
+        with self.assertRaises(LLMError):
+            client.post("chat/completions", {}, {})
+
+        self.assertLessEqual(clock.now, 90)
+        self.assertEqual(client.session.post.call_count, 2)
+        self.assertEqual(client.breaker.failures, 1)
+
+    def test_other_request_errors_release_the_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        client, _ = make_client([requests.exceptions.InvalidURL("bad url")], breaker=breaker)
+
+        with self.assertRaises(LLMError):
+            client.post("chat/completions", {}, {})
+
+        # the half-open probe failed: the next call may probe again
+        self.assertEqual(client.session.post.call_count, 1)
+        self.assertEqual(breaker.failures, 2)
+        self.assertTrue(breaker.allow())
+
+    def test_open_breaker_short_circuits(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        client, _ = make_client([FakeResponse(200)], breaker=breaker)
+
+        with self.assertRaises(CircuitOpenError):
+            client.post("chat/completions", {}, {})
+
+        client.session.post.assert_not_called()
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("-1"), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
@@ -0,0 +1,33 @@
+# query_builder/tests/test_partial_json.py
+
+import unittest
+
+from query_builder.utils.partial_json import parse_partial_json
+
+
+class TestParsePartialJson(unittest.TestCase):
+    def test_complete_object(self):
+        self.assertEqual(parse_partial_json('{"action": "list", "limit": 5}'), {"action": "list", "limit": 5})
+
+    def test_text_around_the_object_is_ignored(self):
+        self.assertEqual(parse_partial_json('Intent: {"a": 1} done'), {"a": 1})
+
+    def test_half_written_values_are_dropped(self):
+        self.assertEqual(parse_partial_json('{"action": "list", "doctype": "Emp'), {"action": "list"})
+        self.assertEqual(parse_partial_json('{"action": "list", "doc'), {"action": "list"})
+        self.assertEqual(parse_partial_json('{"a": 1,'), {"a": 1})
+
+    def test_open_brackets_are_closed(self):
+        self.assertEqual(parse_partial_json('{"a": {"b": [1, 2'), {"a": {"b": [1, 2]}})
+        self.assertEqual(
+            parse_partial_json('{"filters": [{"field": "status", "op": "=", "val'),
+            {"filters": [{"field": "status", "op": "="}]},
+        )
+
+    def test_escaped_quote_keeps_string_open(self):
+        self.assertEqual(parse_partial_json('{"a": "x\\"y'), {})
+
+    def test_no_object(self):
+        self.assertIsNone(parse_partial_json(""))
+        self.assertIsNone(parse_partial_json(None))
+        self.assertIsNone(parse_partial_json("no json here"))
@@ -0,0 +1,99 @@
+# query_builder/tests/test_query_export.py
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import frappe
+
+from query_builder.api import query as query_api
+
+INTENT = {"action": "list", "doctype": "Employee", "fields": ["name", "employee_name"]}
+
+
+class FakeSite:
+    """
+    frappe.init / connect / set_user / destroy over a plain namespace
+    standing in for frappe.local.
+    """
+
+    def __init__(self):
+        self.local = SimpleNamespace(site="site1", sites_path="/sites")
+        self.session = SimpleNamespace(user="alice@example.com")
+        self.calls = []
+
+    def init(self, site, sites_path=None):
+        self.calls.append("init")
+        self.local.site, self.local.sites_path = site, sites_path
+
+    def connect(self):
+        self.calls.append("connect")
+        self.local.db = object()
+
+    def set_user(self, user):
+        self.calls.append("set_user")
+        self.session.user = user
+
+    def destroy(self):
+        self.calls.append("destroy")
+        self.local = SimpleNamespace()
+        self.session.user = None
+
+
+class TestExportQuery(unittest.TestCase):
+    def setUp(self):
+        self.site = FakeSite()
+        self.seen = []
+
+        def iter_rows(intent):
+            # must run inside the re-entered site, as the requesting user
+            self.seen.append((getattr(self.site.local, "site", None), self.site.session.user))
+            yield {"name": "EMP-1", "employee_name": "Ada"}
+            yield {"name": "EMP-2", "employee_name": "Grace"}
+
+        fake_frappe = SimpleNamespace(
+            throw=frappe.throw,
+            init=self.site.init,
+            connect=self.site.connect,
+            set_user=self.site.set_user,
+            destroy=self.site.destroy,
+            local=self.site.local,
+            session=self.site.session,
+        )
+
+        for patcher in (
+            mock.patch.object(query_api, "frappe", fake_frappe),
+            mock.patch.object(query_api, "extract_intent", return_value=INTENT),
+            mock.patch.object(query_api, "check_permissions", return_value=[]),
+            mock.patch.object(query_api, "iter_intent_rows", iter_rows),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def export(self, fmt):
+        response = query_api.export_query("all employees", fmt)
+
+        # the request handler tears its context down before the body is sent
+        self.site.destroy()
+        self.site.calls.clear()
+        query_api.frappe.local = self.site.local
+
+        return b"".join(response.response)
+
+    def test_body_runs_in_a_fresh_site_context(self):
+        body = self.export("csv")
+
+        self.assertEqual(body.decode().splitlines(), ["name,employee_name", "EMP-1,Ada", "EMP-2,Grace"])
+        self.assertEqual(self.seen, [("site1", "alice@example.com")])
+        self.assertEqual(self.site.calls, ["init", "connect", "set_user", "destroy"])
+
+    def test_context_is_destroyed_when_the_stream_fails(self):
+        def failing(intent):
+            yield {"name": "EMP-1"}
+            raise RuntimeError("connection lost")
+
+        with mock.patch.object(query_api, "iter_intent_rows", failing):
+            with self.assertRaises(RuntimeError):
+                self.export("json")
+
+        self.assertEqual(self.site.calls[-1], "destroy")
@@ -0,0 +1,80 @@
+# query_builder/tests/test_query_hints.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import query_hints
+from query_builder.utils.query_hints import HINT_VOCABULARIES, HintMatcher, get_matcher
+
+
+class TestHintMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = HintMatcher(HINT_VOCABULARIES)
+
+    def test_whole_words_only(self):
+        self.assertEqual(self.matcher.match("employees by lastname"), frozenset())
+        self.assertEqual(self.matcher.match("employees hired this month"), {"temporal"})
+
+    def test_phrases_and_hyphens(self):
+        self.assertEqual(self.matcher.match("who checked in late"), {"checkin"})
+        self.assertEqual(self.matcher.match("check-in records"), {"checkin"})
+        self.assertEqual(self.matcher.match("how many check-outs"), {"count", "checkout"})
+        self.assertEqual(self.matcher.match("number of employees"), {"count"})
+        self.assertEqual(self.matcher.match("the number is"), frozenset())
+
+    def test_plurals(self):
+        self.assertEqual(self.matcher.match("night shifts"), {"temporal"})
+        self.assertEqual(self.matcher.match("attendances"), {"attendance"})
+        self.assertEqual(self.matcher.match("absences by department"), {"attendance"})
+
+    def test_every_hint_in_one_pass(self):
+        self.assertEqual(
+            self.matcher.match("count active employees absent today"),
+            {"count", "active", "attendance", "temporal"},
+        )
+
+    def test_failure_links_find_overlapping_phrases(self):
+        matcher = HintMatcher({"long": {"a b c"}, "short": {"b"}, "tail": {"b c d"}})
+
+        self.assertEqual(matcher.match("a b x"), {"short"})
+        self.assertEqual(matcher.match("a b c d"), {"long", "short", "tail"})
+        self.assertEqual(matcher.match("a a b c"), {"long", "short"})
+
+
+class TestGetMatcher(unittest.TestCase):
+    def setUp(self):
+        self.hooks = {}
+        self.conf = frappe._dict()
+
+        for patcher in (
+            mock.patch.object(frappe, "get_hooks", lambda hook: self.hooks, create=True),
+            mock.patch.object(frappe, "conf", self.conf),
+            mock.patch.object(frappe.local, "site", "test_query_hints", create=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(query_hints._matchers.pop, "test_query_hints", None)
+
+    def test_reused_until_phrases_change(self):
+        matcher = get_matcher()
+        self.assertIs(get_matcher(), matcher)
+
+        self.conf["query_builder_query_hints"] = {"temporal": ["fortnight"]}
+        rebuilt = get_matcher()
+        self.assertIsNot(rebuilt, matcher)
+        self.assertEqual(rebuilt.match("this fortnight"), {"temporal"})
+        self.assertIs(get_matcher(), rebuilt)
+
+    def test_hook_phrases(self):
+        self.hooks = {"count": "tally"}
+        self.assertEqual(get_matcher().match("tally of leaves"), {"count", "attendance"})
+
+    def test_in_place_edit_of_conf_is_seen(self):
+        self.conf["query_builder_query_hints"] = {"count": ["tally"]}
+        get_matcher()
+
+        self.conf["query_builder_query_hints"]["count"].append("headcount")
+        self.assertEqual(get_matcher().match("headcount"), {"count"})
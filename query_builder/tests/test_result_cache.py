@@ -0,0 +1,58 @@
+# query_builder/tests/test_result_cache.py
+
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from query_builder.utils.result_cache import canonicalize_intent, compute_ttl
+
+NOW = datetime(2024, 3, 15, 23, 59)
+
+
+def between(start, end, field="attendance_date"):
+    return {"filters": [{"field": field, "op": "between", "value": [start, end]}]}
+
+
+class TestComputeTtl(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch("frappe.utils.now_datetime", return_value=NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_window_containing_now_expires_when_it_closes(self):
+        # today: until 23:59:59.999999
+        self.assertEqual(compute_ttl(between("2024-03-15", "2024-03-15"), default_ttl=300), 60)
+
+    def test_datetime_window(self):
+        self.assertEqual(
+            compute_ttl(between("2024-03-15 09:00:00", "2024-03-15 23:59:30"), default_ttl=300),
+            31,
+        )
+
+    def test_windows_not_containing_now_keep_default(self):
+        self.assertEqual(compute_ttl(between("2024-03-01", "2024-03-14"), default_ttl=300), 300)
+        self.assertEqual(compute_ttl(between("2024-03-16", "2024-03-31"), default_ttl=300), 300)
+
+    def test_only_well_formed_between_filters_count(self):
+        intent = {"filters": [
+            {"field": "attendance_date", "op": "=", "value": "2024-03-15"},
+            {"field": "attendance_date", "op": "between", "value": ["2024-03-15"]},
+            {"field": "attendance_date", "op": "between", "value": ["soon", "later"]},
+        ]}
+        self.assertEqual(compute_ttl(intent, default_ttl=300), 300)
+
+    def test_shortest_window_wins(self):
+        intent = {"filters": [
+            *between("2024-03-01", "2024-03-31")["filters"],
+            *between("2024-03-15", "2024-03-15", field="creation")["filters"],
+        ]}
+        self.assertEqual(compute_ttl(intent, default_ttl=300), 60)
+
+
+class TestCanonicalizeIntent(unittest.TestCase):
+    def test_ignores_confidence_and_private_keys(self):
+        a = {"action": "list", "doctype": "Employee", "confidence": 0.9, "_timings": {"llm": 1}}
+        b = {"doctype": "Employee", "action": "list", "confidence": 0.4}
+
+        self.assertEqual(canonicalize_intent(a), canonicalize_intent(b))
+        self.assertNotEqual(canonicalize_intent(a), canonicalize_intent({**b, "doctype": "Attendance"}))
@@ -0,0 +1,149 @@
+# query_builder/tests/test_schema_registry.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import schema_registry
+from query_builder.utils.child_table_resolver import resolve_child_table, resolve_child_tables
+from query_builder.utils.schema_registry import get_compiled_schema, resolve_field_doctype
+
+SCHEMAS = {
+    "Salary Slip": {
+        "doctype": "Salary Slip",
+        "fields": [
+            {"fieldname": "employee", "type": "Link"},
+            {"fieldname": "gross_pay", "type": "Currency"},
+        ],
+        "links": [{"fieldname": "employee", "linked_doctype": "Employee"}],
+        "child_tables": [
+            {"fieldname": "earnings", "child_doctype": "Salary Detail"},
+            {"fieldname": "deductions", "child_doctype": "Salary Detail"},
+            {"fieldname": "timesheets", "child_doctype": "Salary Slip Timesheet"},
+        ],
+    },
+    "Salary Detail": {
+        "doctype": "Salary Detail",
+        "fields": [
+            {"fieldname": "salary_component", "type": "Link"},
+            {"fieldname": "amount", "type": "Currency"},
+            {"fieldname": "employee", "type": "Link"},
+        ],
+        "is_table": True,
+    },
+    "Salary Slip Timesheet": {
+        "doctype": "Salary Slip Timesheet",
+        "fields": [{"fieldname": "working_hours", "type": "Float"}],
+        "is_table": True,
+    },
+}
+
+
+class RegistryTestCase(unittest.TestCase):
+    """
+    Compiled schemas served from SCHEMAS, at a fixed schema version.
+    """
+
+    def setUp(self):
+        schema_registry._registry.clear()
+        frappe.local.query_builder_schema_version = "v1"
+
+        self.extract = mock.Mock(side_effect=SCHEMAS.get)
+        patcher = mock.patch.object(schema_registry, "extract_doctype_schema", self.extract)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.addCleanup(schema_registry._registry.clear)
+        self.addCleanup(setattr, frappe.local, "query_builder_schema_version", None)
+
+
+class TestCompiledSchema(RegistryTestCase):
+    def test_compiles_once_per_version(self):
+        slip = get_compiled_schema("Salary Slip")
+
+        self.assertIs(get_compiled_schema("Salary Slip"), slip)
+        self.assertEqual(slip.version, "v1")
+        self.assertEqual(slip.links, {"employee": "Employee"})
+        # parent plus its two child DocTypes, each compiled once
+        self.assertEqual(self.extract.call_count, 3)
+
+    def test_new_version_recompiles(self):
+        slip = get_compiled_schema("Salary Slip")
+
+        # another worker bumped the version in redis
+        frappe.local.query_builder_schema_version = None
+        cache = mock.Mock(get_value=mock.Mock(return_value="v2"))
+        with mock.patch.object(frappe, "cache", return_value=cache):
+            fresh = get_compiled_schema("Salary Slip")
+
+        self.assertIsNot(fresh, slip)
+        self.assertEqual(fresh.version, "v2")
+        self.assertEqual(self.extract.call_count, 6)
+
+    def test_missing_doctype_cached_as_none(self):
+        self.assertIsNone(get_compiled_schema("Nope"))
+        self.assertIsNone(get_compiled_schema("Nope"))
+        self.assertEqual(self.extract.call_count, 1)
+
+    def test_has_column(self):
+        slip = get_compiled_schema("Salary Slip")
+        detail = get_compiled_schema("Salary Detail")
+
+        self.assertTrue(slip.has_column("gross_pay"))
+        self.assertTrue(slip.has_column("modified"))
+        self.assertFalse(slip.has_column("parent"))
+        self.assertFalse(slip.has_column("amount"))
+
+        self.assertTrue(detail.has_column("amount"))
+        self.assertTrue(detail.has_column("parentfield"))
+
+
+class TestResolveFieldDoctype(RegistryTestCase):
+    def test_first_doctype_defining_field(self):
+        doctypes = ["Salary Slip", "Salary Detail"]
+
+        self.assertEqual(resolve_field_doctype("amount", doctypes), ("Salary Detail", "amount"))
+        self.assertEqual(resolve_field_doctype("employee", doctypes), ("Salary Slip", "employee"))
+        self.assertEqual(resolve_field_doctype("name", doctypes), ("Salary Slip", "name"))
+        self.assertEqual(resolve_field_doctype("unknown", doctypes), (None, "unknown"))
+
+    def test_qualified_field(self):
+        self.assertEqual(
+            resolve_field_doctype("Salary Detail.employee", ["Salary Slip", "Salary Detail"]),
+            ("Salary Detail", "employee"),
+        )
+
+
+class TestChildFieldIndex(RegistryTestCase):
+    def test_keyed_by_table_field(self):
+        self.assertEqual(
+            resolve_child_tables("Salary Slip", "amount"),
+            (("earnings", "Salary Detail"), ("deductions", "Salary Detail")),
+        )
+        # parent fields resolve to the parent
+        self.assertEqual(resolve_child_tables("Salary Slip", "employee"), ())
+
+    def test_single_table(self):
+        self.assertEqual(resolve_child_table("Salary Slip", "working_hours"), "Salary Slip Timesheet")
+        self.assertIsNone(resolve_child_table("Salary Slip", "gross_pay"))
+
+    def test_same_child_behind_two_tables_is_ambiguous(self):
+        result = resolve_child_table("Salary Slip", "amount")
+
+        self.assertTrue(result["clarification_required"])
+        self.assertEqual(result["matches"], ["earnings", "deductions"])
+        self.assertIn("earnings (Salary Detail), deductions (Salary Detail)", result["message"])
+
+    def test_query_names_the_table(self):
+        self.assertEqual(
+            resolve_child_table("Salary Slip", "amount", "total deductions amount in March"),
+            "Salary Detail",
+        )
+        self.assertTrue(
+            resolve_child_table("Salary Slip", "amount", "amount for March")["clarification_required"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
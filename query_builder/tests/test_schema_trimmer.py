@@ -0,0 +1,73 @@
+# query_builder/tests/test_schema_trimmer.py
+
+import unittest
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import schema_trimmer
+from query_builder.utils.schema_trimmer import MAX_FIELDS_PER_DOCTYPE, trim_schema
+
+EMPLOYEE = {
+    "doctype": "Employee",
+    "description": "Employee master",
+    "is_submittable": 0,
+    "fields": [
+        {"fieldname": "employee_name", "type": "Data", "class": "text"},
+        {"fieldname": "status", "type": "Select", "class": "categorical"},
+        *(
+            {"fieldname": f"field_{i}", "type": "Data", "class": "text"}
+            for i in range(20)
+        ),
+        {"fieldname": "date_of_joining", "type": "Date", "class": "temporal"},
+        {"fieldname": "department", "type": "Link", "class": "reference", "options": "Department"},
+    ],
+}
+
+
+def fieldnames(trimmed):
+    return [f["fieldname"] for f in trimmed[0]["fields"]]
+
+
+class TestTrimSchema(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(schema_trimmer, "get_doctype_schema", {"Employee": EMPLOYEE}.get),
+            mock.patch.object(frappe, "get_hooks", lambda hook: {}, create=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_matched_fields_replace_scoring(self):
+        result = {"metadatas": [[{
+            "doctype": "Employee",
+            "matched_fields": ["field_7", "date_of_joining", "field_3"],
+        }]]}
+
+        trimmed = trim_schema(result, "who joined in march")
+
+        # guards first, then only the matched fields, nearest first
+        self.assertEqual(
+            fieldnames(trimmed),
+            ["employee_name", "status", "field_7", "date_of_joining", "field_3"],
+        )
+
+    def test_matched_guard_field_not_repeated(self):
+        result = {"metadatas": [[{"doctype": "Employee", "matched_fields": ["status", "field_1"]}]]}
+
+        self.assertEqual(fieldnames(trim_schema(result, "employees")), ["employee_name", "status", "field_1"])
+
+    def test_without_matches_scores_up_to_the_cap(self):
+        trimmed = trim_schema({"metadatas": [[{"doctype": "Employee"}]]}, "employees by department")
+
+        names = fieldnames(trimmed)
+        self.assertEqual(len(names), MAX_FIELDS_PER_DOCTYPE)
+        # reference fields outscore plain text ones
+        self.assertEqual(names[2], "department")
+
+    def test_unknown_doctype_skipped(self):
+        self.assertEqual(trim_schema({"metadatas": [[{"doctype": "Nope"}]]}, "x"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
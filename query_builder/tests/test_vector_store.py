@@ -0,0 +1,296 @@
+# query_builder/tests/test_vector_store.py
+
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import frappe
+
+from query_builder.utils import vector_store
+from query_builder.utils.vector_store import (
+    COLLECTION_NAME,
+    SYNC_DIRTY_KEY,
+    SYNC_LAST_CHANGE_KEY,
+    content_hash,
+    document_id,
+    fuse_results,
+    is_keyword_obvious,
+    run_vector_sync,
+    sync_collection,
+    sync_vector_store,
+)
+
+
+def vector_result(*hits):
+    """
+    retrieve_schema-shaped result of (doctype, distance) hits, nearest first.
+    """
+    return {
+        "ids": [[f"schema::{dt}" for dt, _ in hits]],
+        "documents": [[f"doc {dt}" for dt, _ in hits]],
+        "metadatas": [[{"doctype": dt} for dt, _ in hits]],
+        "distances": [[distance for _, distance in hits]],
+    }
+
+
+def doctypes(result):
+    return [meta["doctype"] for meta in result["metadatas"][0]]
+
+
+class TestFuseResults(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(vector_store, "keyword_metadata", lambda dt: {"doctype": dt})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_found_by_both_rankings_comes_first(self):
+        fused = fuse_results(
+            vector_result(("Attendance", 0.1), ("Employee", 0.2)),
+            [("Employee", 7.5), ("Leave Application", 3.0)],
+            top_k=3,
+        )
+
+        # Employee 1/62 + 1/61, then Attendance 1/61 beats Leave Application 1/62
+        self.assertEqual(doctypes(fused), ["Employee", "Attendance", "Leave Application"])
+
+    def test_keyword_only_hits_have_no_document_or_distance(self):
+        fused = fuse_results(vector_result(("Attendance", 0.1)), [("Leave Application", 3.0)], top_k=3)
+
+        i = doctypes(fused).index("Leave Application")
+        self.assertEqual(fused["ids"][0][i], "schema::Leave Application")
+        self.assertIsNone(fused["documents"][0][i])
+        self.assertIsNone(fused["distances"][0][i])
+
+        j = doctypes(fused).index("Attendance")
+        self.assertEqual(fused["documents"][0][j], "doc Attendance")
+        self.assertEqual(fused["distances"][0][j], 0.1)
+
+    def test_field_chunks_of_one_doctype_add_up(self):
+        # field index: several chunk hits for the same DocType
+        fused = fuse_results(
+            vector_result(("Employee", 0.1), ("Attendance", 0.2), ("Attendance", 0.3)),
+            [],
+            top_k=3,
+        )
+
+        self.assertEqual(doctypes(fused), ["Attendance", "Employee"])
+        self.assertEqual(fused["distances"][0][0], 0.2)
+
+    def test_top_k_and_keyword_only_input(self):
+        fused = fuse_results(None, [("A", 9.0), ("B", 5.0), ("C", 1.0)], top_k=2)
+        self.assertEqual(doctypes(fused), ["A", "B"])
+
+
+class TestKeywordShortcut(unittest.TestCase):
+    def test_obvious_only_with_a_strong_clear_leader(self):
+        self.assertFalse(is_keyword_obvious([]))
+        self.assertFalse(is_keyword_obvious([("A", 1.0)]))
+        self.assertTrue(is_keyword_obvious([("A", 6.0)]))
+        self.assertTrue(is_keyword_obvious([("A", 8.0), ("B", 3.0)]))
+        self.assertFalse(is_keyword_obvious([("A", 8.0), ("B", 5.0)]))
+
+
+# ---------------------------------------------------------------------
+# INCREMENTAL SYNC
+# ---------------------------------------------------------------------
+
+class FakeProvider:
+    model_name = "test-model"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return [[float(len(t))] for t in texts]
+
+
+class FakeCollection:
+    """
+    In-memory chroma collection: id -> (document, metadata).
+    """
+
+    def __init__(self, docs=None):
+        self.docs = dict(docs or {})
+
+    def get(self, where=None, include=None):
+        ids = list(self.docs)
+        if where:
+            wanted = set(where["doctype"]["$in"])
+            ids = [i for i in ids if self.docs[i][1]["doctype"] in wanted]
+        return {"ids": ids, "metadatas": [self.docs[i][1] for i in ids]}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        for doc_id, document, meta in zip(ids, documents, metadatas, strict=True):
+            self.docs[doc_id] = (document, meta)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            del self.docs[doc_id]
+
+
+def indexed(doctype, text):
+    meta = {"doctype": doctype, "content_hash": content_hash(text, FakeProvider.model_name)}
+    return document_id(doctype), (text, meta)
+
+
+def schema(doctype, text):
+    return {"doctype": doctype, "embedding_text": text, "module": "HR", "is_submittable": 0}
+
+
+class SyncTestCase(unittest.TestCase):
+    def setUp(self):
+        self.provider = FakeProvider()
+        self.collection = FakeCollection([
+            indexed("Employee", "employee v1"),
+            indexed("Attendance", "attendance v1"),
+            indexed("Holiday List", "holiday v1"),
+        ])
+        client = SimpleNamespace(get_or_create_collection=lambda name: self.collection)
+
+        for patcher in (
+            mock.patch.object(vector_store, "get_embedding_provider", return_value=self.provider),
+            mock.patch.object(vector_store, "get_chroma_client", return_value=client),
+            mock.patch.object(vector_store, "resolve_collection_name", lambda name: name),
+            mock.patch.object(vector_store, "get_chroma_dir", return_value="/tmp/chroma"),
+            mock.patch.object(vector_store, "is_field_index_enabled", return_value=False),
+            mock.patch.object(vector_store, "bump_store_generation"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sync(self, schemas, doctype_list, prune=True):
+        with mock.patch.object(vector_store, "build_metadata", return_value=schemas):
+            return sync_vector_store(doctype_list, prune)
+
+
+class TestSyncCollection(SyncTestCase):
+    def test_only_changed_doctypes_re_embedded(self):
+        result = self.sync(
+            [schema("Employee", "employee v2"), schema("Attendance", "attendance v1")],
+            ["Employee", "Attendance"],
+        )
+
+        self.assertEqual(self.provider.encoded, ["employee v2"])
+        self.assertEqual(result["upserted"], ["Employee"])
+        self.assertEqual(result["deleted"], ["Holiday List"])
+        self.assertEqual(result["unchanged"], 1)
+        self.assertEqual(self.collection.docs[document_id("Employee")][0], "employee v2")
+        self.assertNotIn(document_id("Holiday List"), self.collection.docs)
+        vector_store.bump_store_generation.assert_called_once()
+
+    def test_unchanged_is_a_no_op(self):
+        result = self.sync(
+            [schema("Employee", "employee v1"), schema("Attendance", "attendance v1"), schema("Holiday List", "holiday v1")],
+            ["Employee", "Attendance", "Holiday List"],
+        )
+
+        self.assertEqual(self.provider.encoded, [])
+        self.assertEqual(result["documents_changed"], 0)
+        vector_store.bump_store_generation.assert_not_called()
+
+    def test_without_prune_other_doctypes_are_kept(self):
+        result = self.sync([schema("Attendance", "attendance v2")], ["Attendance", "Employee"], prune=False)
+
+        self.assertEqual(self.provider.encoded, ["attendance v2"])
+        # Employee was listed but is gone; Holiday List was not listed
+        self.assertEqual(result["deleted"], ["Employee"])
+        self.assertIn(document_id("Holiday List"), self.collection.docs)
+
+    def test_new_doctype_added(self):
+        documents, ids, metadatas = vector_store.schema_to_documents([schema("Leave Type", "leave type")])
+
+        result = sync_collection(COLLECTION_NAME, documents, ids, metadatas, ["Leave Type"], prune=False)
+
+        self.assertEqual(result["upserted"], ["Leave Type"])
+        self.assertEqual(result["deleted"], [])
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeSyncRedis:
+    def __init__(self):
+        self.store = {}
+        self.dirty = set()
+
+    def make_key(self, key):
+        return f"site|{key}"
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def smembers(self, key):
+        assert key == SYNC_DIRTY_KEY
+        return {d.encode() for d in self.dirty}
+
+    def srem(self, key, *values):
+        self.dirty.difference_update(values)
+
+
+class TestRunVectorSync(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.redis = FakeSyncRedis()
+        self.synced = []
+
+        for patcher in (
+            mock.patch.object(vector_store, "time", self.clock),
+            mock.patch.object(frappe, "cache", return_value=self.redis, create=True),
+            mock.patch.object(vector_store, "sync_vector_store", side_effect=self.record_sync),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def record_sync(self, doctypes, prune=True):
+        self.synced.append((sorted(doctypes), prune, self.clock.now))
+        on_sync = getattr(self, "on_sync", None)
+        if on_sync:
+            self.on_sync = None
+            on_sync()
+
+    def changed(self, *doctypes):
+        self.redis.dirty.update(doctypes)
+        self.redis.store[self.redis.make_key(SYNC_LAST_CHANGE_KEY)] = self.clock.now
+
+    def test_waits_for_quiet_then_syncs_dirty_set_once(self):
+        self.changed("Employee")
+        self.clock.now += 1
+        self.changed("Attendance", "Employee")
+
+        run_vector_sync()
+
+        self.assertEqual(self.synced, [(["Attendance", "Employee"], False, 1004.0)])
+        self.assertEqual(self.redis.dirty, set())
+
+    def test_changes_during_sync_get_another_pass(self):
+        self.changed("Employee")
+        self.on_sync = lambda: self.redis.dirty.add("Salary Slip")
+
+        run_vector_sync()
+
+        self.assertEqual([s[0] for s in self.synced], [["Employee"], ["Salary Slip"]])
+
+    def test_max_wait_bounds_the_debounce(self):
+        self.changed("Employee")
+        # a change stamp in the future keeps the queue never quiet
+        self.redis.store[self.redis.make_key(SYNC_LAST_CHANGE_KEY)] = self.clock.now + 3600
+
+        run_vector_sync()
+
+        self.assertEqual(self.synced, [(["Employee"], False, 1000.0 + vector_store.SYNC_MAX_WAIT)])
+
+    def test_nothing_dirty(self):
+        run_vector_sync()
+        self.assertEqual(self.synced, [])
@@ -1,28 +1,46 @@
 # query_builder/utils/child_table_resolver.py
 
-from query_builder.utils.schema_extractor import extract_doctype_schema
+from query_builder.utils.keyword_index import phrase_terms, query_terms
+from query_builder.utils.schema_registry import get_compiled_schema
 
 
-def resolve_child_table(parent_doctype: str, fieldname: str):
+def resolve_child_tables(parent_doctype: str, fieldname: str) -> tuple:
+    """
+    All (table fieldname, child doctype) pairs of parent_doctype defining
+    fieldname. O(1) lookup on the parent's precomputed child field index.
+    """
+    parent = get_compiled_schema(parent_doctype)
+    if not parent or not fieldname:
+        return ()
+
+    return parent.child_field_index.get(fieldname, ())
+
+
+def resolve_child_table(parent_doctype: str, fieldname: str, query: str | None = None):
     """
     If field belongs to a child table of parent_doctype,
     return child doctype name.
-    """
-    parent_schema = extract_doctype_schema(parent_doctype)
-    if not parent_schema:
-        return None
 
-    for ct in parent_schema.get("child_tables", []):
-        child_doctype = ct.get("child_doctype")
-        if not child_doctype:
-            continue
+    When the field exists in more than one table field, the one `query`
+    names wins ("deductions amount"); otherwise a clarification dict.
+    """
+    tables = resolve_child_tables(parent_doctype, fieldname)
 
-        child_schema = extract_doctype_schema(child_doctype)
-        if not child_schema:
-            continue
+    if len(tables) > 1 and query:
+        terms = set(query_terms(query))
+        named = [t for t in tables if set(phrase_terms(t[0])) & terms]
+        if len(named) == 1:
+            tables = named
 
-        for f in child_schema.get("fields", []):
-            if f.get("fieldname") == fieldname:
-                return child_doctype
+    if len(tables) > 1:
+        return {
+            "clarification_required": True,
+            "message": (
+                f"Field '{fieldname}' exists in multiple child tables of "
+                f"{parent_doctype}: "
+                + ", ".join(f"{field} ({child})" for field, child in tables)
+            ),
+            "matches": [field for field, _ in tables],
+        }
 
-    return None
+    return tables[0][1] if tables else None
@@ -0,0 +1,81 @@
+# query_builder/utils/concurrency.py
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+
+DEFAULT_MAX_WORKERS = 8
+
+# site_config keys
+CONF_MAX_WORKERS = "query_builder_max_threads"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_executor():
+    # threads do not survive fork; drop the dead pool in the child
+    global _executor
+    _executor = None
+
+
+os.register_at_fork(after_in_child=_reset_executor)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(frappe.conf.get(CONF_MAX_WORKERS) or DEFAULT_MAX_WORKERS),
+                    thread_name_prefix="query_builder",
+                )
+
+    return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run fn on the shared pool inside a copy of the caller's context,
+    so frappe.local (site, conf, user) is visible to the thread.
+
+    The copy shares frappe.db with the caller: submitted work must not
+    touch the database while the caller may be using it.
+    """
+    ctx = contextvars.copy_context()
+    return get_executor().submit(ctx.run, fn, *args, **kwargs)
+
+
+def map_bounded(fn, items, limit: int):
+    """
+    fn(item) for every item, at most `limit` at a time, in the caller's
+    context. Returns results in input order; a failing call yields its
+    exception instead of a result.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def call(item):
+        try:
+            return fn(item)
+        except Exception as e:
+            return e
+
+    limit = max(1, min(int(limit), len(items)))
+    if limit == 1:
+        return [call(item) for item in items]
+
+    ctx = contextvars.copy_context()
+
+    def run(item):
+        # each thread needs its own copy: a Context can't be entered twice at once
+        return ctx.copy().run(call, item)
+
+    with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="query_builder_batch") as pool:
+        return list(pool.map(run, items))
@@ -0,0 +1,226 @@
+# query_builder/utils/embedding_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import frappe
+
+from query_builder.utils.embedding_provider import get_embedding_provider
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+
+DEFAULT_MAXSIZE = 2048
+DEFAULT_TTL = 3600  # seconds
+
+# site_config keys
+CONF_MAXSIZE = "query_builder_embedding_cache_size"
+CONF_TTL = "query_builder_embedding_cache_ttl"
+CONF_REDIS = "query_builder_embedding_cache_redis"
+
+REDIS_PREFIX = "query_builder:query_embedding:"
+
+
+# -------------------------------------------------------------------
+# KEYS
+# -------------------------------------------------------------------
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def make_key(normalized_query: str, model_name: str) -> str:
+    return hashlib.sha1(f"{model_name}\0{normalized_query}".encode()).hexdigest()
+
+
+# -------------------------------------------------------------------
+# LRU + TTL CACHE (PER WORKER)
+# -------------------------------------------------------------------
+
+class QueryEmbeddingCache:
+    """
+    hits count get() hits; redis_hits and misses count set() calls, by
+    where the stored vector came from. All counting is under the lock.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: int = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._data = OrderedDict()   # key -> (expires_at, vector)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, vector = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def set(self, key, vector, from_redis: bool = False):
+        with self._lock:
+            if from_redis:
+                self.redis_hits += 1
+            else:
+                self.misses += 1
+
+            self._data[key] = (time.monotonic() + self.ttl, vector)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.redis_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, redis_hits, misses = self.hits, self.redis_hits, self.misses
+            size = len(self._data)
+
+        lookups = hits + redis_hits + misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": hits,
+            "redis_hits": redis_hits,
+            "misses": misses,
+            "hit_rate": round((hits + redis_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> QueryEmbeddingCache:
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryEmbeddingCache(
+                    maxsize=int(frappe.conf.get(CONF_MAXSIZE) or DEFAULT_MAXSIZE),
+                    ttl=int(frappe.conf.get(CONF_TTL) or DEFAULT_TTL),
+                )
+
+    return _cache
+
+
+# -------------------------------------------------------------------
+# REDIS TIER (SHARED BETWEEN WORKERS, OPTIONAL)
+# -------------------------------------------------------------------
+
+def _redis_enabled() -> bool:
+    return bool(frappe.conf.get(CONF_REDIS))
+
+
+def _redis_get(key):
+    try:
+        return frappe.cache().get_value(REDIS_PREFIX + key)
+    except Exception:
+        return None
+
+
+def _redis_set(key, vector, ttl):
+    try:
+        frappe.cache().set_value(REDIS_PREFIX + key, vector, expires_in_sec=ttl)
+    except Exception:
+        pass
+
+
+# -------------------------------------------------------------------
+# PUBLIC API
+# -------------------------------------------------------------------
+
+def embed_query(query: str) -> list:
+    """
+    Embedding for a single query, served from cache when possible.
+    The normalized text is what gets encoded, so a hit and a miss
+    always yield the same vector.
+    """
+    provider = get_embedding_provider()
+    cache = get_embedding_cache()
+
+    normalized = normalize_query(query)
+    key = make_key(normalized, provider.model_name)
+
+    vector = cache.get(key)
+    if vector is not None:
+        return vector
+
+    if _redis_enabled():
+        vector = _redis_get(key)
+        if vector is not None:
+            cache.set(key, vector, from_redis=True)
+            return vector
+
+    vector = provider.encode([normalized])[0]
+
+    cache.set(key, vector)
+    if _redis_enabled():
+        _redis_set(key, vector, cache.ttl)
+
+    return vector
+
+
+def embed_queries(queries) -> list:
+    """
+    Embeddings for many queries; all cache misses are encoded in a
+    single provider call. Output order matches input order.
+    """
+    provider = get_embedding_provider()
+    cache = get_embedding_cache()
+    use_redis = _redis_enabled()
+
+    normalized = [normalize_query(q) for q in queries]
+    keys = [make_key(n, provider.model_name) for n in normalized]
+
+    vectors = [None] * len(keys)
+    missing = {}  # key -> normalized text, deduplicated
+
+    for i, key in enumerate(keys):
+        vector = cache.get(key)
+        if vector is None and use_redis:
+            vector = _redis_get(key)
+            if vector is not None:
+                cache.set(key, vector, from_redis=True)
+
+        if vector is None:
+            missing[key] = normalized[i]
+        else:
+            vectors[i] = vector
+
+    if missing:
+        encoded = dict(zip(missing, provider.encode(list(missing.values())), strict=True))
+
+        for key, vector in encoded.items():
+            cache.set(key, vector)
+            if use_redis:
+                _redis_set(key, vector, cache.ttl)
+
+        vectors = [v if v is not None else encoded[k] for v, k in zip(vectors, keys, strict=True)]
+
+    return vectors
+
+
+def get_cache_stats() -> dict:
+    return get_embedding_cache().stats()
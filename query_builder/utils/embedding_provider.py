@@ -0,0 +1,247 @@
+# query_builder/utils/embedding_provider.py
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from abc import ABC, abstractmethod
+
+import frappe
+
+# -------------------------------------------------------------------
+# CONFIG
+# -------------------------------------------------------------------
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# site_config / common_site_config keys
+CONF_MODE = "query_builder_embedding_mode"          # "local" | "socket"
+CONF_MODEL = "query_builder_embedding_model"
+CONF_SOCKET = "query_builder_embedding_socket"
+CONF_WARMUP = "query_builder_embedding_warmup"
+
+SOCKET_TIMEOUT = 30
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+def get_model_name():
+    return frappe.conf.get(CONF_MODEL) or DEFAULT_MODEL_NAME
+
+
+def get_socket_path():
+    path = frappe.conf.get(CONF_SOCKET)
+    if path:
+        return os.path.abspath(path)
+
+    return os.path.join(
+        frappe.utils.get_bench_path(),
+        "config",
+        "query_builder_embeddings.sock",
+    )
+
+
+# -------------------------------------------------------------------
+# PROVIDERS
+# -------------------------------------------------------------------
+
+class EmbeddingProvider(ABC):
+    """
+    encode(texts) -> list of float vectors, one per text.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @abstractmethod
+    def encode(self, texts) -> list:
+        ...
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    In-process SentenceTransformer, loaded on first use.
+    """
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts) -> list:
+        return self.load().encode(list(texts)).tolist()
+
+
+class SocketEmbeddingProvider(EmbeddingProvider):
+    """
+    Client for a shared embedding process (see serve_embeddings).
+    Workers never load the model themselves.
+    """
+
+    def __init__(self, model_name: str, socket_path: str):
+        super().__init__(model_name)
+        self.socket_path = socket_path
+
+    def encode(self, texts) -> list:
+        request = {"model": self.model_name, "texts": list(texts)}
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(SOCKET_TIMEOUT)
+            sock.connect(self.socket_path)
+            _send_message(sock, request)
+            response = _recv_message(sock)
+
+        if response.get("error"):
+            raise RuntimeError(f"Embedding service error: {response['error']}")
+
+        return response["embeddings"]
+
+
+# -------------------------------------------------------------------
+# WIRE FORMAT (length-prefixed JSON)
+# -------------------------------------------------------------------
+
+def _send_message(sock, payload: dict):
+    body = json.dumps(payload).encode()
+    sock.sendall(struct.pack("!I", len(body)) + body)
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Embedding socket closed mid-message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_message(sock) -> dict:
+    (size,) = struct.unpack("!I", _recv_exact(sock, 4))
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError("Embedding message too large")
+    return json.loads(_recv_exact(sock, size))
+
+
+# -------------------------------------------------------------------
+# PROVIDER REGISTRY (PER PROCESS)
+# -------------------------------------------------------------------
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    mode = frappe.conf.get(CONF_MODE) or "local"
+    model_name = get_model_name()
+
+    key = (mode, model_name, get_socket_path() if mode == "socket" else None)
+
+    provider = _providers.get(key)
+    if provider is not None:
+        return provider
+
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            if mode == "socket":
+                provider = SocketEmbeddingProvider(model_name, key[2])
+            else:
+                provider = LocalEmbeddingProvider(model_name)
+            _providers[key] = provider
+
+    return provider
+
+
+def encode(texts) -> list:
+    return get_embedding_provider().encode(texts)
+
+
+def warmup():
+    """
+    before_request hook.
+    Loads the local model up front when `query_builder_embedding_warmup`
+    is set; a no-op otherwise, in socket mode and after the first call.
+    Background workers are not warmed: most jobs never embed, so they
+    load on first encode instead.
+    """
+    if not frappe.conf.get(CONF_WARMUP):
+        return
+
+    provider = get_embedding_provider()
+    if isinstance(provider, LocalEmbeddingProvider) and not provider.loaded:
+        provider.load()
+
+
+# -------------------------------------------------------------------
+# SHARED EMBEDDING SERVER
+# -------------------------------------------------------------------
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            request = _recv_message(self.request)
+            model_name = request.get("model") or self.server.default_model
+            provider = self.server.get_provider(model_name)
+            response = {"embeddings": provider.encode(request.get("texts") or [])}
+        except Exception as e:
+            response = {"error": str(e)}
+
+        try:
+            _send_message(self.request, response)
+        except OSError:
+            pass
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, default_model: str):
+        self.default_model = default_model
+        self._providers = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def get_provider(self, model_name: str) -> LocalEmbeddingProvider:
+        with self._lock:
+            provider = self._providers.get(model_name)
+            if provider is None:
+                provider = LocalEmbeddingProvider(model_name)
+                self._providers[model_name] = provider
+        return provider
+
+
+def serve_embeddings(socket_path: str, model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Run the shared embedding process (blocking).
+    The default model is loaded before the socket accepts requests.
+    """
+    server = EmbeddingServer(socket_path, model_name)
+    server.get_provider(model_name).load()
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,352 @@
+# query_builder/utils/entity_index.py
+
+import heapq
+import re
+import threading
+
+import frappe
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# doctype -> how its records are indexed; `cues` are query words that
+# name the DocType ("sales dept", "night shift") and enable fuzzy
+# matching of the words around them (Employee uses the name resolver)
+ENTITY_SOURCES = {
+    "Employee": {
+        "label_field": "employee_name",
+        "filters": {"status": "Active"},
+    },
+    "Department": {
+        "label_field": "department_name",
+        # leaves only: groups include the root "All Departments"
+        "filters": {"is_group": 0},
+        "cues": {"department", "departments", "dept", "depts", "team"},
+    },
+    "Designation": {
+        "label_field": "designation_name",
+        "filters": {},
+        "cues": {"designation", "designations", "role", "roles", "position"},
+    },
+    "Leave Type": {
+        "label_field": "leave_type_name",
+        "filters": {},
+        "cues": {"leave", "leaves"},
+    },
+    "Shift Type": {
+        "label_field": "name",
+        "filters": {},
+        "cues": {"shift", "shifts"},
+    },
+    "Holiday List": {
+        "label_field": "holiday_list_name",
+        "filters": {},
+        "cues": {"holiday", "holidays", "calendar"},
+    },
+}
+
+# Link targets resolved by value (everything but Employee)
+LINK_DOCTYPES = tuple(dt for dt, source in ENTITY_SOURCES.items() if source.get("cues"))
+
+# site_config key (default on); off → batched DB lookups only
+CONF_ENABLED = "query_builder_entity_index"
+
+# redis: per-doctype change counter + bounded log of changed names
+SEQ_KEY = "query_builder:entity_seq:"
+LOG_KEY = "query_builder:entity_log:"
+LOG_MAX = 1000   # further behind than this → full reload
+
+FUZZY_THRESHOLD = 0.7   # trigram dice coefficient
+FUZZY_TOP_K = 5
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def is_enabled() -> bool:
+    return bool(frappe.conf.get(CONF_ENABLED, True))
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {' '.join(tokenize(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ---------------------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------------------
+
+class EntityIndex:
+    """
+    In-memory lookup over one DocType's records:
+    token → keys for exact word matches, trigram → keys for fuzzy ones.
+    """
+
+    def __init__(self):
+        self.labels = {}     # key -> label
+        self.tokens = {}     # token -> set(keys)
+        self.grams = {}      # trigram -> set(keys)
+        self.phrases = {}    # label tokens (tuple) -> set(keys)
+        self.max_phrase = 0  # longest label, in tokens
+        self._grams_of = {}  # key -> trigrams (for removal / scoring)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, key: str, label: str):
+        if key in self.labels:
+            self.remove(key)
+
+        label = label or key
+        self.labels[key] = label
+
+        tokens = tokenize(label)
+        for token in set(tokens):
+            self.tokens.setdefault(token, set()).add(key)
+
+        self.phrases.setdefault(tuple(tokens), set()).add(key)
+        self.max_phrase = max(self.max_phrase, len(tokens))
+
+        grams = trigrams(label)
+        self._grams_of[key] = grams
+        for gram in grams:
+            self.grams.setdefault(gram, set()).add(key)
+
+    def remove(self, key: str):
+        label = self.labels.pop(key, None)
+        if label is None:
+            return
+
+        tokens = tokenize(label)
+        for token in set(tokens):
+            keys = self.tokens.get(token)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tokens[token]
+
+        keys = self.phrases.get(tuple(tokens))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.phrases[tuple(tokens)]
+
+        for gram in self._grams_of.pop(key, ()):
+            keys = self.grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[gram]
+
+    def match_tokens(self, tokens) -> set:
+        """
+        Keys whose label contains every token as a whole word.
+        """
+        result = None
+        for token in tokens:
+            keys = self.tokens.get(token)
+            if not keys:
+                return set()
+            result = set(keys) if result is None else result & keys
+            if not result:
+                return set()
+        return result or set()
+
+    def match_phrase(self, tokens) -> set:
+        """
+        Keys whose whole label is exactly these tokens.
+        """
+        return self.phrases.get(tuple(tokens), set())
+
+    def fuzzy(self, text: str, limit: int = FUZZY_TOP_K, threshold: float = FUZZY_THRESHOLD) -> list:
+        """
+        [(key, dice score)] best first: candidates share a trigram,
+        then are scored on the full trigram sets.
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+
+        shared = {}
+        for gram in query:
+            for key in self.grams.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        # dice upper bound needs enough shared grams → prune early
+        min_shared = threshold * len(query) / 2
+        scored = (
+            (key, 2 * count / (len(query) + len(self._grams_of[key])))
+            for key, count in shared.items()
+            if count >= min_shared
+        )
+
+        return heapq.nlargest(
+            limit,
+            ((key, score) for key, score in scored if score >= threshold),
+            key=lambda item: item[1],
+        )
+
+
+# ---------------------------------------------------------------------
+# LOADING
+# ---------------------------------------------------------------------
+
+def _fetch_records(doctype: str, names=None) -> list:
+    source = ENTITY_SOURCES[doctype]
+    filters = dict(source["filters"])
+    if names is not None:
+        filters["name"] = ["in", list(names)]
+
+    return frappe.get_all(
+        doctype,
+        filters=filters,
+        fields=list(dict.fromkeys(["name", source["label_field"]])),
+        limit_page_length=0,
+    )
+
+
+def build_entity_index(doctype: str) -> EntityIndex:
+    label_field = ENTITY_SOURCES[doctype]["label_field"]
+
+    index = EntityIndex()
+    for row in _fetch_records(doctype):
+        index.add(row["name"], row.get(label_field))
+    return index
+
+
+def apply_changes(index: EntityIndex, doctype: str, names):
+    """
+    Re-read changed records in one query; those no longer matching the
+    source filters (or deleted) leave the index.
+    """
+    names = set(names)
+    label_field = ENTITY_SOURCES[doctype]["label_field"]
+
+    found = set()
+    for row in _fetch_records(doctype, names):
+        index.add(row["name"], row.get(label_field))
+        found.add(row["name"])
+
+    for name in names - found:
+        index.remove(name)
+
+
+# ---------------------------------------------------------------------
+# PER-SITE REGISTRY
+# ---------------------------------------------------------------------
+
+_lock = threading.Lock()
+
+# (site, doctype) -> {"seq": int, "index": EntityIndex}
+_indexes = {}
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def get_entity_seq(doctype: str) -> int:
+    """
+    Change counter of doctype, read from redis once per request / job.
+    """
+    seqs = getattr(frappe.local, "query_builder_entity_seqs", None)
+    if seqs is None:
+        seqs = frappe.local.query_builder_entity_seqs = {}
+
+    if doctype not in seqs:
+        cache = frappe.cache()
+        seqs[doctype] = int(cache.get(cache.make_key(SEQ_KEY + doctype)) or 0)
+
+    return seqs[doctype]
+
+
+def read_changes(doctype: str):
+    """
+    (seq, changed names) read in one MULTI, so the log always holds
+    exactly the entries counted up to seq.
+    """
+    cache = frappe.cache()
+    pipe = cache.pipeline()
+    pipe.get(cache.make_key(SEQ_KEY + doctype))
+    pipe.lrange(cache.make_key(LOG_KEY + doctype), -LOG_MAX, -1)
+    seq, log = pipe.execute()
+    return int(seq or 0), [_decode(name) for name in log]
+
+
+def get_entity_index(doctype: str) -> EntityIndex:
+    """
+    Up-to-date index of doctype: built once per worker, then refreshed
+    from the change log. Reads the DB → request thread only.
+    """
+    key = (getattr(frappe.local, "site", None) or "", doctype)
+    seq = get_entity_seq(doctype)
+
+    with _lock:
+        entry = _indexes.get(key)
+
+        if entry is not None and entry["seq"] == seq:
+            return entry["index"]
+
+        seq, log = read_changes(doctype)
+        frappe.local.query_builder_entity_seqs[doctype] = seq
+
+        behind = seq - entry["seq"] if entry is not None else None
+
+        if behind is not None and 0 <= behind <= len(log):
+            if behind:
+                apply_changes(entry["index"], doctype, set(log[-behind:]))
+        else:
+            # new worker, log trimmed past us or counter reset → full reload
+            entry = {"index": build_entity_index(doctype)}
+            _indexes[key] = entry
+
+        entry["seq"] = seq
+        return entry["index"]
+
+
+# ---------------------------------------------------------------------
+# CHANGE HOOKS
+# ---------------------------------------------------------------------
+
+def record_changes(doctype: str, names):
+    cache = frappe.cache()
+    log_key = cache.make_key(LOG_KEY + doctype)
+
+    # one MULTI: log entries and counter always move together
+    pipe = cache.pipeline()
+    for name in names:
+        pipe.rpush(log_key, name)
+    pipe.ltrim(log_key, -LOG_MAX, -1)
+    pipe.incrby(cache.make_key(SEQ_KEY + doctype), len(names))
+    pipe.execute()
+
+
+def on_entity_change(doc, method=None, *args):
+    """
+    doc_events hook (on_update / on_trash / after_rename) for every
+    ENTITY_SOURCES doctype. after_rename passes (old, new, merge).
+    """
+    if doc.doctype not in ENTITY_SOURCES:
+        return
+
+    names = [doc.name]
+    if method == "after_rename" and args:
+        names.append(args[0])
+
+    def flush():
+        try:
+            record_changes(doc.doctype, names)
+        except Exception:
+            # index refresh is best effort; never block the save
+            pass
+
+    # after commit, so a worker refreshing right away reads the new row
+    after_commit = getattr(frappe.db, "after_commit", None)
+    if after_commit is not None:
+        after_commit.add(flush)
+    else:
+        flush()
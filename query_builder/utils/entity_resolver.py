@@ -1,26 +1,275 @@
 # query_builder/utils/entity_resolver.py
 
 import re
+from difflib import SequenceMatcher
+
 import frappe
 
+from query_builder.utils.entity_index import (
+    ENTITY_SOURCES,
+    LINK_DOCTYPES,
+    get_entity_index,
+    is_enabled,
+    tokenize,
+)
+from query_builder.utils.keyword_index import STOPWORDS
+
 
 EMPLOYEE_NAME_PATTERN = re.compile(
     r"\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b"
 )
 
+# fuzzy matching only for runs this long (single words are too noisy)
+FUZZY_MIN_WORDS = 2
 
-def resolve_entities(query: str) -> dict:
+# best fuzzy hit must lead the runner-up by this much
+FUZZY_MARGIN = 0.1
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# link values: words next to a cue tried as a fuzzy mention
+MAX_CUE_WINDOW = 3
+
+# words that only quantify a cue ("all departments", "every shift")
+QUANTIFIERS = STOPWORDS | {"every", "each", "any", "some", "other", "total"}
+
+# trigram candidates (loose, top-k bounded), then edit-distance ratio
+LINK_CANDIDATE_THRESHOLD = 0.3
+LINK_MATCH_THRESHOLD = 0.8
+
+
+def match_row(doctype: str, key: str, label: str) -> dict:
+    row = {"name": key}
+    label_field = ENTITY_SOURCES[doctype]["label_field"]
+    if label_field != "name":
+        row[label_field] = label
+    return row
+
+
+def clarify(doctype: str, index, keys) -> dict:
+    return {
+        "clarification_required": True,
+        "entity": doctype,
+        "matches": [match_row(doctype, key, index.labels[key]) for key in sorted(keys)],
+    }
+
+
+# ---------------------------------------------------------------------
+# INDEXED LOOKUP
+# ---------------------------------------------------------------------
+
+def find_name_spans(run: str, index) -> list:
+    """
+    Employee mentions in a capitalized run, as [(span_text, keys)]:
+    the whole run when it names employees (exactly, or fuzzily with a
+    clear winner), otherwise its longest unambiguous word spans, left
+    to right ("Show Leave For John Smith" → "John Smith").
+    """
+    words = run.split()
+
+    keys = index.match_tokens(tokenize(run))
+    if keys:
+        return [(run, keys)]
+
+    if len(words) >= FUZZY_MIN_WORDS:
+        hits = index.fuzzy(run)
+        # only a clear winner rewrites; near ties are left to the LLM
+        if hits and (len(hits) == 1 or hits[0][1] - hits[1][1] >= FUZZY_MARGIN):
+            return [(run, {hits[0][0]})]
+
+    spans = []
+    i = 0
+    while i < len(words):
+        for j in range(min(len(words), i + len(words) - 1), i, -1):
+            keys = index.match_tokens(tokenize(" ".join(words[i:j])))
+            # a fragment matching several people is not a mention
+            if len(keys) == 1:
+                spans.append((" ".join(words[i:j]), keys))
+                i = j
+                break
+        else:
+            i += 1
+
+    return spans
+
+
+def resolve_with_index(query: str, candidates: list) -> dict:
+    index = get_entity_index("Employee")
+
+    for run in candidates:
+        for span, keys in find_name_spans(run, index):
+            if len(keys) > 1:
+                return clarify("Employee", index, keys)
+
+            query = query.replace(span, next(iter(keys)))
+
+    return {"query": query}
+
+
+# ---------------------------------------------------------------------
+# LINK VALUES (DEPARTMENT, SHIFT TYPE, ...)
+# ---------------------------------------------------------------------
+
+def closest_label(index, text: str):
+    """
+    (key, ratio) of the label nearest to text, or None when there is no
+    clear winner: trigram candidates, re-ranked by edit-distance ratio.
+    """
+    scored = sorted(
+        (
+            (key, SequenceMatcher(None, text, " ".join(tokenize(index.labels[key]))).ratio())
+            for key, _ in index.fuzzy(text, threshold=LINK_CANDIDATE_THRESHOLD)
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    if not scored or scored[0][1] < LINK_MATCH_THRESHOLD:
+        return None
+    if len(scored) > 1 and scored[0][1] - scored[1][1] < FUZZY_MARGIN:
+        return None
+    return scored[0]
+
+
+def find_link_mentions(words: list, indexes: dict) -> list:
+    """
+    Link values named in the query words, as [(i, j, doctype, keys)]
+    over words[i:j], non-overlapping:
+    1. whole labels, longest first ("casual leave"); one-word labels
+       only next to a cue of their DocType ("sales dept")
+    2. fuzzy, the words just before a cue ("sals dept", "nigth shift")
     """
-    Resolve employee names before LLM call.
+    cues = [
+        {dt for dt in indexes if word in ENTITY_SOURCES[dt]["cues"]}
+        for word in words
+    ]
+
+    def cued(doctype, i, j):
+        return any(doctype in cues[k] for k in range(max(0, i - 1), min(len(words), j + 1)))
+
+    mentions = []
+    taken = set()
+    longest = max((index.max_phrase for index in indexes.values()), default=0)
+
+    # ---- exact labels ----
+    i = 0
+    while i < len(words):
+        for j in range(min(len(words), i + longest), i, -1):
+            if all(cues[k] or words[k] in QUANTIFIERS for k in range(i, j)):
+                continue   # "departments", "all departments" name no value
+
+            hits = [
+                (dt, index.match_phrase(words[i:j]))
+                for dt, index in indexes.items()
+                if index.match_phrase(words[i:j]) and (j - i > 1 or cued(dt, i, j))
+            ]
+            if len(hits) > 1:
+                # same label in several DocTypes → the cued one, if any
+                hits = [(dt, keys) for dt, keys in hits if cued(dt, i, j)]
+
+            if len(hits) == 1:
+                mentions.append((i, j, *hits[0]))
+                taken.update(range(i, j))
+                i = j
+                break
+        else:
+            i += 1
+
+    # ---- fuzzy, around cues ----
+    for p, doctypes in enumerate(cues):
+        if p in taken:
+            continue
+
+        for doctype in doctypes:
+            best = None
+            for k in range(1, MAX_CUE_WINDOW + 1):
+                i = p - k
+                if i < 0 or words[i] in STOPWORDS or taken & set(range(i, p + 1)):
+                    break
+
+                # with and without the cue ("night shift" is a label)
+                for j in (p, p + 1):
+                    hit = closest_label(indexes[doctype], " ".join(words[i:j]))
+                    if hit and (best is None or hit[1] > best[3]):
+                        best = (i, j, hit[0], hit[1])
+
+            if best:
+                i, j, key, _ = best
+                mentions.append((i, j, doctype, {key}))
+                taken.update(range(i, j))
+                break
+
+    return sorted(mentions)
+
+
+def get_link_indexes() -> dict:
+    indexes = {}
+    for doctype in LINK_DOCTYPES:
+        try:
+            indexes[doctype] = get_entity_index(doctype)
+        except Exception:
+            # DocType missing on this site (e.g. no HRMS) → skip it
+            continue
+    return indexes
+
+
+def resolve_link_values(query: str) -> dict:
+    """
+    Rewrite Link values in the query to their exact names and list them
+    as `entities` for the prompt; an exact label shared by several
+    records asks for clarification.
+    """
+    indexes = get_link_indexes()
+    if not indexes:
+        return {"query": query}
+
+    spans = [(m.start(), m.end()) for m in WORD_PATTERN.finditer(query)]
+    words = [query[start:end].lower() for start, end in spans]
+
+    entities = []
+    replacements = []   # (start, end, name)
+    for i, j, doctype, keys in find_link_mentions(words, indexes):
+        if len(keys) > 1:
+            return clarify(doctype, indexes[doctype], keys)
+
+        start, end = spans[i][0], spans[j - 1][1]
+        name = next(iter(keys))
+        entities.append({"doctype": doctype, "name": name, "text": query[start:end]})
+        replacements.append((start, end, name))
+
+    if not entities:
+        return {"query": query}
+
+    # right to left, so earlier offsets stay valid
+    for start, end, name in reversed(replacements):
+        query = query[:start] + name + query[end:]
+
+    return {"query": query, "entities": entities}
+
+
+# ---------------------------------------------------------------------
+# DB FALLBACK (ONE QUERY)
+# ---------------------------------------------------------------------
+
+def resolve_with_db(query: str, candidates: list) -> dict:
     """
-    candidates = EMPLOYEE_NAME_PATTERN.findall(query)
+    Previous LIKE semantics, batched into a single query.
+    """
+    # same population as the index (ENTITY_SOURCES filters)
+    rows = frappe.get_all(
+        "Employee",
+        filters=ENTITY_SOURCES["Employee"]["filters"],
+        or_filters=[["employee_name", "like", f"%{name}%"] for name in candidates],
+        fields=["name", "employee_name"],
+        limit_page_length=0,
+    )
 
     for name in candidates:
-        matches = frappe.get_all(
-            "Employee",
-            filters={"employee_name": ["like", f"%{name}%"]},
-            fields=["name", "employee_name"],
-        )
+        matches = [
+            {"name": r["name"], "employee_name": r["employee_name"]}
+            for r in rows
+            if name.lower() in (r["employee_name"] or "").lower()
+        ]
 
         if len(matches) > 1:
             return {
@@ -33,3 +282,35 @@ def resolve_entities(query: str) -> dict:
             query = query.replace(name, matches[0]["name"])
 
     return {"query": query}
+
+
+def resolve_employees(query: str) -> dict:
+    candidates = list(dict.fromkeys(EMPLOYEE_NAME_PATTERN.findall(query)))
+    if not candidates:
+        return {"query": query}
+
+    if is_enabled():
+        try:
+            return resolve_with_index(query, candidates)
+        except Exception:
+            # index unavailable (e.g. redis down) → one DB round trip
+            pass
+
+    return resolve_with_db(query, candidates)
+
+
+def resolve_entities(query: str) -> dict:
+    """
+    Resolve employee names, then Link values (departments, leave types,
+    shifts, ...) before LLM call.
+    Returns {"query", "entities"?} or a clarification.
+    """
+    result = resolve_employees(query)
+    if result.get("clarification_required") or not is_enabled():
+        return result
+
+    try:
+        return resolve_link_values(result["query"])
+    except Exception:
+        # Link values are a hint; the LLM still sees the plain query
+        return result
@@ -0,0 +1,126 @@
+# query_builder/utils/field_index.py
+
+import frappe
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Optional chunked index: one vector per DocType summary + one per field
+FIELD_COLLECTION_NAME = "query_builder_hrms_fields"
+
+# site_config key (default off)
+CONF_ENABLED = "query_builder_field_index"
+
+# chunk hits fetched per query before aggregating back to DocTypes
+FIELD_CANDIDATES = 40
+
+SUMMARY_KIND = "summary"
+FIELD_KIND = "field"
+
+
+def is_enabled() -> bool:
+    return bool(frappe.conf.get(CONF_ENABLED))
+
+
+# ---------------------------------------------------------------------
+# SCHEMA → CHUNKS
+# ---------------------------------------------------------------------
+
+def summary_text(schema: dict) -> str:
+    lines = [
+        f"DocType: {schema['doctype']}",
+        f"Description: {schema['description']}",
+    ]
+
+    if schema.get("links"):
+        lines.append("Links to: " + ", ".join(
+            sorted({l["linked_doctype"] for l in schema["links"]})
+        ))
+
+    return "\n".join(lines)
+
+
+def field_text(schema: dict, field: dict) -> str:
+    line = (
+        f"{schema['doctype']} field {field.get('label') or field['fieldname']} "
+        f"({field['fieldname']}): {field['type']}, {field['class']}"
+    )
+
+    if field.get("options"):
+        line += " → " + ", ".join(o for o in str(field["options"]).split("\n") if o)
+
+    if field.get("description"):
+        line += f". {field['description']}"
+
+    return line
+
+
+def schema_to_chunks(schema_list):
+    """
+    documents, ids, metadatas of the chunked index. Every chunk carries
+    its parent DocType's metadata; field chunks also their fieldname.
+    """
+    documents = []
+    ids = []
+    metadatas = []
+
+    for schema in schema_list:
+        parent = {
+            "doctype": schema["doctype"],
+            "module": schema["module"] or "",
+            "is_submittable": schema["is_submittable"],
+        }
+
+        documents.append(summary_text(schema))
+        ids.append(f"summary::{schema['doctype']}")
+        metadatas.append({**parent, "kind": SUMMARY_KIND})
+
+        for field in schema["fields"]:
+            documents.append(field_text(schema, field))
+            ids.append(f"field::{schema['doctype']}::{field['fieldname']}")
+            metadatas.append({**parent, "kind": FIELD_KIND, "fieldname": field["fieldname"]})
+
+    return documents, ids, metadatas
+
+
+# ---------------------------------------------------------------------
+# CHUNK HITS → DOCTYPES
+# ---------------------------------------------------------------------
+
+def aggregate_chunk_hits(ids, documents, metadatas, distances, top_k: int) -> dict:
+    """
+    Fold one query's chunk hits (nearest first) into a retrieve_schema
+    shaped result: DocTypes ranked by their best chunk, each metadata
+    with the `matched_fields` hit for that DocType, nearest first.
+    """
+    by_doctype = {}
+
+    for document, meta, distance in zip(documents or [None] * len(ids), metadatas, distances, strict=True):
+        doctype = meta["doctype"]
+
+        entry = by_doctype.get(doctype)
+        if entry is None:
+            entry = by_doctype[doctype] = {
+                "id": f"schema::{doctype}",
+                "document": document,
+                "distance": distance,
+                "metadata": {
+                    "doctype": doctype,
+                    "module": meta.get("module"),
+                    "is_submittable": meta.get("is_submittable"),
+                    "matched_fields": [],
+                },
+            }
+
+        if meta.get("kind") == FIELD_KIND:
+            entry["metadata"]["matched_fields"].append(meta["fieldname"])
+
+    ranked = sorted(by_doctype.values(), key=lambda e: e["distance"])[:top_k]
+
+    return {
+        "ids": [[e["id"] for e in ranked]],
+        "documents": [[e["document"] for e in ranked]],
+        "metadatas": [[e["metadata"] for e in ranked]],
+        "distances": [[e["distance"] for e in ranked]],
+    }
@@ -0,0 +1,288 @@
+# query_builder/utils/index_advisor.py
+
+import json
+import re
+
+import frappe
+
+from query_builder.utils.join_graph import parse_condition
+from query_builder.utils.schema_registry import resolve_field_doctype
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# redis hash: usage pattern (json) -> executions
+USAGE_KEY = "query_builder:index_usage"
+
+EQUALITY_OPS = {"=", "in"}
+RANGE_OPS = {">", "<", ">=", "<=", "between"}
+
+# Assumed share of scanned rows an index would still read when
+# EXPLAIN reports no `filtered` estimate
+DEFAULT_SELECTIVITY = 0.01
+
+# MariaDB caps composite indexes; long ones rarely pay off anyway
+MAX_INDEX_COLUMNS = 4
+
+COLUMN_PATTERN = re.compile(r"^\w+$")
+
+
+# ---------------------------------------------------------------------
+# USAGE RECORDING
+# ---------------------------------------------------------------------
+
+def extract_usage_patterns(intent: dict) -> list:
+    """
+    (doctype, kind, equality columns, range column) per table touched
+    by the intent's filters, join keys and group_by.
+    """
+    doctypes = [intent["doctype"]] + [j["doctype"] for j in intent.get("joins") or []]
+
+    filters = {}  # doctype -> {"eq": set, "range": list}
+    for f in intent.get("filters") or []:
+        doctype, column = resolve_field_doctype(f.get("field") or "", doctypes)
+        if not doctype:
+            continue
+
+        entry = filters.setdefault(doctype, {"eq": set(), "range": []})
+        if f.get("op") in EQUALITY_OPS:
+            entry["eq"].add(column)
+        elif f.get("op") in RANGE_OPS and column not in entry["range"]:
+            entry["range"].append(column)
+
+    patterns = []
+    for doctype, entry in filters.items():
+        patterns.append((
+            doctype,
+            "filter",
+            sorted(entry["eq"])[:MAX_INDEX_COLUMNS],
+            entry["range"][0] if entry["range"] else None,
+        ))
+
+    for j in intent.get("joins") or []:
+        parsed = parse_condition(j.get("condition"))
+        if not parsed:
+            continue
+        left_dt, left_col, right_dt, right_col, _ = parsed
+        for doctype, column in ((left_dt, left_col), (right_dt, right_col)):
+            if column != "name":
+                patterns.append((doctype, "join", [column], None))
+
+    group_by = {}
+    for g in intent.get("group_by") or []:
+        doctype, column = resolve_field_doctype(g, doctypes)
+        if doctype:
+            group_by.setdefault(doctype, []).append(column)
+
+    for doctype, columns in group_by.items():
+        patterns.append((doctype, "group_by", columns[:MAX_INDEX_COLUMNS], None))
+
+    return patterns
+
+
+def record_intent_usage(intent: dict):
+    """
+    Count filter / join / group_by column usage of an executed intent.
+    Best effort: never fails the query.
+    """
+    try:
+        cache = frappe.cache()
+        key = cache.make_key(USAGE_KEY)
+
+        for pattern in extract_usage_patterns(intent):
+            cache.hincrby(key, json.dumps(pattern), 1)
+    except Exception:
+        pass
+
+
+def get_usage() -> list:
+    cache = frappe.cache()
+
+    # raw scan: RedisWrapper.hgetall unpickles values, hincrby writes ints
+    usage = []
+    for member, count in cache.hscan_iter(cache.make_key(USAGE_KEY)):
+        if isinstance(member, bytes):
+            member = member.decode()
+        doctype, kind, eq_cols, range_col = json.loads(member)
+        usage.append({
+            "doctype": doctype,
+            "kind": kind,
+            "equality_columns": eq_cols,
+            "range_column": range_col,
+            "count": int(count),
+        })
+
+    return usage
+
+
+def reset_usage():
+    cache = frappe.cache()
+    cache.delete(cache.make_key(USAGE_KEY))
+
+
+# ---------------------------------------------------------------------
+# EXISTING INDEXES
+# ---------------------------------------------------------------------
+
+def get_table_indexes(doctype: str) -> dict:
+    """
+    index name -> ordered column list, from SHOW INDEX.
+    """
+    rows = frappe.db.sql(f"SHOW INDEX FROM `tab{doctype}`", as_dict=True)
+
+    indexes = {}
+    for row in sorted(rows, key=lambda r: (r["Key_name"], r["Seq_in_index"])):
+        indexes.setdefault(row["Key_name"], []).append(row["Column_name"])
+
+    return indexes
+
+
+def recommended_columns(eq_cols, range_col) -> list:
+    # equality columns first, then (at most) one range column
+    columns = list(eq_cols)
+    if range_col and range_col not in columns:
+        columns.append(range_col)
+    return columns[:MAX_INDEX_COLUMNS]
+
+
+def is_covered(eq_cols, range_col, indexes: dict) -> bool:
+    """
+    True when some index starts with all equality columns (any order)
+    followed by the range column.
+    """
+    width = len(eq_cols)
+
+    for columns in indexes.values():
+        if set(columns[:width]) != set(eq_cols):
+            continue
+        if range_col is None or range_col in eq_cols:
+            return True
+        if len(columns) > width and columns[width] == range_col:
+            return True
+
+    return False
+
+
+# ---------------------------------------------------------------------
+# EXPLAIN ESTIMATE
+# ---------------------------------------------------------------------
+
+def explain_pattern(doctype: str, columns: list) -> dict:
+    """
+    EXPLAIN a representative lookup on columns, using the most recent
+    row's values. Returns access type, rows examined and matches.
+    """
+    table = f"`tab{doctype}`"
+    select = ", ".join(f"`{c}`" for c in columns)
+
+    sample = frappe.db.sql(
+        f"SELECT {select} FROM {table} ORDER BY `modified` DESC LIMIT 1",
+        as_dict=True,
+    )
+    if not sample:
+        return {}
+
+    where = " AND ".join(f"`{c}` = %({c})s" for c in columns)
+    plan = frappe.db.sql(
+        f"EXPLAIN SELECT `name` FROM {table} WHERE {where}",
+        sample[0],
+        as_dict=True,
+    )
+    if not plan:
+        return {}
+
+    row = plan[0]
+    rows_examined = int(row.get("rows") or 0)
+
+    filtered = row.get("filtered")
+    selectivity = float(filtered) / 100 if filtered not in (None, "") else DEFAULT_SELECTIVITY
+
+    return {
+        "access_type": row.get("type"),
+        "index_used": row.get("key"),
+        "rows_examined": rows_examined,
+        "estimated_matches": max(1, int(rows_examined * selectivity)),
+    }
+
+
+# ---------------------------------------------------------------------
+# REPORT
+# ---------------------------------------------------------------------
+
+def build_index_report(limit: int = 20) -> list:
+    """
+    Missing composite indexes for observed usage, ranked by estimated
+    rows scanned that an index would avoid (per query, times executions).
+    """
+    grouped = {}
+    for u in get_usage():
+        columns = recommended_columns(u["equality_columns"], u["range_column"])
+        if not columns:
+            continue
+
+        key = (u["doctype"], tuple(columns))
+        entry = grouped.setdefault(key, {**u, "columns": columns, "count": 0, "kinds": set()})
+        entry["count"] += u["count"]
+        entry["kinds"].add(u["kind"])
+
+    index_cache = {}
+    report = []
+
+    for (doctype, columns), u in grouped.items():
+        try:
+            if doctype not in index_cache:
+                index_cache[doctype] = get_table_indexes(doctype)
+            indexes = index_cache[doctype]
+
+            if is_covered(u["equality_columns"], u["range_column"], indexes):
+                continue
+
+            estimate = explain_pattern(doctype, list(columns))
+        except Exception:
+            # table missing / column dropped since recording
+            continue
+
+        saved_per_query = max(
+            0,
+            estimate.get("rows_examined", 0) - estimate.get("estimated_matches", 0),
+        )
+
+        report.append({
+            "doctype": doctype,
+            "columns": list(columns),
+            "kinds": sorted(u["kinds"]),
+            "executions": u["count"],
+            "access_type": estimate.get("access_type"),
+            "index_used": estimate.get("index_used"),
+            "rows_examined": estimate.get("rows_examined"),
+            "estimated_rows_saved": saved_per_query * u["count"],
+            "index_name": make_index_name(list(columns)),
+        })
+
+    report.sort(key=lambda r: r["estimated_rows_saved"], reverse=True)
+    return report[:limit]
+
+
+def make_index_name(columns: list) -> str:
+    return ("qb_" + "_".join(columns))[:64]
+
+
+# ---------------------------------------------------------------------
+# OPT-IN CREATION
+# ---------------------------------------------------------------------
+
+def create_index(doctype: str, columns: list) -> str:
+    if not columns or len(columns) > MAX_INDEX_COLUMNS:
+        frappe.throw(f"Provide between 1 and {MAX_INDEX_COLUMNS} columns")
+
+    for column in columns:
+        if not COLUMN_PATTERN.match(column) or not frappe.db.has_column(doctype, column):
+            frappe.throw(f"Unknown column {column} on {doctype}")
+
+    if is_covered(columns[:-1], columns[-1], get_table_indexes(doctype)):
+        frappe.throw("An equivalent index already exists")
+
+    index_name = make_index_name(columns)
+    frappe.db.add_index(doctype, columns, index_name=index_name)
+    return index_name
@@ -0,0 +1,221 @@
+# query_builder/utils/intent_cache.py
+
+import copy
+import hashlib
+import math
+import re
+import time
+
+import frappe
+
+from query_builder.utils.embedding_cache import embed_query, normalize_query
+from query_builder.utils.intent_parser import MODEL, parse_intent, parse_intent_stream
+from query_builder.utils.intent_prompt import PROMPT_VERSION
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+DEFAULT_TTL = 24 * 3600  # seconds
+
+# Max cached queries per schema prompt for the semantic tier
+SEMANTIC_BUCKET_SIZE = 50
+
+# site_config keys
+CONF_ENABLED = "query_builder_intent_cache"             # default on
+CONF_TTL = "query_builder_intent_cache_ttl"
+CONF_DISTANCE = "query_builder_intent_cache_distance"   # cosine distance, 0 = semantic tier off
+
+EXACT_PREFIX = "query_builder:intent:"
+SEMANTIC_PREFIX = "query_builder:intent_semantic:"
+
+# Tokens carrying literal values (IDs, numbers, dates). Two queries are
+# only semantically interchangeable when these match exactly.
+LITERAL_TOKEN_PATTERN = re.compile(r"\S*\d\S*")
+
+
+# ---------------------------------------------------------------------
+# KEYS
+# ---------------------------------------------------------------------
+
+def _hash(*parts) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def make_schema_key(schema_text: str, model: str = MODEL) -> str:
+    return _hash(PROMPT_VERSION, model, schema_text)
+
+
+def make_intent_key(schema_text: str, query: str, model: str = MODEL) -> str:
+    # raw text: casing reaches the LLM and can change its output
+    return _hash(PROMPT_VERSION, model, schema_text, query.strip())
+
+
+def literal_tokens(query: str) -> list:
+    return sorted(LITERAL_TOKEN_PATTERN.findall(normalize_query(query)))
+
+
+# ---------------------------------------------------------------------
+# SETTINGS
+# ---------------------------------------------------------------------
+
+def is_enabled() -> bool:
+    return bool(frappe.conf.get(CONF_ENABLED, True))
+
+
+def get_ttl() -> int:
+    return int(frappe.conf.get(CONF_TTL) or DEFAULT_TTL)
+
+
+def get_max_distance() -> float:
+    return float(frappe.conf.get(CONF_DISTANCE) or 0.0)
+
+
+# ---------------------------------------------------------------------
+# SEMANTIC TIER
+# ---------------------------------------------------------------------
+
+def cosine_distance(a, b) -> float:
+    if len(a) != len(b):
+        # stored under another embedding model
+        return 1.0
+
+    dot = sum(x * y for x, y in zip(a, b, strict=True))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    if not norm:
+        return 1.0
+    return 1.0 - dot / norm
+
+
+def _find_semantic_match(schema_key: str, query: str, max_distance: float):
+    bucket = frappe.cache().get_value(SEMANTIC_PREFIX + schema_key) or []
+    if not bucket:
+        return None
+
+    embedding = embed_query(query)
+    literals = literal_tokens(query)
+
+    best, best_distance = None, max_distance
+    for entry in bucket:
+        if entry["literals"] != literals:
+            continue
+
+        distance = cosine_distance(embedding, entry["embedding"])
+        if distance <= best_distance:
+            best, best_distance = entry, distance
+
+    if not best:
+        return None
+
+    intent = frappe.cache().get_value(EXACT_PREFIX + best["intent_key"])
+    if intent is None:
+        return None
+
+    return intent, round(best_distance, 6)
+
+
+def _remember_semantic(schema_key: str, intent_key: str, query: str, ttl: int):
+    key = SEMANTIC_PREFIX + schema_key
+    bucket = frappe.cache().get_value(key) or []
+
+    bucket = [e for e in bucket if e["intent_key"] != intent_key]
+    bucket.append({
+        "intent_key": intent_key,
+        "embedding": embed_query(query),
+        "literals": literal_tokens(query),
+    })
+
+    frappe.cache().set_value(
+        key,
+        bucket[-SEMANTIC_BUCKET_SIZE:],
+        expires_in_sec=ttl,
+    )
+
+
+# ---------------------------------------------------------------------
+# CACHED PARSE
+# ---------------------------------------------------------------------
+
+def _from_cache(intent: dict, hit: str, lookup_ms: float, distance=None) -> dict:
+    intent = copy.deepcopy(intent)
+    original = intent.get("_meta") or {}
+
+    meta = dict(original)
+    meta["cache_hit"] = hit
+    meta["latency_ms"] = lookup_ms
+    meta["original_latency_ms"] = original.get("latency_ms")
+    if distance is not None:
+        meta["cache_distance"] = distance
+
+    intent["_meta"] = meta
+    return intent
+
+
+def get_cached_intent(schema_text: str, query: str):
+    """
+    Exact hit first, then the semantic tier (when enabled).
+    Returns an intent carrying _meta.cache_hit, or None.
+    """
+    start = time.perf_counter()
+
+    intent_key = make_intent_key(schema_text, query)
+    intent = frappe.cache().get_value(EXACT_PREFIX + intent_key)
+    if intent is not None:
+        lookup_ms = round((time.perf_counter() - start) * 1000, 2)
+        return _from_cache(intent, "exact", lookup_ms)
+
+    max_distance = get_max_distance()
+    if max_distance <= 0:
+        return None
+
+    match = _find_semantic_match(make_schema_key(schema_text), query, max_distance)
+    if not match:
+        return None
+
+    intent, distance = match
+    lookup_ms = round((time.perf_counter() - start) * 1000, 2)
+    return _from_cache(intent, "semantic", lookup_ms, distance)
+
+
+def store_intent(schema_text: str, query: str, intent: dict):
+    ttl = get_ttl()
+    intent_key = make_intent_key(schema_text, query)
+
+    frappe.cache().set_value(EXACT_PREFIX + intent_key, intent, expires_in_sec=ttl)
+
+    if get_max_distance() > 0:
+        _remember_semantic(make_schema_key(schema_text), intent_key, query, ttl)
+
+
+def _parse(schema_text: str, query: str, on_partial=None) -> dict:
+    if on_partial:
+        return parse_intent_stream(schema_text, query, on_partial)
+    return parse_intent(schema_text, query)
+
+
+def parse_intent_cached(schema_text: str, query: str, on_partial=None) -> dict:
+    """
+    parse_intent() behind the exact + semantic intent cache.
+    With on_partial, misses stream the LLM response (see parse_intent_stream).
+    """
+    if not is_enabled():
+        return _parse(schema_text, query, on_partial)
+
+    try:
+        cached = get_cached_intent(schema_text, query)
+    except Exception:
+        # cache trouble must never block the LLM path
+        cached = None
+
+    if cached is not None:
+        return cached
+
+    intent = _parse(schema_text, query, on_partial)
+
+    try:
+        store_intent(schema_text, query, copy.deepcopy(intent))
+    except Exception:
+        pass
+
+    intent.setdefault("_meta", {})["cache_hit"] = False
+    return intent
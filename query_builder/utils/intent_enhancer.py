@@ -1,6 +1,6 @@
 from datetime import datetime
 from query_builder.utils.date_literals import resolve_date_literal
-from query_builder.utils.schema_extractor import extract_doctype_schema
+from query_builder.utils.schema_registry import get_compiled_schema
 
 
 # ---------------------------------------------------------------------
@@ -11,14 +11,8 @@ def resolve_filters(intent):
     resolved = []
 
     doctype = intent.get("doctype")
-    schema = extract_doctype_schema(doctype) if doctype else None
-
-    field_type_map = {}
-    if schema:
-        field_type_map = {
-            f["fieldname"]: f["type"]
-            for f in schema.get("fields", [])
-        }
+    compiled = get_compiled_schema(doctype) if doctype else None
+    field_type_map = compiled.field_types if compiled else {}
 
     for f in intent.get("filters", []):
 
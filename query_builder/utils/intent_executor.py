@@ -0,0 +1,544 @@
+# query_builder/utils/intent_executor.py
+
+import contextlib
+import json
+import operator
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import frappe
+from frappe.desk.reportview import get_match_cond
+from frappe.query_builder import DocType, Order
+from frappe.query_builder.functions import Avg, Count, Max, Min, Sum
+from pypika.terms import Criterion, ExistsCriterion, Parameter
+
+from query_builder.utils import result_cache
+from query_builder.utils.index_advisor import record_intent_usage
+from query_builder.utils.join_graph import is_fanout_join, join_column, parse_condition
+from query_builder.utils.schema_registry import (
+    get_compiled_schema,
+    get_schema_version,
+    resolve_field_doctype,
+)
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+DEFAULT_LIST_LIMIT = 500
+PLAN_CACHE_SIZE = 256
+
+# rows fetched per keyset page when streaming
+DEFAULT_CHUNK_SIZE = 1000
+
+# hidden columns carrying the keyset position of each streamed row
+SEEK_VALUE = "__seek_value"
+SEEK_NAME = "__seek_name"
+
+TEMPORAL_TYPES = {"Date", "Datetime", "Time"}
+RANGE_OPS = {"between", ">", ">=", "<", "<="}
+
+AGGREGATE_FUNCTIONS = {
+    "count": Count,
+    "sum": Sum,
+    "avg": Avg,
+    "min": Min,
+    "max": Max,
+}
+
+# aggregates that change when rows are repeated (min / max do not)
+DUPLICATE_SENSITIVE = {"count", "sum", "avg"}
+
+COMPARISON_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+
+
+# ---------------------------------------------------------------------
+# PLAN
+# ---------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Compiled, parameterized SQL for one intent shape.
+    Only the bound filter values change between executions.
+    """
+    sql: str
+    doctypes: tuple[str, ...]
+
+
+class RawCriterion(Criterion):
+    """
+    Pre-built SQL condition (permission match conditions).
+    """
+
+    def __init__(self, sql: str):
+        super().__init__()
+        self.sql = sql
+
+    def get_sql(self, **kwargs):
+        return f"({self.sql})"
+
+
+def _arity(f: dict) -> int:
+    value = f.get("value")
+    if f.get("op") == "in":
+        return len(value) if isinstance(value, (list, tuple)) else 1
+    if f.get("op") == "between":
+        return 2
+    return 1
+
+
+def intent_shape(intent: dict) -> str:
+    """
+    Everything that determines the SQL text — but no filter values.
+    """
+    return json.dumps({
+        "action": intent.get("action"),
+        "doctype": intent.get("doctype"),
+        "fields": list(intent.get("fields") or []),
+        "joins": [
+            [j.get("doctype"), j.get("field"), j.get("condition"), j.get("strategy") or "join"]
+            for j in intent.get("joins") or []
+        ],
+        "filters": [
+            [f.get("field"), f.get("op"), _arity(f)]
+            for f in intent.get("filters") or []
+        ],
+        "aggregate": intent.get("aggregate"),
+        "group_by": list(intent.get("group_by") or []),
+    }, sort_keys=True)
+
+
+def intent_params(intent: dict) -> dict:
+    """
+    Filter values, named to match the plan's placeholders.
+    """
+    params = {}
+    for i, f in enumerate(intent.get("filters") or []):
+        value = f.get("value")
+        if f.get("op") in {"in", "between"}:
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for j, v in enumerate(values):
+                params[f"p{i}_{j}"] = v
+        else:
+            params[f"p{i}"] = value
+    return params
+
+
+# ---------------------------------------------------------------------
+# COMPILATION
+# ---------------------------------------------------------------------
+
+def parse_join_condition(condition: str):
+    """
+    "Salary Slip.employee = Employee.name", optionally followed by
+    " and Doctype.column = 'value'" terms (child tables).
+    """
+    parsed = parse_condition(condition)
+    if not parsed:
+        frappe.throw(f"Unsupported join condition: {condition}")
+    return parsed
+
+
+def _resolve_column(field: str, tables: "OrderedDict"):
+    """
+    fieldname → pypika column on the first table defining it.
+    `Doctype.fieldname` picks a table explicitly.
+    """
+    doctype, fieldname = resolve_field_doctype(field, tables)
+    if not doctype:
+        frappe.throw(f"Unknown field: {field}")
+
+    return tables[doctype][fieldname]
+
+
+def _filter_criterion(column, op: str, index: int, arity: int):
+    if op == "in":
+        if not arity:
+            return RawCriterion("1=0")
+        return column.isin([Parameter(f"%(p{index}_{j})s") for j in range(arity)])
+
+    if op == "between":
+        return column.between(
+            Parameter(f"%(p{index}_0)s"),
+            Parameter(f"%(p{index}_1)s"),
+        )
+
+    return COMPARISON_OPERATORS[op](column, Parameter(f"%(p{index})s"))
+
+
+def has_fanout_joins(intent: dict) -> bool:
+    """
+    Whether a (non semi-) join can repeat base rows.
+    """
+    return any(
+        is_fanout_join(j) and j.get("strategy") != "exists"
+        for j in intent.get("joins") or []
+    )
+
+
+def repeating_joins(intent: dict, doctype: str) -> list:
+    """
+    1:N (non semi-) joined DocTypes that repeat the rows of doctype:
+    those doctype is not itself joined through.
+    """
+    parents = {}
+    for j in intent.get("joins") or []:
+        left_dt, _, right_dt, _, _ = parse_join_condition(j["condition"])
+        parents[j["doctype"]] = right_dt if left_dt == j["doctype"] else left_dt
+
+    behind = set()
+    while doctype and doctype not in behind:
+        behind.add(doctype)
+        doctype = parents.get(doctype)
+
+    return [
+        j["doctype"]
+        for j in intent.get("joins") or []
+        if is_fanout_join(j) and j.get("strategy") != "exists" and j["doctype"] not in behind
+    ]
+
+
+def _build_tables(intent: dict) -> "OrderedDict":
+    tables = OrderedDict()
+    tables[intent["doctype"]] = DocType(intent["doctype"])
+
+    for j in intent.get("joins") or []:
+        if j["doctype"] in tables:
+            frappe.throw(f"Cannot join {j['doctype']} more than once")
+        tables[j["doctype"]] = DocType(j["doctype"])
+
+    return tables
+
+
+def compile_plan(intent: dict, match_conditions=(), limit=None, seek=None) -> QueryPlan:
+    """
+    seek = (fieldname, after) compiles a keyset page for list intents:
+    ordered by (fieldname, name), limited to `limit` rows (every row
+    when limit is None), and — when `after` — starting past
+    %(seek_value)s / %(seek_name)s.
+    """
+    all_tables = _build_tables(intent)
+    base = all_tables[intent["doctype"]]
+
+    query = frappe.qb.from_(base)
+
+    # ---- Joins (semi-joins only collect their condition) ----
+    semi_joins = OrderedDict()   # doctype -> [criteria]
+    for j in intent.get("joins") or []:
+        left_dt, left_col, right_dt, right_col, literals = parse_join_condition(j["condition"])
+        referenced = {left_dt, right_dt} | {dt for dt, _, _ in literals}
+        if not referenced <= set(all_tables):
+            frappe.throw(f"Join condition references unknown doctype: {j['condition']}")
+
+        on = all_tables[left_dt][left_col] == all_tables[right_dt][right_col]
+        for dt, column, value in literals:
+            on &= all_tables[dt][column] == value
+        if j.get("strategy") == "exists":
+            semi_joins[j["doctype"]] = [on]
+        else:
+            query = query.left_join(all_tables[j["doctype"]]).on(on)
+
+    # semi-joined tables are only visible to filters
+    tables = OrderedDict((dt, t) for dt, t in all_tables.items() if dt not in semi_joins)
+
+    # ---- Projection / aggregation ----
+    action = intent.get("action")
+
+    if action == "aggregate":
+        agg = intent.get("aggregate") or {"function": "count", "field": "name"}
+        group_cols = [_resolve_column(g, tables) for g in intent.get("group_by") or []]
+
+        func = AGGREGATE_FUNCTIONS[agg["function"]]
+        agg_col = _resolve_column(agg["field"], tables)
+        agg_expr = func(agg_col)
+
+        # 1:N joins repeat the rows of every table not behind them
+        agg_doctype, agg_field = resolve_field_doctype(agg["field"], tables)
+        repeating = repeating_joins(intent, agg_doctype)
+        if repeating and agg["function"] == "count" and agg_field == "name":
+            # count each record once
+            agg_expr = agg_expr.distinct()
+        elif repeating and agg["function"] in DUPLICATE_SENSITIVE:
+            frappe.throw(
+                f"{agg['function']}({agg['field']}) would count each {agg_doctype} row once "
+                f"per {', '.join(repeating)} row; aggregate a {', '.join(repeating)} field "
+                f"or drop that join"
+            )
+
+        query = query.select(
+            *[col.as_(g) for col, g in zip(group_cols, intent.get("group_by") or [], strict=True)],
+            agg_expr.as_(f"{agg['function']}_{agg['field'].replace('.', '_')}"),
+        )
+        if group_cols:
+            query = query.groupby(*group_cols)
+    elif seek:
+        seek_field, after = seek
+        seek_col = base[seek_field]
+        fields = intent.get("fields") or ["name"]
+
+        query = query.select(
+            *[_resolve_column(f, tables).as_(f) for f in fields],
+            seek_col.as_(SEEK_VALUE),
+            base.name.as_(SEEK_NAME),
+        )
+
+        if after:
+            value, name = Parameter("%(seek_value)s"), Parameter("%(seek_name)s")
+            if seek_field == "name":
+                query = query.where(base.name > name)
+            else:
+                # expanded row comparison: range-optimizable on seek_col
+                query = query.where(
+                    (seek_col > value) | ((seek_col == value) & (base.name > name))
+                )
+
+        if seek_field != "name":
+            query = query.orderby(seek_col)
+        query = query.orderby(base.name)
+        if limit:
+            query = query.limit(limit)
+    else:
+        fields = intent.get("fields") or ["name"]
+        query = query.select(*[_resolve_column(f, tables).as_(f) for f in fields])
+        query = query.orderby(base.modified, order=Order.desc)
+        query = query.limit(1 if action == "single" else (limit or DEFAULT_LIST_LIMIT))
+
+    # ---- Filters (pushed down, parameterized) ----
+    for i, f in enumerate(intent.get("filters") or []):
+        doctype, _ = resolve_field_doctype(f["field"], all_tables)
+        column = _resolve_column(f["field"], all_tables)
+        criterion = _filter_criterion(column, f["op"], i, _arity(f))
+
+        if doctype in semi_joins:
+            semi_joins[doctype].append(criterion)
+        else:
+            query = query.where(criterion)
+
+    # ---- Semi-joins: EXISTS (select 1 from child where ...) ----
+    for doctype, criteria in semi_joins.items():
+        subquery = frappe.qb.from_(all_tables[doctype]).select(1)
+        for criterion in criteria:
+            subquery = subquery.where(criterion)
+        query = query.where(ExistsCriterion(subquery))
+
+    # ---- Row-level permissions ----
+    for cond in match_conditions:
+        query = query.where(RawCriterion(cond))
+
+    return QueryPlan(sql=query.get_sql(), doctypes=tuple(all_tables))
+
+
+# ---------------------------------------------------------------------
+# PLAN CACHE (PER WORKER)
+# ---------------------------------------------------------------------
+
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def get_plan(intent: dict, match_conditions=(), limit=None, seek=None) -> QueryPlan:
+    key = (
+        frappe.local.site,
+        get_schema_version(),
+        intent_shape(intent),
+        tuple(match_conditions),
+        limit,
+        seek,
+    )
+
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+
+    plan = compile_plan(intent, match_conditions, limit, seek)
+
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+
+    return plan
+
+
+# ---------------------------------------------------------------------
+# PERMISSIONS
+# ---------------------------------------------------------------------
+
+def get_intent_doctypes(intent: dict) -> list:
+    return [intent["doctype"]] + [j["doctype"] for j in intent.get("joins") or []]
+
+
+def get_join_parent(join: dict):
+    """
+    Parent DocType a child-table join hangs off (`Child.parent =
+    Parent.name ...`), or None when the join is not on `parent`.
+    """
+    if join_column(join) != "parent":
+        return None
+
+    left_dt, _, right_dt, _, _ = parse_join_condition(join["condition"])
+    return right_dt if left_dt == join["doctype"] else left_dt
+
+
+def check_permissions(intent: dict) -> list:
+    """
+    DocType-level read check + row-level match conditions
+    (user permissions, owner-only roles) for every table.
+
+    Child tables carry no permissions of their own: they cannot be the
+    base doctype, and a joined child must hang off a parent of the same
+    query, whose read check and match conditions then cover its rows
+    (like frappe.get_list with parent_doctype).
+    """
+    base = intent["doctype"]
+    if frappe.get_meta(base).istable:
+        frappe.throw(f"{base} is a child table and cannot be queried directly", frappe.PermissionError)
+
+    doctypes = get_intent_doctypes(intent)
+    conditions = []
+
+    for j in intent.get("joins") or []:
+        if not frappe.get_meta(j["doctype"]).istable:
+            continue
+
+        parent = get_join_parent(j)
+        if parent not in doctypes or frappe.get_meta(parent).istable:
+            frappe.throw(f"{j['doctype']} must be joined through its parent", frappe.PermissionError)
+
+        frappe.has_permission(j["doctype"], "read", parent_doctype=parent, throw=True)
+
+    for doctype in doctypes:
+        if frappe.get_meta(doctype).istable:
+            continue
+
+        frappe.has_permission(doctype, "read", throw=True)
+
+        # " and (...)" with % already escaped for parameterized execution
+        cond = get_match_cond(doctype).strip()
+        if cond.lower().startswith("and "):
+            cond = cond[4:]
+        if cond:
+            conditions.append(cond)
+
+    return conditions
+
+
+# ---------------------------------------------------------------------
+# EXECUTION
+# ---------------------------------------------------------------------
+
+def execute_intent(intent: dict, limit=None, use_cache=True) -> list:
+    """
+    Run a validated intent as a single parameterized query.
+    Returns rows as dicts, from the result cache when possible.
+    """
+    doctypes = get_intent_doctypes(intent)
+    match_conditions = check_permissions(intent)
+
+    cache_key = None
+    if use_cache and result_cache.is_enabled():
+        cache_key = result_cache.make_result_key(intent, doctypes, match_conditions, limit)
+        rows = result_cache.get_cached_result(cache_key)
+        if rows is not None:
+            return rows
+
+    plan = get_plan(intent, match_conditions, limit)
+    rows = frappe.db.sql(plan.sql, intent_params(intent), as_dict=True)
+    record_intent_usage(intent)
+
+    if cache_key:
+        result_cache.store_result(cache_key, intent, rows)
+
+    return rows
+
+
+# ---------------------------------------------------------------------
+# STREAMING (LIST INTENTS)
+# ---------------------------------------------------------------------
+
+def choose_seek_field(intent: dict) -> str:
+    """
+    Keyset column: the base doctype's temporal field that carries a
+    range filter (so pages walk that index), otherwise `name`.
+    """
+    compiled = get_compiled_schema(intent["doctype"])
+    if not compiled:
+        return "name"
+
+    for f in intent.get("filters") or []:
+        field = f.get("field") or ""
+        if "." in field:
+            continue
+        if f.get("op") in RANGE_OPS and compiled.field_types.get(field) in TEMPORAL_TYPES:
+            return field
+
+    return "name"
+
+
+def _unbuffered_cursor():
+    # server-side cursor where the DB layer offers one
+    factory = getattr(frappe.db, "unbuffered_cursor", None)
+    return factory() if factory else contextlib.nullcontext()
+
+
+def iter_intent_rows(intent: dict, chunk_size: int = DEFAULT_CHUNK_SIZE, seek_field=None):
+    """
+    Stream every row of a list intent, page by page (keyset pagination
+    on seek_field, name), each page read through an unbuffered cursor.
+    Memory stays bounded by chunk_size regardless of result size.
+
+    Intents with 1:N joins (child tables) repeat base names across rows,
+    so a page boundary could fall inside one base record: those are read
+    in a single ordered pass through the unbuffered cursor instead.
+
+    Do not run other queries on frappe.db between two rows of a page.
+    """
+    if intent.get("action") != "list":
+        frappe.throw("Only list intents can be streamed")
+
+    seek_field = seek_field or choose_seek_field(intent)
+
+    match_conditions = check_permissions(intent)
+    params = intent_params(intent)
+    after = False
+
+    record_intent_usage(intent)
+
+    if has_fanout_joins(intent):
+        plan = get_plan(intent, match_conditions, None, seek=(seek_field, False))
+        with _unbuffered_cursor():
+            for row in frappe.db.sql(plan.sql, params, as_dict=True, as_iterator=True):
+                row.pop(SEEK_VALUE)
+                row.pop(SEEK_NAME)
+                yield row
+        return
+
+    while True:
+        plan = get_plan(intent, match_conditions, chunk_size, seek=(seek_field, after))
+
+        count = 0
+        row = None
+
+        with _unbuffered_cursor():
+            for row in frappe.db.sql(plan.sql, params, as_dict=True, as_iterator=True):
+                count += 1
+                params["seek_value"] = row.pop(SEEK_VALUE)
+                params["seek_name"] = row.pop(SEEK_NAME)
+                yield row
+
+        if count < chunk_size:
+            return
+
+        after = True
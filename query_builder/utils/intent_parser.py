@@ -1,16 +1,17 @@
 import json
 import re
 import time
-import requests
 import frappe
 
 from query_builder.utils.intent_prompt import (
     SYSTEM_PROMPT,
     USER_PROMPT_TEMPLATE,
 )
+from query_builder.utils.llm_client import LLMError, get_llm_client
+from query_builder.utils.metrics import incr
+from query_builder.utils.partial_json import parse_partial_json
 
 MODEL = "openai/gpt-4o-mini"
-URL = "https://openrouter.ai/api/v1/chat/completions"
 
 
 def extract_json(text: str):
@@ -20,11 +21,14 @@ def extract_json(text: str):
     return match.group(0) if match else None
 
 
-def parse_intent(schema_text, query):
+def get_api_key():
     api_key = frappe.conf.get("openrouter_api_key")
     if not api_key:
         frappe.throw("OpenRouter API key not configured")
+    return api_key
+
 
+def build_payload(schema_text, query, stream=False):
     payload = {
         "model": MODEL,
         "messages": [
@@ -40,24 +44,14 @@ def parse_intent(schema_text, query):
         "temperature": 0.0,
     }
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    start = time.perf_counter()
-
-    resp = requests.post(URL, headers=headers, json=payload, timeout=60)
-
-    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    if stream:
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
 
-    if resp.status_code != 200:
-        frappe.throw(f"OpenRouter error: {resp.text}")
+    return payload
 
-    data = resp.json()
-
-    content = data["choices"][0]["message"].get("content", "")
 
+def build_intent(content, usage, latency_ms):
     if not content.strip():
         frappe.throw("LLM returned empty response")
 
@@ -68,7 +62,7 @@ def parse_intent(schema_text, query):
     intent = json.loads(json_text)
 
     # ---- usage (may be missing for free models) ----
-    usage = data.get("usage", {})
+    usage = usage or {}
 
     intent["_meta"] = {
         "model": MODEL,
@@ -79,3 +73,91 @@ def parse_intent(schema_text, query):
     }
 
     return intent
+
+
+def parse_intent(schema_text, query):
+    api_key = get_api_key()
+    payload = build_payload(schema_text, query)
+
+    start = time.perf_counter()
+
+    try:
+        data = get_llm_client().chat_completion(payload, api_key)
+    except LLMError as e:
+        incr("llm_errors")
+        frappe.throw(f"OpenRouter error: {e}")
+
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    content = data["choices"][0]["message"].get("content", "")
+
+    return build_intent(content, data.get("usage"), latency_ms)
+
+
+# ---------------------------------------------------------------------
+# STREAMING
+# ---------------------------------------------------------------------
+
+def iter_stream_events(resp):
+    """
+    Yield decoded `data:` events of an OpenAI-style SSE stream.
+    """
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            # blank separators and ": keep-alive" comments
+            continue
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+
+        try:
+            yield json.loads(data)
+        except ValueError:
+            continue
+
+
+def parse_intent_stream(schema_text, query, on_partial=None):
+    """
+    parse_intent() with `stream: true`.
+    on_partial(dict) is called every time the partially streamed
+    JSON parses to a new, larger object.
+    """
+    api_key = get_api_key()
+    payload = build_payload(schema_text, query, stream=True)
+
+    start = time.perf_counter()
+
+    try:
+        resp = get_llm_client().chat_completion_stream(payload, api_key)
+    except LLMError as e:
+        incr("llm_errors")
+        frappe.throw(f"OpenRouter error: {e}")
+
+    content = ""
+    usage = None
+    last_partial = None
+
+    with resp:
+        for event in iter_stream_events(resp):
+            if event.get("usage"):
+                usage = event["usage"]
+
+            for choice in event.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if not delta:
+                    continue
+
+                content += delta
+
+                if on_partial:
+                    partial = parse_partial_json(content)
+                    if partial and partial != last_partial:
+                        last_partial = partial
+                        on_partial(partial)
+
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    intent = build_intent(content, usage, latency_ms)
+    intent["_meta"]["streamed"] = True
+    return intent
@@ -29,3 +29,7 @@ Return a JSON object with:
 - confidence
 """
 
+
+# Bump whenever SYSTEM_PROMPT / USER_PROMPT_TEMPLATE change meaningfully;
+# part of every intent cache key.
+PROMPT_VERSION = "1"
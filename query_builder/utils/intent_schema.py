@@ -12,6 +12,8 @@ class Join(BaseModel):
     doctype: str
     field: str
     condition: str
+    # "exists": filter-only child table, compiled as a semi-join
+    strategy: Literal["join", "exists"] = "join"
 
 
 class Aggregate(BaseModel):
@@ -0,0 +1,182 @@
+# query_builder/utils/join_cost.py
+
+import math
+
+import frappe
+
+from query_builder.utils.join_graph import is_child_edge
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# site_config key (default off): choose join paths by estimated cost
+CONF_ENABLED = "query_builder_join_cost_model"
+
+# table cardinalities / index columns, cached per site
+STATS_KEY = "query_builder:table_stats"
+STATS_TTL = 3600
+
+# tables missing from information_schema (or not yet analyzed)
+DEFAULT_ROWS = 1000
+
+# site_config key: warn when a join path repeats base rows into more
+# than this many estimated rows
+CONF_FANOUT_WARN_ROWS = "query_builder_join_fanout_warn_rows"
+DEFAULT_FANOUT_WARN_ROWS = 100_000
+
+
+def is_enabled() -> bool:
+    return bool(frappe.conf.get(CONF_ENABLED))
+
+
+def get_fanout_warn_rows() -> int:
+    return int(frappe.conf.get(CONF_FANOUT_WARN_ROWS) or DEFAULT_FANOUT_WARN_ROWS)
+
+
+# ---------------------------------------------------------------------
+# TABLE STATISTICS
+# ---------------------------------------------------------------------
+
+def fetch_table_stats(doctypes) -> dict:
+    """
+    doctype -> {"rows": estimated row count, "indexed": columns leading
+    an index}, from information_schema (one query each).
+    """
+    tables = {f"tab{dt}": dt for dt in doctypes}
+    if not tables:
+        return {}
+
+    stats = {dt: {"rows": 0, "indexed": set()} for dt in doctypes}
+
+    for row in frappe.db.sql(
+        """
+        select table_name as tbl, table_rows as n
+        from information_schema.tables
+        where table_schema = database() and table_name in %(tables)s
+        """,
+        {"tables": tuple(tables)},
+        as_dict=True,
+    ):
+        stats[tables[row["tbl"]]]["rows"] = int(row["n"] or 0)
+
+    for row in frappe.db.sql(
+        """
+        select table_name as tbl, column_name as col
+        from information_schema.statistics
+        where table_schema = database() and table_name in %(tables)s
+            and seq_in_index = 1
+        """,
+        {"tables": tuple(tables)},
+        as_dict=True,
+    ):
+        stats[tables[row["tbl"]]]["indexed"].add(row["col"])
+
+    return stats
+
+
+def get_table_stats(doctypes) -> dict:
+    """
+    fetch_table_stats, cached for STATS_TTL; only DocTypes not cached
+    yet are queried.
+    """
+    cache = frappe.cache()
+    stats = cache.get_value(STATS_KEY) or {}
+
+    missing = [dt for dt in doctypes if dt not in stats]
+    if missing:
+        stats = {**stats, **fetch_table_stats(missing)}
+        cache.set_value(STATS_KEY, stats, expires_in_sec=STATS_TTL)
+
+    return stats
+
+
+def get_join_stats(table):
+    """
+    Statistics for every DocType of a JoinPathTable, or None when the
+    cost model is off or statistics are unavailable (non-MariaDB).
+    """
+    if not is_enabled():
+        return None
+
+    try:
+        return get_table_stats(table.doctypes)
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------
+# COST MODEL
+# ---------------------------------------------------------------------
+
+def _rows(stats: dict, doctype: str) -> int:
+    entry = stats.get(doctype)
+    return entry["rows"] if entry and entry["rows"] else DEFAULT_ROWS
+
+
+def edge_estimate(edge, rows_in: float, stats: dict):
+    """
+    (cost, rows out, fan-out) of joining edge onto rows_in rows.
+    Link edges hit at most one row through the primary key; child edges
+    fan out to the average number of child rows per parent, looked up
+    through `parent` (scanned when that column has no index).
+    """
+    frm, _, to, _ = edge
+    to_rows = _rows(stats, to)
+
+    if is_child_edge(edge):
+        fanout = max(1.0, to_rows / _rows(stats, frm))
+        column = "parent"
+    else:
+        fanout = 1.0
+        column = "name"
+
+    indexed = column == "name" or column in (stats.get(to) or {}).get("indexed", ())
+    probe = math.log2(to_rows + 2) if indexed else to_rows
+
+    return rows_in * (probe + fanout), rows_in * fanout, fanout
+
+
+def path_estimate(base_doctype: str, path: list, stats: dict) -> dict:
+    """
+    Total cost and output rows of joining path onto base_doctype, plus
+    its fan-out (output rows per base row).
+    """
+    base_rows = float(_rows(stats, base_doctype))
+    rows = base_rows
+    cost = 0.0
+
+    for edge in path:
+        edge_cost, rows, _ = edge_estimate(edge, rows, stats)
+        cost += edge_cost
+
+    return {"cost": cost, "rows": rows, "fanout": rows / base_rows}
+
+
+def cheapest_path(base_doctype: str, paths: list, stats: dict):
+    """
+    Lowest estimated cost (shortest first on ties), with its estimate.
+    """
+    best = None
+    for path in sorted(paths, key=len):
+        estimate = path_estimate(base_doctype, path, stats)
+        if best is None or estimate["cost"] < best[1]["cost"]:
+            best = (path, estimate)
+
+    return best or (None, None)
+
+
+
+def fanout_warning(base_doctype: str, target: str, estimate) -> str | None:
+    """
+    Suggested rewrite when joining target repeats base rows into more
+    than the configured row count, else None (also without estimate).
+    """
+    if not estimate or estimate["fanout"] <= 1 or estimate["rows"] <= get_fanout_warn_rows():
+        return None
+
+    return (
+        f"Joining {target} repeats each {base_doctype} row about "
+        f"{estimate['fanout']:.0f} times (~{int(estimate['rows'])} rows): "
+        f"filter on {target} only, or aggregate, to read each {base_doctype} once"
+    )
@@ -1,6 +1,13 @@
 # query_builder/utils/join_graph.py
 
-from query_builder.utils.schema_extractor import extract_doctype_schema
+import re
+import threading
+from array import array
+from collections import deque
+
+import frappe
+
+from query_builder.utils.schema_registry import get_compiled_schema, get_schema_version
 
 
 def build_join_graph(doctypes: list[str]) -> dict:
@@ -18,17 +25,250 @@ def build_join_graph(doctypes: list[str]) -> dict:
     graph = {}
 
     for doctype in doctypes:
-        schema = extract_doctype_schema(doctype)
-        if not schema:
+        compiled = get_compiled_schema(doctype)
+        if not compiled:
             continue
 
-        edges = {}
-        for link in schema.get("links", []):
-            field = link.get("fieldname")
-            target = link.get("linked_doctype")
-            if field and target:
-                edges[field] = target
-
-        graph[doctype] = edges
+        graph[doctype] = dict(compiled.links)
 
     return graph
+
+
+# ---------------------------------------------------------------------
+# SITE-WIDE PATH TABLE
+# ---------------------------------------------------------------------
+
+def link_condition(frm: str, field: str, to: str) -> str:
+    return f"{frm}.{field} = {to}.name"
+
+
+def child_condition(parent: str, field: str, child: str) -> str:
+    # parenttype / parentfield: a child DocType can back several tables
+    # (Salary Detail: earnings and deductions) or several parents
+    return (
+        f"{child}.parent = {parent}.name"
+        f" and {child}.parenttype = '{parent}'"
+        f" and {child}.parentfield = '{field}'"
+    )
+
+
+def is_child_edge(edge) -> bool:
+    frm, field, to, condition = edge
+    return condition == child_condition(frm, field, to)
+
+
+# "A.x = B.y" optionally followed by " and A.z = 'value'" terms
+_COLUMN = r"(.+?)\.(\w+)"
+_LITERAL = r"\s+and\s+(.+?)\.(\w+)\s*=\s*'([^']*)'"
+CONDITION_PATTERN = re.compile(
+    rf"^\s*{_COLUMN}\s*=\s*{_COLUMN}((?:{_LITERAL})*)\s*$", re.IGNORECASE
+)
+LITERAL_PATTERN = re.compile(_LITERAL, re.IGNORECASE)
+
+
+def parse_condition(condition: str):
+    """
+    (left_dt, left_col, right_dt, right_col, [(doctype, column, value)])
+    of a join condition, or None when it has another shape.
+    """
+    match = CONDITION_PATTERN.match(condition or "")
+    if not match:
+        return None
+
+    left_dt, left_col, right_dt, right_col, rest = match.groups()[:5]
+    literals = [m.groups() for m in LITERAL_PATTERN.finditer(rest or "")]
+    return left_dt, left_col, right_dt, right_col, literals
+
+
+def join_column(join: dict):
+    """
+    Column of the joined DocType the condition looks up; anything but
+    `name` means one base row can match several joined rows.
+    """
+    parsed = parse_condition(join.get("condition"))
+    if not parsed:
+        return None
+
+    left_dt, left_col, right_dt, right_col, _ = parsed
+    if left_dt == join.get("doctype"):
+        return left_col
+    if right_dt == join.get("doctype"):
+        return right_col
+    return None
+
+
+def is_fanout_join(join: dict) -> bool:
+    return join_column(join) not in (None, "name")
+
+
+def collect_edges(doctypes) -> list:
+    """
+    (from, field, to, condition) for every Link field and child table
+    of doctypes and of their child tables. Link targets outside that
+    set are included as endpoints (no outgoing edges).
+    """
+    edges = []
+    expanded = set()
+    queue = deque(doctypes)
+
+    while queue:
+        doctype = queue.popleft()
+        if doctype in expanded:
+            continue
+        expanded.add(doctype)
+
+        compiled = get_compiled_schema(doctype)
+        if not compiled:
+            continue
+
+        for field, to in compiled.links.items():
+            edges.append((doctype, field, to, link_condition(doctype, field, to)))
+
+        for field, child in compiled.child_tables.items():
+            edges.append((doctype, field, child, child_condition(doctype, field, child)))
+            queue.append(child)
+
+    return edges
+
+
+class JoinPathTable:
+    """
+    Shortest join paths between every pair of DocTypes of a link graph,
+    from one BFS per source. A path is stored as predecessor edges:
+    one int per (source, target), -1 when unreachable.
+    """
+
+    def __init__(self, edges: list):
+        self.edges = edges
+        self.doctypes = list(dict.fromkeys(
+            dt for frm, _, to, _ in edges for dt in (frm, to)
+        ))
+        self.position = {dt: i for i, dt in enumerate(self.doctypes)}
+
+        # node -> outgoing edge ids, in schema field order
+        self.adjacency = [[] for _ in self.doctypes]
+        for edge_id, (frm, _, _, _) in enumerate(edges):
+            self.adjacency[self.position[frm]].append(edge_id)
+
+        self.predecessors = [self._bfs(source) for source in range(len(self.doctypes))]
+
+    def __contains__(self, doctype):
+        return doctype in self.position
+
+    def _bfs(self, source: int) -> array:
+        pred = array("i", [-1]) * len(self.doctypes)
+        visited = {source}
+        queue = deque([source])
+
+        while queue:
+            current = queue.popleft()
+            for edge_id in self.adjacency[current]:
+                nxt = self.position[self.edges[edge_id][2]]
+                if nxt in visited:
+                    continue
+                visited.add(nxt)
+                pred[nxt] = edge_id
+                queue.append(nxt)
+
+        return pred
+
+    def paths(self, source: str, target: str, max_depth: int) -> list:
+        """
+        Every simple path from source to target of at most max_depth
+        edges (shortest first), for callers choosing by cost.
+        """
+        if source == target:
+            return [[]]
+        if source not in self.position or target not in self.position:
+            return []
+
+        found = []
+        stack = [(self.position[source], [], {self.position[source]})]
+
+        while stack:
+            node, path, visited = stack.pop()
+            if len(path) >= max_depth:
+                continue
+
+            for edge_id in self.adjacency[node]:
+                edge = self.edges[edge_id]
+                nxt = self.position[edge[2]]
+                if nxt in visited:
+                    continue
+                if edge[2] == target:
+                    found.append([*path, edge])
+                else:
+                    stack.append((nxt, [*path, edge], visited | {nxt}))
+
+        return sorted(found, key=len)
+
+    def sibling_edges(self, edge) -> list:
+        """
+        Edges with the same endpoints as edge (one child DocType behind
+        several table fields of a parent), edge itself included.
+        """
+        frm, _, to, _ = edge
+        return [
+            self.edges[edge_id]
+            for edge_id in self.adjacency[self.position[frm]]
+            if self.edges[edge_id][2] == to
+        ]
+
+    def path(self, source: str, target: str):
+        """
+        [(from, field, to, condition)] from source to target, [] when
+        they are the same DocType, None when there is no path.
+        """
+        if source == target:
+            return []
+        if source not in self.position or target not in self.position:
+            return None
+
+        src = self.position[source]
+        pred = self.predecessors[src]
+
+        path = []
+        node = self.position[target]
+        while node != src:
+            edge_id = pred[node]
+            if edge_id < 0:
+                return None
+            path.append(self.edges[edge_id])
+            node = self.position[self.edges[edge_id][0]]
+
+        path.reverse()
+        return path
+
+
+def build_join_table(doctypes) -> JoinPathTable:
+    return JoinPathTable(collect_edges(doctypes))
+
+
+_lock = threading.Lock()
+
+# site -> (schema version, doctypes, JoinPathTable)
+_tables = {}
+
+
+def get_join_table(doctypes) -> JoinPathTable:
+    """
+    Path table over doctypes (and everything they link to), rebuilt when
+    the schema version moves. Building compiles schemas: the first call
+    after a schema change must happen on the request thread.
+    """
+    site = getattr(frappe.local, "site", None) or ""
+    version = get_schema_version()
+    doctypes = tuple(doctypes)
+
+    cached = _tables.get(site)
+    if cached and cached[0] == version and cached[1] == doctypes:
+        return cached[2]
+
+    with _lock:
+        cached = _tables.get(site)
+        if cached and cached[0] == version and cached[1] == doctypes:
+            return cached[2]
+
+        table = build_join_table(doctypes)
+        _tables[site] = (version, doctypes, table)
+        return table
@@ -2,69 +2,182 @@
 
 from collections import deque
 
+from query_builder.utils.join_cost import cheapest_path, fanout_warning
+from query_builder.utils.join_graph import build_join_graph, is_child_edge, link_condition
+from query_builder.utils.keyword_index import phrase_terms, query_terms
 
 MAX_JOIN_DEPTH = 2
 
 
 def find_join_path(base_doctype: str, target_doctype: str, graph: dict):
     """
-    BFS search for join path.
-    Returns list of (from_doctype, field, to_doctype)
+    BFS search for join path over an adjacency list (build_join_graph).
+    Returns list of (from_doctype, field, to_doctype, condition)
     """
     if base_doctype == target_doctype:
         return []
 
-    queue = deque([(base_doctype, [])])
-    visited = {base_doctype}
+    # node -> (parent, field, depth); paths are rebuilt once, at the end
+    parents = {base_doctype: (None, None, 0)}
+    queue = deque([base_doctype])
 
     while queue:
-        current, path = queue.popleft()
+        current = queue.popleft()
+        depth = parents[current][2]
 
-        if len(path) >= MAX_JOIN_DEPTH:
+        if depth >= MAX_JOIN_DEPTH:
             continue
 
         for field, next_dt in graph.get(current, {}).items():
-            if next_dt in visited:
+            if next_dt in parents:
                 continue
 
-            new_path = path + [(current, field, next_dt)]
+            parents[next_dt] = (current, field, depth + 1)
             if next_dt == target_doctype:
-                return new_path
+                path = []
+                node = next_dt
+                while node != base_doctype:
+                    frm, fld, _ = parents[node]
+                    path.append((frm, fld, node, link_condition(frm, fld, node)))
+                    node = frm
+                return path[::-1]
 
-            visited.add(next_dt)
-            queue.append((next_dt, new_path))
+            queue.append(next_dt)
 
     return None
 
 
-def build_joins(base_doctype: str, required_doctypes: set, graph: dict):
+def lookup_join_path(base_doctype: str, target_doctype: str, table):
+    """
+    Precomputed shortest path (JoinPathTable), None beyond MAX_JOIN_DEPTH.
+    """
+    path = table.path(base_doctype, target_doctype)
+    if path is None or len(path) > MAX_JOIN_DEPTH:
+        return None
+    return path
+
+
+def plan_join_path(base_doctype: str, target_doctype: str, table, stats: dict):
+    """
+    (path, estimate): the cheapest of the table's candidate paths when
+    stats are given, else its shortest path (estimate None).
+    """
+    if stats is None:
+        return lookup_join_path(base_doctype, target_doctype, table), None
+
+    return cheapest_path(
+        base_doctype,
+        table.paths(base_doctype, target_doctype, MAX_JOIN_DEPTH),
+        stats,
+    )
+
+
+def choose_table_edge(table, edge, query: str):
+    """
+    The one table field behind a child edge: edge itself when the parent
+    has no other table of that child DocType, else the sibling the query
+    names ("deductions" → Salary Slip.deductions), else None.
+    """
+    siblings = table.sibling_edges(edge)
+    if len(siblings) == 1:
+        return edge
+
+    terms = set(query_terms(query or ""))
+    named = [e for e in siblings if set(phrase_terms(e[1])) & terms]
+    return named[0] if len(named) == 1 else None
+
+
+def build_joins(
+    base_doctype: str,
+    required_doctypes: set,
+    graph: dict | None = None,
+    table=None,
+    stats: dict | None = None,
+    filter_only=(),
+    query: str | None = None,
+):
     """
     Build join definitions for all required doctypes.
+
+    With a site path table (join_graph.get_join_table) knowing
+    base_doctype every path is a table lookup; otherwise BFS over graph,
+    built from base + required doctypes when not given. With table
+    statistics (join_cost.get_join_stats) the cheapest path wins.
+
+    A child table in `filter_only` gets strategy "exists" (semi-join),
+    so it never repeats base rows; a joined path the statistics expect
+    to repeat base rows past the configured count carries a "warning".
+    A child DocType behind several table fields of its parent is joined
+    through the one `query` names, or asks for clarification.
     """
-    joins = []
-    seen = set()
+    use_table = table is not None and base_doctype in table
+    if not use_table and graph is None:
+        graph = build_join_graph([base_doctype, *required_doctypes])
+
+    planned = []   # (target, path, semi-join candidate, estimate)
 
     for target in required_doctypes:
         if target == base_doctype:
             continue
 
-        path = find_join_path(base_doctype, target, graph)
+        estimate = None
+        if use_table:
+            path, estimate = plan_join_path(base_doctype, target, table, stats)
+        else:
+            path = find_join_path(base_doctype, target, graph)
+
         if not path:
             return {
                 "clarification_required": True,
                 "message": f"Cannot determine join path from {base_doctype} to {target}"
             }
 
-        for frm, field, to in path:
+        if use_table:
+            for i, edge in enumerate(path):
+                if not is_child_edge(edge):
+                    continue
+
+                chosen = choose_table_edge(table, edge, query)
+                if chosen is None:
+                    fields = [e[1] for e in table.sibling_edges(edge)]
+                    return {
+                        "clarification_required": True,
+                        "message": (
+                            f"{edge[2]} is used by several tables of {edge[0]}: "
+                            f"{', '.join(fields)}"
+                        ),
+                        "matches": fields,
+                    }
+                path[i] = chosen
+
+        semi_join = target in filter_only and is_child_edge(path[-1])
+        planned.append((target, path, semi_join, estimate))
+
+    # a table other joins go through must stay a real join
+    intermediates = {frm for _, path, _, _ in planned for frm, _, _, _ in path}
+
+    joins = []
+    seen = set()
+
+    for target, path, semi_join, estimate in planned:
+        for frm, field, to, condition in path:
             key = (frm, field, to)
             if key in seen:
                 continue
 
-            joins.append({
+            join = {
                 "doctype": to,
                 "field": field,
-                "condition": f"{frm}.{field} = {to}.name"
-            })
+                "condition": condition,
+            }
+            if semi_join and to == target and target not in intermediates:
+                join["strategy"] = "exists"
+            elif to == target:
+                warning = fanout_warning(base_doctype, target, estimate)
+                if warning:
+                    join["warning"] = warning
+
+            joins.append(join)
             seen.add(key)
 
     return joins
@@ -0,0 +1,195 @@
+# query_builder/utils/keyword_index.py
+
+import math
+import re
+import threading
+from collections import Counter
+from itertools import pairwise
+
+import frappe
+
+from query_builder.utils.schema_registry import get_doctype_schema, get_schema_version
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# BM25
+K1 = 1.2
+B = 0.75
+
+# DocType name terms count this many times (a query naming the
+# DocType should beat one that only shares a field)
+DOCTYPE_NAME_WEIGHT = 3
+
+STOPWORDS = {
+    "a", "an", "the", "of", "for", "in", "on", "at", "to", "by", "with",
+    "and", "or", "is", "are", "was", "were", "be", "me", "my", "all",
+    "show", "list", "get", "give", "find", "what", "which", "who", "how",
+    "many", "much", "number", "count", "from", "their", "there", "has", "have",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*")
+
+
+# ---------------------------------------------------------------------
+# TOKENIZATION
+# ---------------------------------------------------------------------
+
+def _stem(word: str) -> str:
+    # plural folding only: "employees" → "employee", "status" kept
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+        return word[:-1]
+    return word
+
+
+def _words(text: str) -> list:
+    return [
+        "_".join(_stem(part) for part in word.split("_"))
+        for word in TOKEN_PATTERN.findall((text or "").lower())
+    ]
+
+
+def phrase_terms(text: str) -> list:
+    """
+    Terms of a name / label / option: its words plus the whole phrase
+    joined by "_" ("Half Day" → half, day, half_day; "log_type" →
+    log_type, log, type).
+    """
+    terms = []
+    for word in _words(text):
+        terms.append(word)
+        if "_" in word:
+            terms.extend(word.split("_"))
+
+    parts = [t for t in terms if "_" not in t]
+    if len(parts) > 1:
+        terms.append("_".join(parts))
+
+    return terms
+
+
+def query_terms(query: str) -> list:
+    """
+    Query words (stopwords dropped) plus adjacent-word bigrams joined
+    by "_", so "log type" matches the field log_type.
+    """
+    words = []
+    for word in _words(query):
+        words.append(word)
+        if "_" in word:
+            words.extend(word.split("_"))
+
+    plain = [w for w in words if "_" not in w]
+    bigrams = [f"{a}_{b}" for a, b in pairwise(plain)]
+
+    return [w for w in words if w not in STOPWORDS] + bigrams
+
+
+# ---------------------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------------------
+
+class KeywordIndex:
+    """
+    BM25 inverted index: one document per DocType made of its name,
+    field names, labels and Select options.
+    """
+
+    def __init__(self, documents: dict):
+        # doctype -> Counter(term)
+        self.doc_lengths = {dt: sum(terms.values()) for dt, terms in documents.items()}
+        self.avg_length = (sum(self.doc_lengths.values()) / len(documents)) if documents else 0.0
+
+        # term -> [(doctype, tf)]
+        self.postings = {}
+        for doctype, terms in documents.items():
+            for term, tf in terms.items():
+                self.postings.setdefault(term, []).append((doctype, tf))
+
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int = 3) -> list:
+        """
+        [(doctype, score)] best first, only DocTypes sharing a term.
+        """
+        scores = {}
+
+        for term in set(query_terms(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+
+            idf = self.idf[term]
+            for doctype, tf in posting:
+                norm = K1 * (1 - B + B * self.doc_lengths[doctype] / (self.avg_length or 1))
+                scores[doctype] = scores.get(doctype, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+
+def schema_terms(schema: dict) -> Counter:
+    terms = Counter()
+
+    for _ in range(DOCTYPE_NAME_WEIGHT):
+        terms.update(phrase_terms(schema["doctype"]))
+
+    for field in schema["fields"]:
+        terms.update(phrase_terms(field["fieldname"]))
+        if field.get("label"):
+            terms.update(phrase_terms(field["label"]))
+
+        if field["type"] == "Select" and field.get("options"):
+            for option in str(field["options"]).split("\n"):
+                terms.update(phrase_terms(option))
+
+    return terms
+
+
+def build_keyword_index(doctypes) -> KeywordIndex:
+    documents = {}
+    for doctype in doctypes:
+        schema = get_doctype_schema(doctype)
+        if schema:
+            documents[doctype] = schema_terms(schema)
+
+    return KeywordIndex(documents)
+
+
+# ---------------------------------------------------------------------
+# PER-SITE CACHE
+# ---------------------------------------------------------------------
+
+_lock = threading.Lock()
+
+# site -> (schema version, doctypes, KeywordIndex)
+_indexes = {}
+
+
+def get_keyword_index(doctypes) -> KeywordIndex:
+    """
+    Keyword index over doctypes, rebuilt when the schema version moves.
+    Building compiles schemas (frappe.get_meta): the first call after a
+    schema change must happen on the request thread.
+    """
+    site = getattr(frappe.local, "site", None) or ""
+    version = get_schema_version()
+    doctypes = tuple(doctypes)
+
+    cached = _indexes.get(site)
+    if cached and cached[0] == version and cached[1] == doctypes:
+        return cached[2]
+
+    with _lock:
+        cached = _indexes.get(site)
+        if cached and cached[0] == version and cached[1] == doctypes:
+            return cached[2]
+
+        index = build_keyword_index(doctypes)
+        _indexes[site] = (version, doctypes, index)
+        return index
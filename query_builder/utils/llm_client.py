@@ -0,0 +1,282 @@
+# query_builder/utils/llm_client.py
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import frappe
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+
+DEFAULT_TIMEOUT = 60          # seconds, per attempt
+DEFAULT_DEADLINE = 90         # seconds, all attempts + backoff (< gunicorn timeout)
+DEFAULT_MAX_RETRIES = 3
+BACKOFF_BASE = 0.5            # seconds
+BACKOFF_MAX = 8.0             # seconds
+RETRY_AFTER_MAX = 30.0        # never sleep longer than this on Retry-After
+POOL_SIZE = 10
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0  # seconds before a half-open probe
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# site_config keys
+CONF_BASE_URL = "openrouter_base_url"
+CONF_TIMEOUT = "query_builder_llm_timeout"
+CONF_DEADLINE = "query_builder_llm_deadline"
+CONF_MAX_RETRIES = "query_builder_llm_max_retries"
+
+
+# ---------------------------------------------------------------------
+# ERRORS
+# ---------------------------------------------------------------------
+
+class LLMError(Exception):
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class CircuitOpenError(LLMError):
+    pass
+
+
+# ---------------------------------------------------------------------
+# CIRCUIT BREAKER
+# ---------------------------------------------------------------------
+
+class CircuitBreaker:
+    """
+    closed → open after `failure_threshold` consecutive failed calls;
+    open → half-open after `reset_timeout`, letting one probe through.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+# ---------------------------------------------------------------------
+# CLIENT
+# ---------------------------------------------------------------------
+
+def parse_retry_after(value):
+    """
+    Retry-After header → seconds (delta-seconds or HTTP date).
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """
+    Full-jitter exponential backoff, never shorter than Retry-After.
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_AFTER_MAX))
+    return delay
+
+
+class LLMClient:
+    """
+    OpenAI-compatible chat client over a pooled keep-alive session.
+    """
+
+    def __init__(
+        self,
+        base_url=DEFAULT_BASE_URL,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        breaker=None,
+        sleep=time.sleep,
+        deadline=DEFAULT_DEADLINE,
+        clock=time.monotonic,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._clock = clock
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, path: str, payload: dict, headers: dict, stream: bool = False):
+        """
+        POST with retry/backoff; returns the successful requests.Response.
+        All attempts and sleeps together stay within `deadline` seconds.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        deadline = self._clock() + self.deadline
+        last_error = LLMError("LLM request deadline exceeded")
+        recorded = False
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+
+                retry_after = None
+
+                try:
+                    resp = self.session.post(
+                        url,
+                        headers=headers,
+                        json=payload,
+                        timeout=min(self.timeout, remaining),
+                        stream=stream,
+                    )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    last_error = LLMError(str(e))
+                except requests.RequestException as e:
+                    # not transient (invalid URL, broken body, ...): no retry
+                    raise LLMError(str(e)) from e
+                else:
+                    if resp.status_code == 200:
+                        self.breaker.record_success()
+                        recorded = True
+                        return resp
+
+                    last_error = LLMError(resp.text, resp.status_code, resp.text)
+
+                    if resp.status_code not in RETRY_STATUS_CODES:
+                        # client error: not transient, and the provider is reachable
+                        self.breaker.record_success()
+                        recorded = True
+                        resp.close()
+                        raise last_error
+
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    resp.close()
+
+                if attempt < self.max_retries:
+                    delay = backoff_delay(attempt, retry_after)
+                    if self._clock() + delay >= deadline:
+                        break
+                    self._sleep(delay)
+        finally:
+            # every way out but success / client error counts as a failure,
+            # so a half-open probe always releases the breaker
+            if not recorded:
+                self.breaker.record_failure()
+
+        raise last_error
+
+    def chat_completion(self, payload: dict, api_key: str) -> dict:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        return self.post("chat/completions", payload, headers).json()
+
+    def chat_completion_stream(self, payload: dict, api_key: str):
+        """
+        Streaming variant; returns the open response (SSE body).
+        Retries only cover establishing the stream.
+        """
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+        }
+        return self.post("chat/completions", payload, headers, stream=True)
+
+
+# ---------------------------------------------------------------------
+# PER-WORKER INSTANCE
+# ---------------------------------------------------------------------
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _reset_clients():
+    _clients.clear()
+
+
+# pooled sockets must not be shared with forked workers
+os.register_at_fork(after_in_child=_reset_clients)
+
+
+def get_llm_client() -> LLMClient:
+    base_url = frappe.conf.get(CONF_BASE_URL) or DEFAULT_BASE_URL
+    timeout = float(frappe.conf.get(CONF_TIMEOUT) or DEFAULT_TIMEOUT)
+    deadline = float(frappe.conf.get(CONF_DEADLINE) or DEFAULT_DEADLINE)
+    max_retries = int(frappe.conf.get(CONF_MAX_RETRIES, DEFAULT_MAX_RETRIES))
+
+    key = (base_url, timeout, deadline, max_retries)
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = LLMClient(base_url, timeout=timeout, max_retries=max_retries, deadline=deadline)
+            _clients[key] = client
+
+    return client
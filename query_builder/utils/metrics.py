@@ -0,0 +1,194 @@
+# query_builder/utils/metrics.py
+
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# latest samples kept per stage for percentiles
+RING_SIZE = 2048
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+PROMETHEUS_PREFIX = "query_builder"
+
+# site_config key: attach per-request stage timings to intent `_meta`
+CONF_TIMINGS_IN_META = "query_builder_metrics_in_meta"
+
+
+# ---------------------------------------------------------------------
+# PER-WORKER REGISTRY
+# ---------------------------------------------------------------------
+
+class StageHistogram:
+    """
+    Count / sum since start plus a ring buffer of recent samples (ms).
+    """
+
+    def __init__(self, size: int = RING_SIZE):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self, qs=QUANTILES) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: None for q in qs}
+
+        last = len(ordered) - 1
+        return {q: round(ordered[min(last, int(q * len(ordered)))], 2) for q in qs}
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, stage: str, value_ms: float):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = StageHistogram()
+            hist.observe(value_ms)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {}
+            for stage, hist in self.histograms.items():
+                q = hist.quantiles()
+                stages[stage] = {
+                    "count": hist.count,
+                    "sum_ms": round(hist.total, 2),
+                    "p50_ms": q[0.5],
+                    "p95_ms": q[0.95],
+                    "p99_ms": q[0.99],
+                }
+
+            return {
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self.started, 1),
+                "stages": stages,
+                "counters": dict(self.counters),
+            }
+
+
+_registry = MetricsRegistry()
+
+
+def _reset_registry():
+    # a forked worker starts its own histograms
+    global _registry
+    _registry = MetricsRegistry()
+
+
+os.register_at_fork(after_in_child=_reset_registry)
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def incr(name: str, amount: int = 1):
+    _registry.incr(name, amount)
+
+
+def reset_metrics():
+    _reset_registry()
+
+
+# ---------------------------------------------------------------------
+# STAGE TIMERS
+# ---------------------------------------------------------------------
+
+# timings dict of the request being collected (shared with threads
+# started through concurrency.submit, which copy the context)
+_current_timings = contextvars.ContextVar("query_builder_timings", default=None)
+
+
+@contextlib.contextmanager
+def collect_timings():
+    """
+    Collect every stage() finished inside the block into one dict.
+    """
+    timings = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """
+    Time a pipeline stage into the worker histogram and, when inside
+    collect_timings(), into the current request's timings.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        _registry.observe(name, elapsed)
+
+        timings = _current_timings.get()
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0) + elapsed, 2)
+
+
+# ---------------------------------------------------------------------
+# PROMETHEUS TEXT FORMAT
+# ---------------------------------------------------------------------
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_prometheus(snapshot: dict, extra_labels: dict | None = None) -> str:
+    """
+    Exposition format 0.0.4: stage latency as a summary, counters as
+    `<name>_total`.
+    """
+    base = dict(extra_labels or {})
+    base["pid"] = snapshot["pid"]
+
+    def labels(**extra):
+        merged = {**base, **extra}
+        return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in merged.items()) + "}"
+
+    lines = []
+
+    name = f"{PROMETHEUS_PREFIX}_stage_latency_ms"
+    lines.append(f"# HELP {name} Pipeline stage latency in milliseconds.")
+    lines.append(f"# TYPE {name} summary")
+    for stage_name, s in sorted(snapshot["stages"].items()):
+        for q, key in ((0.5, "p50_ms"), (0.95, "p95_ms"), (0.99, "p99_ms")):
+            if s[key] is not None:
+                lines.append(f"{name}{labels(stage=stage_name, quantile=q)} {s[key]}")
+        lines.append(f"{name}_sum{labels(stage=stage_name)} {s['sum_ms']}")
+        lines.append(f"{name}_count{labels(stage=stage_name)} {s['count']}")
+
+    for counter, value in sorted(snapshot["counters"].items()):
+        cname = f"{PROMETHEUS_PREFIX}_{counter}_total"
+        lines.append(f"# TYPE {cname} counter")
+        lines.append(f"{cname}{labels()} {value}")
+
+    return "\n".join(lines) + "\n"
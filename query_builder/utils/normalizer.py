@@ -1,8 +1,6 @@
 # query_builder/utils/normalizer.py
 
-TEMPORAL_KEYWORDS = {
-    "today", "yesterday", "last", "this", "current", "date", "shift"
-}
+from query_builder.utils.query_hints import get_query_hints, has_hint
 
 PROFILE_FIELDS = {
     "department",
@@ -30,8 +28,7 @@ MANDATORY_FILTERS = {
 # ---------------------------------------------------------------------
 
 def has_temporal_context(query: str) -> bool:
-    q = query.lower()
-    return any(k in q for k in TEMPORAL_KEYWORDS)
+    return has_hint(query, "temporal")
 
 
 # ---------------------------------------------------------------------
@@ -120,23 +117,14 @@ def rule_attendance_vs_checkin(intent, query):
     Deterministically resolve Attendance vs Employee Checkin
     based on explicit user keywords.
     """
-    q = query.lower()
-
-    checkin_keywords = {
-        "check in", "checked in", "check-in",
-        "check out", "checked out", "checkout"
-    }
-
-    attendance_keywords = {
-        "attendance", "absent", "present", "leave"
-    }
+    hints = get_query_hints(query)
 
-    if any(k in q for k in checkin_keywords):
+    if hints & {"checkin", "checkout"}:
         intent["doctype"] = "Employee Checkin"
         intent["joins"] = []
         return intent
 
-    if any(k in q for k in attendance_keywords):
+    if "attendance" in hints:
         intent["doctype"] = "Attendance"
         intent["joins"] = []
         return intent
@@ -0,0 +1,70 @@
+# query_builder/utils/partial_json.py
+
+import json
+
+
+def parse_partial_json(text: str):
+    """
+    Best-effort parse of a JSON object that is still being streamed.
+
+    Returns the largest prefix that forms a valid object once open
+    brackets are closed. Values still being written (half a string,
+    a dangling key) are dropped rather than guessed.
+    """
+    if not text:
+        return None
+
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack = []
+    in_string = False
+    escape = False
+
+    # (end index, closing suffix) of the last point where the text
+    # can be cut and closed into valid JSON
+    cut = None
+
+    for i in range(start, len(text)):
+        ch = text[i]
+
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cut = (i + 1, "".join(reversed(stack)))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                try:
+                    return json.loads(text[start:i + 1])
+                except ValueError:
+                    return None
+            cut = (i + 1, "".join(reversed(stack)))
+        elif ch == ",":
+            cut = (i, "".join(reversed(stack)))
+
+    candidates = []
+    if not in_string:
+        candidates.append(text[start:] + "".join(reversed(stack)))
+    if cut:
+        candidates.append(text[start:cut[0]] + cut[1])
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+
+    return None
@@ -0,0 +1,170 @@
+# query_builder/utils/query_hints.py
+
+import copy
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+
+import frappe
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# hint -> words / phrases signalling it (matched on whole words,
+# "check-in" and "check in" alike)
+HINT_VOCABULARIES = {
+    "temporal": {
+        "today", "yesterday", "last", "this", "current", "currently",
+        "date", "dates", "shift", "shifts",
+    },
+    "count": {"count", "counts", "counted", "how many", "number of"},
+    "active": {"active", "inactive"},
+    "checkin": {"check in", "check ins", "checked in"},
+    "checkout": {"check out", "check outs", "checked out", "checkout", "checkouts"},
+    "attendance": {
+        "attendance", "attendances", "absent", "absentee", "absentees",
+        "absence", "absences", "present", "leave", "leaves",
+    },
+}
+
+# Extra phrases per hint, merged into HINT_VOCABULARIES:
+# site_config {"query_builder_query_hints": {"temporal": ["fortnight"]}}
+# or an app's hooks.py `query_builder_query_hints = {...}`
+CONF_VOCABULARIES = "query_builder_query_hints"
+HOOK_VOCABULARIES = "query_builder_query_hints"
+
+# matched queries remembered per matcher
+MATCH_CACHE_SIZE = 1024
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    return WORD_PATTERN.findall((text or "").lower())
+
+
+# ---------------------------------------------------------------------
+# MATCHER
+# ---------------------------------------------------------------------
+
+class HintMatcher:
+    """
+    Aho-Corasick automaton over words: every phrase of every vocabulary
+    is found in one pass over the query's tokens.
+    """
+
+    def __init__(self, vocabularies: dict):
+        self.goto = [{}]    # node -> {word: node}
+        self.fail = [0]
+        self.out = [set()]  # node -> hints ending here
+
+        for hint, phrases in vocabularies.items():
+            for phrase in phrases:
+                words = tokenize(phrase)
+                if words:
+                    self._insert(words, hint)
+
+        self._link()
+        self.out = [frozenset(hints) for hints in self.out]
+        self.match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match)
+
+    def _insert(self, words: list, hint: str):
+        node = 0
+        for word in words:
+            nxt = self.goto[node].get(word)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][word] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(set())
+            node = nxt
+        self.out[node].add(hint)
+
+    def _link(self):
+        # failure links, breadth first; outputs inherit their fallbacks
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for word, nxt in self.goto[node].items():
+                queue.append(nxt)
+
+                fallback = self.fail[node]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+
+                self.fail[nxt] = self.goto[fallback].get(word, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def _match(self, text: str) -> frozenset:
+        """
+        Every hint whose phrases occur in text (whole words).
+        """
+        found = set()
+        node = 0
+
+        for word in tokenize(text):
+            while node and word not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(word, 0)
+            found |= self.out[node]
+
+        return frozenset(found)
+
+
+# ---------------------------------------------------------------------
+# PER-SITE MATCHER
+# ---------------------------------------------------------------------
+
+def get_vocabularies(hooks=None, conf=None) -> dict:
+    """
+    HINT_VOCABULARIES plus phrases from hooks and site_config.
+    """
+    vocabularies = {hint: set(phrases) for hint, phrases in HINT_VOCABULARIES.items()}
+
+    for extra in (hooks or {}, conf or {}):
+        for hint, phrases in extra.items():
+            if isinstance(phrases, str):
+                phrases = [phrases]
+            vocabularies.setdefault(hint, set()).update(phrases)
+
+    return vocabularies
+
+
+_lock = threading.Lock()
+
+# site -> (hooks value, site_config value, HintMatcher)
+_matchers = {}
+
+
+def get_matcher() -> HintMatcher:
+    """
+    Matcher for the current site, rebuilt only when its hook or
+    site_config phrases differ from those it was built from.
+    """
+    site = getattr(frappe.local, "site", None) or ""
+    hooks = frappe.get_hooks(HOOK_VOCABULARIES) or {}
+    conf = frappe.conf.get(CONF_VOCABULARIES) or {}
+
+    cached = _matchers.get(site)
+    if cached and cached[0] == hooks and cached[1] == conf:
+        return cached[2]
+
+    with _lock:
+        matcher = HintMatcher(get_vocabularies(hooks, conf))
+        _matchers[site] = (copy.deepcopy(hooks), copy.deepcopy(conf), matcher)
+        return matcher
+
+
+def get_query_hints(query: str) -> frozenset:
+    """
+    Names of every hint present in query, e.g. {"temporal", "count"}.
+    """
+    return get_matcher().match(query or "")
+
+
+def has_hint(query: str, hint: str) -> bool:
+    return hint in get_query_hints(query)
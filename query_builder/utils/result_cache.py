@@ -0,0 +1,166 @@
+# query_builder/utils/result_cache.py
+
+import hashlib
+import json
+from datetime import date, datetime, time, timedelta
+
+import frappe
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+DEFAULT_TTL = 300  # seconds
+
+# site_config keys
+CONF_ENABLED = "query_builder_result_cache"         # default on
+CONF_TTL = "query_builder_result_cache_ttl"
+
+RESULT_PREFIX = "query_builder:result:"
+
+# hash: doctype -> version token, bumped on every write to that doctype
+VERSIONS_KEY = "query_builder:result_versions"
+
+
+def is_enabled() -> bool:
+    return bool(frappe.conf.get(CONF_ENABLED, True))
+
+
+def get_default_ttl() -> int:
+    return int(frappe.conf.get(CONF_TTL) or DEFAULT_TTL)
+
+
+# ---------------------------------------------------------------------
+# KEYS
+# ---------------------------------------------------------------------
+
+def canonicalize_intent(intent: dict) -> str:
+    """
+    Stable text form of the parts of an intent that affect its rows.
+    """
+    canonical = {k: v for k, v in intent.items() if not k.startswith("_")}
+    canonical.pop("confidence", None)
+    return json.dumps(canonical, sort_keys=True, default=str)
+
+
+def get_doctype_versions(doctypes) -> list:
+    cache = frappe.cache()
+    return [cache.hget(VERSIONS_KEY, dt) or "" for dt in doctypes]
+
+
+def make_result_key(intent: dict, doctypes, match_conditions=(), limit=None) -> str:
+    """
+    Canonical intent + permission context + current versions of every
+    referenced doctype. A write to any of them changes the key.
+    """
+    parts = [
+        canonicalize_intent(intent),
+        json.dumps(list(match_conditions)),
+        str(limit),
+        json.dumps(list(doctypes)),
+        json.dumps(get_doctype_versions(doctypes)),
+    ]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------
+# TTL (DATE-RELATIVE WINDOWS)
+# ---------------------------------------------------------------------
+
+def _as_datetime(value, end_of_day=False):
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime.combine(value, time.max if end_of_day else time.min)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if len(value) <= 10 and end_of_day:
+            parsed = datetime.combine(parsed.date(), time.max)
+        return parsed
+    return None
+
+
+def compute_ttl(intent: dict, default_ttl: int | None = None) -> int:
+    """
+    Default TTL, shortened so that a filter window containing "now"
+    (today, this_week, after 9 am, ...) expires right when it closes.
+    """
+    ttl = default_ttl or get_default_ttl()
+    now = frappe.utils.now_datetime()
+
+    for f in intent.get("filters") or []:
+        if f.get("op") != "between":
+            continue
+
+        value = f.get("value")
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            continue
+
+        start = _as_datetime(value[0])
+        end = _as_datetime(value[1], end_of_day=True)
+        if not start or not end or not (start <= now <= end):
+            continue
+
+        remaining = (end - now + timedelta(seconds=1)).total_seconds()
+        ttl = min(ttl, max(1, int(remaining)))
+
+    return ttl
+
+
+# ---------------------------------------------------------------------
+# GET / SET
+# ---------------------------------------------------------------------
+
+def get_cached_result(key: str):
+    return frappe.cache().get_value(RESULT_PREFIX + key)
+
+
+def store_result(key: str, intent: dict, rows):
+    frappe.cache().set_value(
+        RESULT_PREFIX + key,
+        rows,
+        expires_in_sec=compute_ttl(intent),
+    )
+
+
+# ---------------------------------------------------------------------
+# INVALIDATION (doc_events "*")
+# ---------------------------------------------------------------------
+
+def bump_doctype_versions(doctypes):
+    cache = frappe.cache()
+    for doctype in doctypes:
+        cache.hset(VERSIONS_KEY, doctype, frappe.generate_hash(length=8))
+
+
+def _flush_dirty_doctypes():
+    dirty = frappe.flags.pop("query_builder_dirty_doctypes", None)
+    if dirty:
+        bump_doctype_versions(dirty)
+
+
+def on_doc_change(doc, method=None):
+    """
+    doc_events hook for every doctype.
+    Versions are bumped once per doctype per transaction, after commit,
+    so a concurrent reader can't re-cache pre-commit rows.
+    """
+    dirty = frappe.flags.get("query_builder_dirty_doctypes")
+    if dirty is None:
+        dirty = frappe.flags.query_builder_dirty_doctypes = set()
+
+        after_commit = getattr(frappe.db, "after_commit", None)
+        if after_commit is not None:
+            after_commit.add(_flush_dirty_doctypes)
+            frappe.db.after_rollback.add(
+                lambda: frappe.flags.pop("query_builder_dirty_doctypes", None)
+            )
+        else:
+            dirty.add(doc.doctype)
+            _flush_dirty_doctypes()
+            return
+
+    dirty.add(doc.doctype)
@@ -171,6 +171,7 @@ def extract_doctype_schema(doctype: str):
         "module": meta.module,
         "description": meta.description or f"Manages {doctype} records",
         "is_submittable": bool(meta.is_submittable),
+        "is_table": bool(meta.istable),
         "fields": fields,
         "links": links,
         "child_tables": child_tables,
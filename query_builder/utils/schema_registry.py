@@ -0,0 +1,267 @@
+# query_builder/utils/schema_registry.py
+
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import frappe
+
+from query_builder.utils.schema_extractor import extract_doctype_schema
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Site-wide version token (redis). Bumped on every schema change so that
+# every worker drops its compiled schemas on its next request.
+SCHEMA_VERSION_KEY = "query_builder:schema_version"
+
+
+# Present on every table, whether or not the extracted schema lists them
+STANDARD_COLUMNS = {
+    "name", "owner", "creation", "modified", "modified_by",
+    "docstatus", "idx",
+}
+
+# Present on child tables only
+CHILD_COLUMNS = {"parent", "parentfield", "parenttype"}
+
+
+# ---------------------------------------------------------------------
+# COMPILED SCHEMA
+# ---------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """
+    Immutable, pre-indexed view of extract_doctype_schema() output.
+
+    `schema` is the legacy dict shape and is shared between requests:
+    callers must treat it (and its field dicts) as read-only.
+    """
+    doctype: str
+    version: str
+    schema: Mapping
+    fields_by_name: Mapping[str, Mapping]
+    field_types: Mapping[str, str]
+    is_table: bool
+    links: Mapping[str, str]           # fieldname -> linked doctype
+    child_tables: Mapping[str, str]    # table fieldname -> child doctype
+
+    # child fieldname -> (table fieldname, child doctype) pairs carrying it
+    # (parent fields excluded)
+    child_field_index: Mapping[str, tuple[tuple[str, str], ...]]
+
+    def has_field(self, fieldname: str) -> bool:
+        return fieldname in self.fields_by_name
+
+    def has_column(self, fieldname: str) -> bool:
+        """
+        Schema field or standard column of this DocType's table.
+        """
+        return (
+            fieldname in self.fields_by_name
+            or fieldname in STANDARD_COLUMNS
+            or (self.is_table and fieldname in CHILD_COLUMNS)
+        )
+
+
+def build_child_field_index(
+    fields_by_name: Mapping,
+    child_tables: Mapping[str, str],
+    get_child: Callable[[str], CompiledSchema | None],
+) -> dict:
+    """
+    Reverse index: fieldname -> tuple of (table fieldname, child doctype)
+    defining it. Keyed by table field, so one child DocType behind two
+    tables (Salary Detail via earnings and deductions) counts twice.
+    Fields that also exist on the parent resolve to the parent and are
+    left out (every child carries `name`, for example).
+    """
+    index = {}
+
+    for table_field, child_doctype in child_tables.items():
+        child = get_child(child_doctype)
+        if not child:
+            continue
+
+        for fieldname in child.fields_by_name:
+            if fieldname in fields_by_name:
+                continue
+            index.setdefault(fieldname, []).append((table_field, child_doctype))
+
+    return {name: tuple(tables) for name, tables in index.items()}
+
+
+def compile_schema(
+    doctype: str,
+    version: str = "",
+    get_child: Callable[[str], CompiledSchema | None] | None = None,
+) -> CompiledSchema | None:
+    schema = extract_doctype_schema(doctype)
+    if not schema:
+        return None
+
+    fields_by_name = {
+        f["fieldname"]: MappingProxyType(f)
+        for f in schema["fields"]
+    }
+
+    links = {
+        l["fieldname"]: l["linked_doctype"]
+        for l in schema.get("links", [])
+        if l.get("fieldname") and l.get("linked_doctype")
+    }
+
+    child_tables = {
+        ct["fieldname"]: ct["child_doctype"]
+        for ct in schema.get("child_tables", [])
+        if ct.get("fieldname") and ct.get("child_doctype")
+    }
+
+    child_field_index = build_child_field_index(
+        fields_by_name,
+        child_tables,
+        get_child or (lambda dt: compile_schema(dt, version)),
+    )
+
+    return CompiledSchema(
+        doctype=doctype,
+        version=version,
+        schema=schema,
+        fields_by_name=MappingProxyType(fields_by_name),
+        field_types=MappingProxyType(
+            {name: f["type"] for name, f in fields_by_name.items()}
+        ),
+        is_table=bool(schema.get("is_table")),
+        links=MappingProxyType(links),
+        child_tables=MappingProxyType(child_tables),
+        child_field_index=MappingProxyType(child_field_index),
+    )
+
+
+# ---------------------------------------------------------------------
+# REGISTRY (PER PROCESS, PER SITE)
+# ---------------------------------------------------------------------
+
+_lock = threading.RLock()
+
+# site -> {"version": str, "schemas": {doctype: CompiledSchema | None}}
+_registry: dict = {}
+
+
+def _site() -> str:
+    return getattr(frappe.local, "site", None) or ""
+
+
+def get_schema_version() -> str:
+    """
+    Current site-wide schema version.
+    Read from redis at most once per request / job.
+    """
+    version = getattr(frappe.local, "query_builder_schema_version", None)
+    if version is not None:
+        return version
+
+    try:
+        version = frappe.cache().get_value(SCHEMA_VERSION_KEY) or ""
+    except Exception:
+        # redis unavailable → keep serving what we have
+        version = _registry.get(_site(), {}).get("version", "")
+
+    frappe.local.query_builder_schema_version = version
+    return version
+
+
+def _site_entries() -> dict:
+    site = _site()
+    version = get_schema_version()
+
+    entry = _registry.get(site)
+    if entry is None or entry["version"] != version:
+        entry = {"version": version, "schemas": {}}
+        _registry[site] = entry
+
+    return entry
+
+
+def get_compiled_schema(doctype: str) -> CompiledSchema | None:
+    """
+    Compiled schema for doctype, built at most once per schema version.
+    Missing doctypes are cached as None. Child tables are compiled (and
+    cached) alongside their parent to build the child field index.
+    """
+    if not doctype:
+        return None
+
+    with _lock:
+        entry = _site_entries()
+        schemas = entry["schemas"]
+
+        if doctype not in schemas:
+            schemas[doctype] = compile_schema(
+                doctype,
+                entry["version"],
+                get_child=get_compiled_schema,
+            )
+
+        return schemas[doctype]
+
+
+def warm_schemas(doctypes):
+    """
+    Compile any of doctypes not yet in the registry.
+    Touches frappe.get_meta, so call it from the request thread.
+    """
+    for doctype in doctypes:
+        get_compiled_schema(doctype)
+
+
+def resolve_field_doctype(field: str, doctypes) -> tuple[str | None, str]:
+    """
+    (doctype, fieldname) for a possibly `Doctype.fieldname` qualified
+    field: the first of doctypes defining it, or (None, fieldname).
+    """
+    doctypes = list(doctypes)
+    doctype, _, fieldname = field.rpartition(".")
+    candidates = [doctype] if doctype in doctypes else doctypes
+
+    for dt in candidates:
+        compiled = get_compiled_schema(dt)
+        known = compiled.has_column(fieldname) if compiled else fieldname in STANDARD_COLUMNS
+        if known:
+            return dt, fieldname
+
+    return None, fieldname
+
+
+def get_doctype_schema(doctype: str) -> Mapping | None:
+    """
+    Drop-in, cached replacement for extract_doctype_schema().
+    """
+    compiled = get_compiled_schema(doctype)
+    return compiled.schema if compiled else None
+
+
+# ---------------------------------------------------------------------
+# INVALIDATION
+# ---------------------------------------------------------------------
+
+def clear_schema_registry():
+    """
+    Drop compiled schemas for the current site in every worker.
+    """
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(SCHEMA_VERSION_KEY, version)
+    frappe.local.query_builder_schema_version = version
+
+    with _lock:
+        _registry.pop(_site(), None)
+
+
+def on_schema_change(doc, method=None):
+    """
+    doc_events hook for DocType / Custom Field / Property Setter.
+    """
+    clear_schema_registry()
@@ -1,8 +1,5 @@
-from typing import List, Dict
-
-from query_builder.utils.normalizer import has_temporal_context
-from query_builder.utils.schema_extractor import extract_doctype_schema
-
+from query_builder.utils.query_hints import get_query_hints
+from query_builder.utils.schema_registry import get_doctype_schema
 
 # ---------------------------------------------------------------------
 # CONFIG
@@ -27,12 +24,12 @@ ALWAYS_KEEP_FIELDNAMES = {
 # QUERY HINTS
 # ---------------------------------------------------------------------
 
-def extract_query_hints(query: str) -> Dict[str, bool]:
-    q = query.lower()
+def extract_query_hints(query: str) -> dict[str, bool]:
+    hints = get_query_hints(query)
     return {
-        "wants_count": any(x in q for x in ("count", "how many", "number of")),
-        "has_temporal": has_temporal_context(query),
-        "mentions_active": "active" in q or "inactive" in q,
+        "wants_count": "count" in hints,
+        "has_temporal": "temporal" in hints,
+        "mentions_active": "active" in hints,
     }
 
 
@@ -101,14 +98,17 @@ def score_field(field: dict, hints: dict) -> int:
 # CORE TRIMMER
 # ---------------------------------------------------------------------
 
-def trim_schema(chroma_result: dict, query: str) -> List[dict]:
+def trim_schema(chroma_result: dict, query: str, entities: list[dict] | None = None) -> list[dict]:
     metadatas = chroma_result.get("metadatas", [[]])[0]
     hints = extract_query_hints(query)
 
+    # Link fields to resolved values must survive trimming
+    resolved_doctypes = {e["doctype"] for e in entities or ()}
+
     trimmed_schemas = []
 
     for meta in metadatas:
-        schema = extract_doctype_schema(meta["doctype"])
+        schema = get_doctype_schema(meta["doctype"])
         if not schema:
             continue
 
@@ -118,15 +118,26 @@ def trim_schema(chroma_result: dict, query: str) -> List[dict]:
         candidates = []
 
         for f in fields:
-            if is_always_keep(f, hints):
+            if is_always_keep(f, hints) or (
+                f["type"] == "Link" and f.get("options") in resolved_doctypes
+            ):
                 always_keep.append(f)
             else:
                 candidates.append(f)
 
-        candidates.sort(
-            key=lambda f: score_field(f, hints),
-            reverse=True,
-        )
+        # Field index hits → keep only the matched fields (nearest first)
+        matched = meta.get("matched_fields")
+        if matched:
+            rank = {fieldname: i for i, fieldname in enumerate(matched)}
+            candidates = sorted(
+                (f for f in candidates if f["fieldname"] in rank),
+                key=lambda f: rank[f["fieldname"]],
+            )
+        else:
+            candidates.sort(
+                key=lambda f: score_field(f, hints),
+                reverse=True,
+            )
 
         remaining_slots = max(
             0,
@@ -150,7 +161,7 @@ def trim_schema(chroma_result: dict, query: str) -> List[dict]:
 # PROMPT BUILDER (ENUM-SAFE)
 # ---------------------------------------------------------------------
 
-def build_schema_prompt(trimmed_schemas: List[dict]) -> str:
+def build_schema_prompt(trimmed_schemas: list[dict], entities: list[dict] | None = None) -> str:
     blocks = []
 
     for schema in trimmed_schemas:
@@ -171,4 +182,11 @@ def build_schema_prompt(trimmed_schemas: List[dict]) -> str:
 
         blocks.append("\n".join(lines))
 
+    # Link values resolved before the LLM call (see entity_resolver)
+    if entities:
+        blocks.append("\n".join(
+            ["Resolved values (use exactly):"]
+            + [f"- {e['doctype']}: {e['name']}" for e in entities]
+        ))
+
     return "\n\n".join(blocks)
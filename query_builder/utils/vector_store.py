@@ -1,10 +1,27 @@
+import contextlib
+import hashlib
+import json
 import os
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+import tempfile
+import threading
+import time
+
 import frappe
 
+from query_builder.utils.concurrency import submit
+from query_builder.utils.embedding_cache import embed_queries, embed_query
+from query_builder.utils.embedding_provider import get_embedding_provider
+from query_builder.utils.field_index import (
+    FIELD_CANDIDATES,
+    FIELD_COLLECTION_NAME,
+    aggregate_chunk_hits,
+    schema_to_chunks,
+)
+from query_builder.utils.field_index import is_enabled as is_field_index_enabled
+from query_builder.utils.keyword_index import get_keyword_index
+from query_builder.utils.metrics import stage
 from query_builder.utils.schema_extractor import build_metadata
+from query_builder.utils.schema_registry import get_doctype_schema
 
 # -------------------------------------------------------------------
 # CONSTANTS
@@ -12,37 +29,287 @@ from query_builder.utils.schema_extractor import build_metadata
 
 COLLECTION_NAME = "query_builder_hrms_schema"
 
-# IMPORTANT: absolute path + forced creation
-CHROMA_DIR = os.path.abspath(
-    frappe.get_site_path("private/chroma_hrms_schema")
-)
+# Bumped by rebuild_vector_store so every worker re-opens its handle
+GENERATION_KEY = "query_builder:vector_store_generation"
+
+CHROMA_SUBDIR = "private/chroma_hrms_schema"
+
+# Alias pointers (inside the chroma dir) naming the live versioned
+# collection of each logical name; swapped atomically by full rebuilds
+ALIAS_FILES = {
+    COLLECTION_NAME: "active_collection.json",
+    FIELD_COLLECTION_NAME: "active_field_collection.json",
+}
+
+# Debounced incremental sync (schema change hooks → one background job)
+SYNC_DIRTY_KEY = "query_builder:vector_sync_dirty"              # redis set of doctypes
+SYNC_LAST_CHANGE_KEY = "query_builder:vector_sync_last_change"
+SYNC_JOB_ID = "query_builder_vector_sync"
+SYNC_DEBOUNCE = 3     # seconds without changes before syncing
+SYNC_MAX_WAIT = 30    # never hold a sync back longer than this
+
+# DocTypes embedded into the schema collection
+INDEXED_DOCTYPES = [
+    "Employee",
+    "Department",
+    "Designation",
+    "Shift Type",
+    "Shift Assignment",
+    "Leave Application",
+    "Leave Type",
+    "Leave Policy Assignment",
+    "Attendance",
+    "Employee Checkin",
+    "Salary Slip",
+    "Payroll Entry",
+    "Salary Structure Assignment",
+    "Payroll Period",
+    "Holiday List",
+]
 
-# Force directory creation (prevents in-memory fallback)
-os.makedirs(CHROMA_DIR, exist_ok=True)
 
-# Load embedding model once
-EMBED_MODEL = SentenceTransformer("all-MiniLM-L6-v2")
+# site -> absolute chroma dir
+_chroma_dirs = {}
+
+
+def get_chroma_dir():
+    """
+    Absolute, per-site chroma directory (created on first use).
+    """
+    site = frappe.local.site
+    chroma_dir = _chroma_dirs.get(site)
+    if chroma_dir:
+        return chroma_dir
+
+    # IMPORTANT: absolute path + forced creation
+    chroma_dir = os.path.abspath(frappe.get_site_path(CHROMA_SUBDIR))
+
+    # Force directory creation (prevents in-memory fallback)
+    os.makedirs(chroma_dir, exist_ok=True)
+
+    _chroma_dirs[site] = chroma_dir
+    return chroma_dir
 
 
 # -------------------------------------------------------------------
-# CHROMA CLIENT
+# CHROMA CLIENT + COLLECTION POOL (PER WORKER)
 # -------------------------------------------------------------------
 
+_pool_lock = threading.Lock()
+_pool_pid = os.getpid()
+
+# chroma_dir -> client
+_clients = {}
+
+# (chroma_dir, collection_name) -> (generation, collection)
+_collections = {}
+
+
+def _reset_pool():
+    global _pool_pid
+
+    _clients.clear()
+    _collections.clear()
+    _pool_pid = os.getpid()
+
+
+# Handles opened in a preloading master must never leak into forked workers
+os.register_at_fork(after_in_child=_reset_pool)
+
+
+def _check_pid():
+    # fallback for fork paths that bypass os.register_at_fork
+    if _pool_pid != os.getpid():
+        _reset_pool()
+
+
 def get_chroma_client():
-    return chromadb.Client(
-        Settings(
-            persist_directory=CHROMA_DIR,
-            is_persistent=True,          # 🔑 THIS IS THE KEY
-            anonymized_telemetry=False,
-            
-        )
-    )
+    chroma_dir = get_chroma_dir()
+
+    with _pool_lock:
+        _check_pid()
+
+        client = _clients.get(chroma_dir)
+        if client is None:
+            import chromadb
+            from chromadb.config import Settings
+
+            client = chromadb.Client(
+                Settings(
+                    persist_directory=chroma_dir,
+                    is_persistent=True,          # 🔑 THIS IS THE KEY
+                    anonymized_telemetry=False,
+                )
+            )
+            _clients[chroma_dir] = client
+
+        return client
+
+
+def get_store_generation():
+    """
+    Site-wide collection generation, read from redis once per request.
+    """
+    generation = getattr(frappe.local, "query_builder_store_generation", None)
+    if generation is not None:
+        return generation
+
+    try:
+        generation = frappe.cache().get_value(GENERATION_KEY) or ""
+    except Exception:
+        generation = ""
+
+    frappe.local.query_builder_store_generation = generation
+    return generation
+
+
+def bump_store_generation():
+    generation = frappe.generate_hash(length=12)
+    frappe.cache().set_value(GENERATION_KEY, generation)
+    frappe.local.query_builder_store_generation = generation
+    return generation
+
+
+# -------------------------------------------------------------------
+# ALIAS (BLUE / GREEN)
+# -------------------------------------------------------------------
+
+def read_alias(chroma_dir=None, name=COLLECTION_NAME):
+    path = os.path.join(chroma_dir or get_chroma_dir(), ALIAS_FILES[name])
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_alias(alias, chroma_dir=None, name=COLLECTION_NAME):
+    """
+    Atomic pointer swap: write a temp file, then rename over the alias.
+    """
+    chroma_dir = chroma_dir or get_chroma_dir()
+
+    fd, tmp_path = tempfile.mkstemp(dir=chroma_dir, prefix=".alias_")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(alias, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(chroma_dir, ALIAS_FILES[name]))
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def resolve_collection_name(name=COLLECTION_NAME, chroma_dir=None):
+    """
+    Physical collection behind a logical name (itself when no rebuild
+    has created an alias yet).
+    """
+    if name not in ALIAS_FILES:
+        return name
+    return read_alias(chroma_dir, name).get("collection") or name
+
+
+# -------------------------------------------------------------------
+# COLLECTION HANDLES
+# -------------------------------------------------------------------
+
+# (chroma_dir, name) keys with a background re-open in flight
+_warming = set()
+
+
+def warm_collection(collection):
+    """
+    Load the collection's vector index with one nearest-neighbour query.
+    """
+    sample = collection.peek(1)
+    embeddings = sample.get("embeddings")
+    if embeddings is not None and len(embeddings):
+        collection.query(query_embeddings=[list(embeddings[0])], n_results=1)
+
+
+def open_collection(name, chroma_dir):
+    collection = get_chroma_client().get_collection(resolve_collection_name(name, chroma_dir))
+    warm_collection(collection)
+    return collection
+
+
+def _reopen_in_background(key, generation, name):
+    def reopen():
+        try:
+            collection = open_collection(name, key[0])
+        except Exception:
+            return
+        finally:
+            with _pool_lock:
+                _warming.discard(key)
+
+        with _pool_lock:
+            _collections[key] = (generation, collection)
+
+    with _pool_lock:
+        if key in _warming:
+            return
+        _warming.add(key)
+
+    submit(reopen)
+
+
+def get_collection(name=COLLECTION_NAME):
+    """
+    Cached, warmed collection handle for a logical name.
+
+    When the generation moves (swap or sync elsewhere), the current
+    handle keeps serving while the new one is opened and warmed in the
+    background; the previous version is kept on disk for exactly this.
+    """
+    chroma_dir = get_chroma_dir()
+    generation = get_store_generation()
+    key = (chroma_dir, name)
+
+    with _pool_lock:
+        cached = _collections.get(key)
+
+    if cached:
+        if cached[0] != generation:
+            _reopen_in_background(key, generation, name)
+        return cached[1]
+
+    collection = open_collection(name, chroma_dir)
+
+    with _pool_lock:
+        _collections[key] = (generation, collection)
+
+    return collection
+
+
+def invalidate_collection(name=COLLECTION_NAME):
+    with _pool_lock:
+        _collections.pop((get_chroma_dir(), name), None)
 
 
 # -------------------------------------------------------------------
 # SCHEMA → DOCUMENTS
 # -------------------------------------------------------------------
 
+def document_id(doctype):
+    return f"schema::{doctype}"
+
+
+def content_hash(text, model_name):
+    # model is part of the hash: switching models re-embeds everything
+    return hashlib.sha1(f"{model_name}\0{text}".encode()).hexdigest()
+
+
+def add_content_hashes(documents, metadatas):
+    model_name = get_embedding_provider().model_name
+
+    for document, meta in zip(documents, metadatas, strict=True):
+        meta["content_hash"] = content_hash(document, model_name)
+
+
 def schema_to_documents(schema_list):
     documents = []
     ids = []
@@ -50,62 +317,485 @@ def schema_to_documents(schema_list):
 
     for schema in schema_list:
         documents.append(schema["embedding_text"])
-        ids.append(f"schema::{schema['doctype']}")
+        ids.append(document_id(schema["doctype"]))
         metadatas.append({
             "doctype": schema["doctype"],
             "module": schema["module"],
             "is_submittable": schema["is_submittable"],
         })
 
+    add_content_hashes(documents, metadatas)
     return documents, ids, metadatas
 
 
+def schema_to_field_documents(schema_list):
+    documents, ids, metadatas = schema_to_chunks(schema_list)
+    add_content_hashes(documents, metadatas)
+    return documents, ids, metadatas
+
+
+def get_collection_documents():
+    """
+    logical collection name -> builder(schemas), for every enabled index.
+    """
+    builders = {COLLECTION_NAME: schema_to_documents}
+    if is_field_index_enabled():
+        builders[FIELD_COLLECTION_NAME] = schema_to_field_documents
+    return builders
+
+
 # -------------------------------------------------------------------
 # REBUILD VECTOR STORE
 # -------------------------------------------------------------------
 
+def validate_collection(collection, documents, ids, embeddings):
+    """
+    Smoke test for a freshly built collection: every document is there
+    and a document's own embedding retrieves it first.
+    """
+    if collection.count() != len(ids):
+        return False
+
+    if not ids:
+        return True
+
+    res = collection.query(query_embeddings=[list(embeddings[0])], n_results=1)
+    return bool(res.get("ids") and res["ids"][0] and res["ids"][0][0] == ids[0])
+
+
+def collect_garbage(client, name, keep):
+    """
+    Delete versioned collections of logical `name` other than `keep`.
+    """
+    deleted = []
+    prefix = f"{name}_v"
+
+    for collection in client.list_collections():
+        # chroma >= 0.6 returns names, older releases Collection objects
+        physical = getattr(collection, "name", collection)
+        if physical in keep or not (physical == name or physical.startswith(prefix)):
+            continue
+
+        try:
+            client.delete_collection(physical)
+            deleted.append(physical)
+        except Exception:
+            pass
+
+    return deleted
+
+
+def rebuild_collection(name, documents, ids, metadatas):
+    """
+    Blue/green rebuild of one logical collection: build a new versioned
+    collection, validate it, switch the alias atomically, then drop
+    versions older than the previous one (which stays for workers still
+    holding its handle).
+    """
+    client = get_chroma_client()
+    chroma_dir = get_chroma_dir()
+
+    version = frappe.generate_hash(length=8)
+    physical = f"{name}_v{version}"
+
+    collection = client.create_collection(name=physical)
+
+    embeddings = get_embedding_provider().encode(documents)
+
+    if documents:
+        collection.add(
+            documents=documents,
+            embeddings=embeddings,
+            ids=ids,
+            metadatas=metadatas,
+        )
+
+    if not validate_collection(collection, documents, ids, embeddings):
+        client.delete_collection(physical)
+        frappe.throw(f"Rebuilt {name} collection failed validation; the live index was kept")
+
+    previous = resolve_collection_name(name, chroma_dir)
+    write_alias({"collection": physical, "previous": previous, "version": version}, chroma_dir, name)
+
+    # this worker swaps now; others re-open in the background on their next request
+    with _pool_lock:
+        _collections[(chroma_dir, name)] = (bump_store_generation(), collection)
+
+    return {
+        "documents_indexed": len(documents),
+        "collection": physical,
+        "previous": previous,
+        "garbage_collected": collect_garbage(client, name, keep={physical, previous}),
+    }
+
+
 def rebuild_vector_store(doctype_list):
+    """
+    Full blue/green rebuild of the schema collection (and the field
+    index when enabled).
+    """
     schemas = build_metadata(doctype_list)
 
-    documents, ids, metadatas = schema_to_documents(schemas)
+    result = {"status": "ok", "doctypes_indexed": len(schemas), "chroma_dir": get_chroma_dir()}
 
-    client = get_chroma_client()
+    for name, to_documents in get_collection_documents().items():
+        result[name] = rebuild_collection(name, *to_documents(schemas))
 
-    # clean rebuild
-    try:
-        client.delete_collection(COLLECTION_NAME)
-    except Exception:
-        pass
+    return result
+
+
+# -------------------------------------------------------------------
+# INCREMENTAL SYNC
+# -------------------------------------------------------------------
 
-    collection = client.create_collection(name=COLLECTION_NAME)
+def sync_collection(name, documents, ids, metadatas, doctype_list, prune=True):
+    """
+    Upsert documents whose content hash changed and delete documents
+    that are gone, in place. Returns affected DocTypes.
+    """
+    collection = get_chroma_client().get_or_create_collection(name=resolve_collection_name(name))
 
-    embeddings = EMBED_MODEL.encode(documents).tolist()
+    if prune:
+        existing = collection.get(include=["metadatas"])
+    else:
+        existing = collection.get(
+            where={"doctype": {"$in": list(doctype_list)}},
+            include=["metadatas"],
+        )
 
-    collection.add(
-        documents=documents,
-        embeddings=embeddings,
-        ids=ids,
-        metadatas=metadatas,
-    )
+    indexed = {
+        doc_id: meta or {}
+        for doc_id, meta in zip(existing["ids"], existing["metadatas"], strict=True)
+    }
+
+    changed = [
+        i for i, doc_id in enumerate(ids)
+        if indexed.get(doc_id, {}).get("content_hash") != metadatas[i]["content_hash"]
+    ]
+    current = set(ids)
+    removed = [doc_id for doc_id in indexed if doc_id not in current]
+
+    if changed:
+        collection.upsert(
+            ids=[ids[i] for i in changed],
+            documents=[documents[i] for i in changed],
+            embeddings=get_embedding_provider().encode([documents[i] for i in changed]),
+            metadatas=[metadatas[i] for i in changed],
+        )
+
+    if removed:
+        collection.delete(ids=removed)
 
     return {
-        "status": "ok",
-        "doctypes_indexed": len(documents),
-        "chroma_dir": CHROMA_DIR,
+        "upserted": sorted({metadatas[i]["doctype"] for i in changed}),
+        "deleted": sorted({indexed[doc_id].get("doctype") or doc_id for doc_id in removed}),
+        "documents_changed": len(changed) + len(removed),
+        "unchanged": len(ids) - len(changed),
     }
 
 
+def sync_vector_store(doctype_list, prune=True):
+    """
+    Re-embed only DocTypes whose embedding text changed, in place.
+    The collection is never dropped, so retrieval keeps working.
+
+    prune=True also deletes documents of DocTypes outside doctype_list;
+    otherwise only listed DocTypes that no longer exist are removed.
+    """
+    schemas = build_metadata(doctype_list)
+
+    result = {"status": "ok", "chroma_dir": get_chroma_dir()}
+    changed = False
+
+    for name, to_documents in get_collection_documents().items():
+        synced = sync_collection(name, *to_documents(schemas), doctype_list, prune)
+        changed = changed or synced["documents_changed"]
+
+        if name == COLLECTION_NAME:
+            result.update(synced)
+        else:
+            result[name] = synced
+
+    if changed:
+        bump_store_generation()
+
+    return result
+
+
+def queue_vector_sync(doctypes):
+    """
+    Mark indexed DocTypes dirty and enqueue one (deduplicated) sync job
+    after the current transaction commits.
+    """
+    doctypes = [dt for dt in doctypes if dt in INDEXED_DOCTYPES]
+    if not doctypes:
+        return
+
+    cache = frappe.cache()
+    cache.sadd(SYNC_DIRTY_KEY, *doctypes)
+    # raw redis: get_value would serve the job a request-local copy
+    cache.set(cache.make_key(SYNC_LAST_CHANGE_KEY), time.time())
+
+    frappe.enqueue(
+        "query_builder.utils.vector_store.run_vector_sync",
+        queue="short",
+        job_id=SYNC_JOB_ID,
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+
+
+def run_vector_sync():
+    """
+    Background job: wait for SYNC_DEBOUNCE quiet seconds (bounded by
+    SYNC_MAX_WAIT), then sync every dirty DocType.
+    """
+    cache = frappe.cache()
+
+    deadline = time.monotonic() + SYNC_MAX_WAIT
+    while time.monotonic() < deadline:
+        quiet = time.time() - float(cache.get(cache.make_key(SYNC_LAST_CHANGE_KEY)) or 0)
+        if quiet >= SYNC_DEBOUNCE:
+            break
+        time.sleep(max(0, min(SYNC_DEBOUNCE - quiet, deadline - time.monotonic())))
+
+    # changes landing while a sync runs are picked up by the next pass
+    while True:
+        dirty = [
+            d.decode() if isinstance(d, bytes) else d
+            for d in cache.smembers(SYNC_DIRTY_KEY)
+        ]
+        if not dirty:
+            return
+
+        cache.srem(SYNC_DIRTY_KEY, *dirty)
+        sync_vector_store(dirty, prune=False)
+
+
+def on_schema_change(doc, method=None):
+    """
+    doc_events hook for DocType / Custom Field / Property Setter.
+    """
+    doctype = {
+        "DocType": doc.name,
+        "Custom Field": doc.get("dt"),
+        "Property Setter": doc.get("doc_type"),
+    }.get(doc.doctype)
+
+    if doctype:
+        queue_vector_sync([doctype])
+
+
 # -------------------------------------------------------------------
 # RETRIEVE SCHEMA
 # -------------------------------------------------------------------
 
+# Per-query fields of a Chroma query result
+RESULT_KEYS = ("ids", "documents", "metadatas", "distances")
+
+# Hybrid retrieval: BM25 keyword index fused with vector hits (RRF)
+CONF_HYBRID = "query_builder_hybrid_retrieval"        # default on
+CONF_KEYWORD_SHORTCUT = "query_builder_keyword_shortcut"  # default on
+RRF_K = 60
+FUSION_CANDIDATES = 8   # hits taken from each ranking before fusing
+
+# Answer from the keyword index alone (no embedding, no Chroma) when the
+# best BM25 hit scores at least this and leads the runner-up this much
+SHORTCUT_MIN_SCORE = 5.0
+SHORTCUT_MARGIN = 2.0
+
+
+def is_hybrid_enabled():
+    return bool(frappe.conf.get(CONF_HYBRID, True))
+
+
+def is_keyword_shortcut_enabled():
+    return bool(frappe.conf.get(CONF_KEYWORD_SHORTCUT, True))
+
+
+def query_collection(query_embeddings, top_k=3, name=COLLECTION_NAME):
+    try:
+        return get_collection(name).query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+        )
+    except Exception:
+        # handle went stale (e.g. rebuilt by another process) → re-open once
+        invalidate_collection(name)
+        return get_collection(name).query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+        )
+
+
+def search_embeddings(query_embeddings, top_k=3):
+    """
+    One retrieve_schema-shaped result per embedding. Uses the field
+    index when enabled (metadatas then carry `matched_fields`), the
+    DocType collection otherwise or when the field index is missing.
+    """
+    if is_field_index_enabled():
+        try:
+            res = query_collection(query_embeddings, FIELD_CANDIDATES, name=FIELD_COLLECTION_NAME)
+        except Exception:
+            res = None
+
+        if res is not None:
+            return [
+                aggregate_chunk_hits(
+                    res["ids"][i],
+                    res["documents"][i] if res.get("documents") else None,
+                    res["metadatas"][i],
+                    res["distances"][i],
+                    top_k,
+                )
+                for i in range(len(query_embeddings))
+            ]
+
+    res = query_collection(query_embeddings, top_k)
+
+    return [
+        {
+            key: [res[key][i]] if res.get(key) is not None else None
+            for key in RESULT_KEYS
+        }
+        for i in range(len(query_embeddings))
+    ]
+
+
+# -------------------------------------------------------------------
+# HYBRID (BM25 + VECTOR)
+# -------------------------------------------------------------------
+
+def warm_keyword_index():
+    """
+    Build the keyword index if the schema moved. Compiles schemas, so
+    call it on the request thread before retrieving from another one.
+    """
+    if is_hybrid_enabled():
+        get_keyword_index(INDEXED_DOCTYPES)
+
+
+def keyword_search(query, limit=FUSION_CANDIDATES):
+    with stage("keyword_search"):
+        return get_keyword_index(INDEXED_DOCTYPES).search(query, limit)
+
+
+def is_keyword_obvious(keyword_hits) -> bool:
+    if not keyword_hits or keyword_hits[0][1] < SHORTCUT_MIN_SCORE:
+        return False
+    return len(keyword_hits) == 1 or keyword_hits[0][1] >= SHORTCUT_MARGIN * keyword_hits[1][1]
+
+
+def keyword_metadata(doctype):
+    schema = get_doctype_schema(doctype) or {}
+    return {
+        "doctype": doctype,
+        "module": schema.get("module"),
+        "is_submittable": schema.get("is_submittable"),
+    }
+
+
+def fuse_results(vector_result, keyword_hits, top_k=3):
+    """
+    Reciprocal-rank fusion of one query's vector result and BM25 hits
+    into a retrieve_schema-shaped result. DocTypes found only by
+    keyword have no document and a None distance.
+    """
+    vector_result = vector_result or {}
+    entries = {}  # doctype -> entry
+
+    ids = (vector_result.get("ids") or [[]])[0]
+    metadatas = (vector_result.get("metadatas") or [[]])[0]
+    documents = (vector_result.get("documents") or [[None] * len(ids)])[0]
+    distances = (vector_result.get("distances") or [[None] * len(ids)])[0]
+
+    for rank, (doc_id, document, meta, distance) in enumerate(zip(ids, documents, metadatas, distances, strict=True)):
+        entry = entries.setdefault(meta["doctype"], {
+            "id": doc_id,
+            "document": document,
+            "metadata": meta,
+            "distance": distance,
+            "score": 0.0,
+        })
+        entry["score"] += 1 / (RRF_K + rank + 1)
+
+    for rank, (doctype, _) in enumerate(keyword_hits or []):
+        entry = entries.get(doctype)
+        if entry is None:
+            entry = entries[doctype] = {
+                "id": document_id(doctype),
+                "document": None,
+                "metadata": keyword_metadata(doctype),
+                "distance": None,
+                "score": 0.0,
+            }
+        entry["score"] += 1 / (RRF_K + rank + 1)
+
+    ranked = sorted(entries.values(), key=lambda e: e["score"], reverse=True)[:top_k]
+
+    return {
+        "ids": [[e["id"] for e in ranked]],
+        "documents": [[e["document"] for e in ranked]],
+        "metadatas": [[e["metadata"] for e in ranked]],
+        "distances": [[e["distance"] for e in ranked]],
+    }
+
+
 def retrieve_schema(query, top_k=3):
-    client = get_chroma_client()
-    collection = client.get_collection(COLLECTION_NAME)
+    if not is_hybrid_enabled():
+        with stage("embedding"):
+            embedding = embed_query(query)
 
-    query_embedding = EMBED_MODEL.encode([query]).tolist()[0]
+        with stage("vector_search"):
+            return search_embeddings([embedding], top_k)[0]
 
-    return collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-    )
+    keyword_hits = keyword_search(query)
+    if is_keyword_shortcut_enabled() and is_keyword_obvious(keyword_hits):
+        return fuse_results(None, keyword_hits, top_k)
+
+    with stage("embedding"):
+        embedding = embed_query(query)
+
+    with stage("vector_search"):
+        vector_result = search_embeddings([embedding], max(top_k, FUSION_CANDIDATES))[0]
+
+    return fuse_results(vector_result, keyword_hits, top_k)
+
+
+def retrieve_schemas(queries, top_k=3):
+    """
+    Batched retrieve_schema(): one encode call, one Chroma query for the
+    queries that need vectors.
+    Returns one retrieve_schema-shaped result per query, in order.
+    """
+    if not queries:
+        return []
+
+    if not is_hybrid_enabled():
+        with stage("embedding"):
+            embeddings = embed_queries(queries)
+
+        with stage("vector_search"):
+            return search_embeddings(embeddings, top_k)
+
+    keyword_hits = [keyword_search(q) for q in queries]
+    shortcut = is_keyword_shortcut_enabled()
+
+    results = [
+        fuse_results(None, hits, top_k) if shortcut and is_keyword_obvious(hits) else None
+        for hits in keyword_hits
+    ]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if pending:
+        with stage("embedding"):
+            embeddings = embed_queries([queries[i] for i in pending])
+
+        with stage("vector_search"):
+            vector_results = search_embeddings(embeddings, max(top_k, FUSION_CANDIDATES))
+
+        for i, vector_result in zip(pending, vector_results, strict=True):
+            results[i] = fuse_results(vector_result, keyword_hits[i], top_k)
+
+    return results